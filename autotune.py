@@ -0,0 +1,299 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from importlib import metadata
+
+import cv2
+import numpy as np
+
+import exercise_logic
+from exercise_logic import LandmarkBuffer, JOINTS, NUM_LANDMARKS, joint_angles
+from pipeline import RgbBuffer, ResizeBuffer
+
+# Jednorazowa kalibracja modelu MediaPipe Pose na danym komputerze: każda
+# złożoność modelu i szerokość wejścia jest mierzona na nagraniu (FPS) i
+# porównywana z najcięższym modelem na pełnej klatce (zgodność kątów w stawach
+# i wykrywania sylwetki). Wybrane ustawienia trafiają do profilu na dysku
+# (osobny wpis dla każdego komputera) i są wczytywane przy starcie ćwiczeń.
+# Uruchomienie: python autotune.py [--clip nagranie.mp4] [--target-fps 30]
+
+# Profil i nagrania kalibracyjne obok skryptów, niezależnie od katalogu, z którego
+# uruchomiono aplikację (repozytorium nie zawiera nagrań - bez nich kalibracja używa kamery)
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profil_wydajnosci.json")
+CLIPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "clips")
+# Limit pamięci na klatki z kamery trzymane przez całą kalibrację (nagranie jest
+# czytane od nowa dla każdego kandydata i nie zajmuje pamięci)
+MAX_CAPTURE_MB = 256
+CAPTURE_JPEG_QUALITY = 95
+
+COMPLEXITIES = (0, 1, 2)
+INPUT_WIDTHS = (None, 960, 640, 480)  # None - pełna klatka
+REFERENCE = (2, None)                 # Najcięższy model na pełnej klatce
+
+# Zapas FPS na przechwytywanie, rysowanie i wyświetlanie w pozostałych wątkach
+HEADROOM = 1.2
+# Minimalny odsetek klatek, w których wykrycie sylwetki zgadza się z modelem odniesienia
+MIN_DETECTION_AGREEMENT = 0.9
+
+ANGLE_TRIPLETS = np.array(list(JOINTS.values()))
+
+
+# Identyfikacja komputera; profil z innym sprzętem lub wersjami bibliotek jest nieaktualny
+def host_id():
+    return platform.node() or "localhost"
+
+def package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+# Bez importu mediapipe - sprawdzane przy każdym starcie ćwiczenia
+def host_fingerprint():
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "mediapipe": package_version("mediapipe"),
+        "opencv": cv2.__version__,
+    }
+
+
+# --- Profil na dysku ---
+
+def load_profiles(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_profile(path, profile):
+    profiles = load_profiles(path)
+    profiles[host_id()] = profile
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(profiles, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+# Ustawienia PoseResources z profilu bieżącego komputera ({} - brak lub nieaktualny profil)
+def load_settings(path=DEFAULT_PATH):
+    profile = load_profiles(path).get(host_id())
+    if profile is None:
+        return {}
+    if profile.get("fingerprint") != host_fingerprint():
+        print(f"Profil wydajności w {path} jest nieaktualny (zmiana sprzętu lub wersji bibliotek) - "
+              f"uruchom ponownie autotune.py", file=sys.stderr)
+        return {}
+    return dict(profile["settings"])
+
+
+# --- Kalibracja ---
+
+# Klatki kalibracji. Nagranie jest odtwarzane od nowa dla każdego kandydata
+# (w pamięci jest jedna klatka naraz), a klatki z kamery - których nie da się
+# powtórzyć - są zapisywane raz jako JPEG (ok. 10x mniej niż surowa klatka),
+# do limitu max_bytes, i dekodowane przy każdym przebiegu poza pomiarem czasu
+class CalibrationFrames:
+    def __init__(self, source, max_frames, max_bytes=MAX_CAPTURE_MB * 1024 * 1024):
+        self.source = source
+        self.max_frames = max_frames
+        self.captured = None  # Klatki z kamery w JPEG (None - nagranie czytane przy każdym przebiegu)
+        self.shape = None
+        if isinstance(source, str) and os.path.isfile(source):
+            frames = iter(self)
+            first = next(frames, None)
+            frames.close()
+            self.shape = first.shape if first is not None else None
+        else:
+            self.captured = self.capture(max_bytes)
+
+    def open(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            raise IOError(f"Nie można otworzyć źródła: {self.source}")
+        return cap
+
+    def capture(self, max_bytes):
+        cap = self.open()
+        frames = []
+        size = 0
+        while len(frames) < self.max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            self.shape = frame.shape
+            data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, CAPTURE_JPEG_QUALITY])[1]
+            if frames and size + data.nbytes > max_bytes:
+                print(f"Limit pamięci kalibracji: {len(frames)} klatek z kamery", file=sys.stderr)
+                break
+            frames.append(data)
+            size += data.nbytes
+        cap.release()
+        return frames
+
+    def __iter__(self):
+        if self.captured is not None:
+            for data in self.captured:
+                yield cv2.imdecode(data, cv2.IMREAD_COLOR)
+            return
+        cap = self.open()
+        try:
+            for _ in range(self.max_frames):
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield frame
+        finally:
+            cap.release()
+
+def default_clip():
+    if not os.path.isdir(CLIPS_DIR):
+        return None
+    for name in sorted(os.listdir(CLIPS_DIR)):
+        if os.path.splitext(name)[1].lower() in ('.mp4', '.avi', '.mov', '.mkv'):
+            return os.path.join(CLIPS_DIR, name)
+    return None
+
+# Przebieg modelu po klatkach w kolejności nagrania (tryb śledzenia, jak na żywo);
+# czas obejmuje zmniejszenie, konwersję kolorów i pose.process
+def run_candidate(frames, complexity, input_width, min_detection_confidence, min_tracking_confidence):
+    pose = exercise_logic.mp_pose.Pose(model_complexity=complexity,
+                                       min_detection_confidence=min_detection_confidence,
+                                       min_tracking_confidence=min_tracking_confidence)
+    resize = ResizeBuffer(input_width)
+    rgb = RgbBuffer()
+    buffer = LandmarkBuffer()
+    # Pierwsze wywołanie inicjalizuje graf - poza pomiarem
+    frames = iter(frames)
+    first = next(frames)
+    pose.process(rgb.convert(resize.resize(first)))
+    pose.reset()
+
+    points = []
+    times = []
+    missing = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    for frame in itertools.chain((first,), frames):
+        start = time.perf_counter()
+        results = pose.process(rgb.convert(resize.resize(frame)))
+        times.append(time.perf_counter() - start)
+        points.append(buffer.update(results.pose_landmarks.landmark).copy() if results.pose_landmarks else missing)
+    pose.close()
+    points = np.stack(points)
+    times_ms = np.array(times) * 1000.0
+    stats = {
+        "fps": round(len(times) / sum(times), 1),
+        "p95_ms": round(float(np.percentile(times_ms, 95)), 2),
+    }
+    return stats, points
+
+# Zgodność z modelem odniesienia: wykrycie sylwetki i kąty w stawach (stopnie)
+def agreement(points, reference):
+    detected = ~np.isnan(points[:, 0, 0])
+    reference_detected = ~np.isnan(reference[:, 0, 0])
+    both = detected & reference_detected
+    angle_error = None
+    if both.any():
+        diffs = np.abs(joint_angles(points[both], ANGLE_TRIPLETS) - joint_angles(reference[both], ANGLE_TRIPLETS))
+        angle_error = round(float(diffs.mean()), 2)
+    return {
+        "detection_agreement": round(float(np.mean(detected == reference_detected)), 3),
+        "angle_error": angle_error,
+    }
+
+# Najdokładniejsze ustawienie, które utrzymuje docelowy FPS z zapasem; gdy żadne
+# nie wystarcza - najszybsze
+def choose(candidates, target_fps):
+    meeting = [c for c in candidates
+               if c["fps"] >= target_fps * HEADROOM and c["detection_agreement"] >= MIN_DETECTION_AGREEMENT
+               and c["angle_error"] is not None]
+    if meeting:
+        return min(meeting, key=lambda c: (c["angle_error"], -c["fps"]))
+    return max(candidates, key=lambda c: c["fps"])
+
+# frames - CalibrationFrames albo lista klatek
+def calibrate(frames, target_fps, min_detection_confidence=0.5, min_tracking_confidence=0.5, log=print):
+    frame_width = (frames.shape if isinstance(frames, CalibrationFrames) else frames[0].shape)[1]
+    widths = [w for w in INPUT_WIDTHS if w is None or w < frame_width]
+    runs = {}
+    for complexity in COMPLEXITIES:
+        for width in widths:
+            stats, points = run_candidate(frames, complexity, width, min_detection_confidence,
+                                          min_tracking_confidence)
+            runs[(complexity, width)] = (stats, points)
+            log(f"  złożoność {complexity}, wejście {width or frame_width:>4}px: {stats['fps']:6.1f} FPS  "
+                f"p95 {stats['p95_ms']:6.1f} ms")
+
+    reference = runs[REFERENCE][1]
+    candidates = []
+    for (complexity, width), (stats, points) in runs.items():
+        candidate = {"model_complexity": complexity, "input_width": width}
+        candidate.update(stats)
+        candidate.update(agreement(points, reference))
+        candidates.append(candidate)
+    best = choose(candidates, target_fps)
+    settings = {
+        "model_complexity": best["model_complexity"],
+        "input_width": best["input_width"],
+        "min_detection_confidence": min_detection_confidence,
+        "min_tracking_confidence": min_tracking_confidence,
+    }
+    return settings, candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kalibracja modelu Pose dla tego komputera (profil wydajności)')
+    parser.add_argument('--clip', help='Nagranie do kalibracji (domyślnie pierwsze z katalogu clips/ obok skryptów; '
+                                       'repozytorium nie zawiera nagrań - bez nich kamera)')
+    parser.add_argument('--camera', type=int, default=0, help='Indeks kamery, gdy brak nagrania')
+    parser.add_argument('--frames', type=int, default=300, help='Liczba klatek kalibracji')
+    parser.add_argument('--max-memory', type=int, default=MAX_CAPTURE_MB,
+                        help='Limit pamięci (MB) na klatki z kamery; nagranie jest czytane od nowa dla każdego ustawienia')
+    parser.add_argument('--target-fps', type=float, default=30, help='Docelowy FPS pętli ćwiczenia')
+    parser.add_argument('--min-detection-confidence', type=float, default=0.5)
+    parser.add_argument('--min-tracking-confidence', type=float, default=0.5)
+    parser.add_argument('--output', default=DEFAULT_PATH, help='Plik profilu (wpis dla każdego komputera)')
+    args = parser.parse_args()
+
+    source = args.clip or default_clip()
+    if source is None:
+        print(f"Brak nagrania - kalibracja z kamery {args.camera} ({args.frames} klatek), stań w kadrze")
+        source = args.camera
+    try:
+        frames = CalibrationFrames(source, args.frames, args.max_memory * 1024 * 1024)
+    except IOError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if frames.shape is None:
+        print(f"Brak klatek w źródle: {source}", file=sys.stderr)
+        return 1
+
+    count = len(frames.captured) if frames.captured is not None else f"do {args.frames}"
+    print(f"Kalibracja na {count} klatkach {frames.shape[1]}x{frames.shape[0]}:")
+    settings, candidates = calibrate(frames, args.target_fps, args.min_detection_confidence,
+                                     args.min_tracking_confidence)
+    print("Zgodność z modelem odniesienia (złożoność 2, pełna klatka):")
+    for c in candidates:
+        chosen = "  <- wybrane" if (c["model_complexity"], c["input_width"]) == (
+            settings["model_complexity"], settings["input_width"]) else ""
+        angle = f"{c['angle_error']:5.2f}°" if c["angle_error"] is not None else "    -"
+        print(f"  złożoność {c['model_complexity']}, wejście {str(c['input_width'] or 'pełne'):>5}: "
+              f"{c['fps']:6.1f} FPS  błąd kątów {angle}  zgodność wykrycia {c['detection_agreement']:.0%}{chosen}")
+
+    save_profile(args.output, {
+        "fingerprint": host_fingerprint(),
+        "settings": settings,
+        "target_fps": args.target_fps,
+        "source": str(source),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "candidates": candidates,
+    })
+    print(f"Profil zapisany w {args.output}: {settings}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
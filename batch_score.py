@@ -0,0 +1,170 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+import exercise_logic
+from exercise_logic import LandmarkBuffer
+from exercise_rules import EXERCISES, CompiledRules
+from keyframe_inference import KeyframePoseInference
+from pipeline import RgbBuffer
+from roi_inference import RoiPoseInference
+from scoring import ERROR_FLAGS, score_sequence, collect_videos
+
+# Tryb wsadowy (bez okna): ponowne liczenie powtórzeń na nagranych filmach.
+# Pliki są rozdzielane między procesy robocze, każdy z własnym, "rozgrzanym"
+# modelem MediaPipe Pose tworzonym raz na cały czas życia procesu.
+
+# Model Pose procesu roboczego (tworzony w init_worker), opcjonalne wnioskowanie ROI
+# i maksymalny odstęp klatek kluczowych
+pose = None
+roi_inference = None
+rgb = RgbBuffer()
+max_skip = 1
+
+# Funkcja inicjalizująca proces roboczy
+def init_worker(min_detection_confidence, min_tracking_confidence, roi=False, target_fps=30, skip=1,
+                model_complexity=1):
+    global pose, roi_inference, max_skip
+    max_skip = skip
+    # mediapipe importowany dopiero w procesie roboczym, nie przy starcie skryptu
+    pose = exercise_logic.mp_pose.Pose(model_complexity=model_complexity,
+                                       min_detection_confidence=min_detection_confidence,
+                                       min_tracking_confidence=min_tracking_confidence)
+    if roi:
+        roi_inference = RoiPoseInference(pose, target_fps=target_fps)
+
+# Wnioskowanie na jednej klatce (pełna klatka lub wycinek ROI)
+def process_frame(frame):
+    if roi_inference is not None:
+        return roi_inference(frame)
+    return pose.process(rgb.convert(frame))
+
+# Funkcja przetwarzająca jeden plik wideo w procesie roboczym
+def score_video(path, exercise):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Nie można otworzyć pliku: {path}")
+
+    # Nowy plik - czyścimy stan śledzenia z poprzedniego nagrania
+    if roi_inference is not None:
+        roi_inference.reset()
+    else:
+        pose.reset()
+    keyframes = None
+    if max_skip > 1:
+        joints = CompiledRules(EXERCISES[exercise]).angle_triplets
+        keyframes = KeyframePoseInference(process_frame, joints=joints, max_skip=max_skip)
+
+    # Punkty ciała z klatek, w których wykryto sylwetkę
+    landmark_buffer = LandmarkBuffer(EXERCISES[exercise].landmarks)
+    frames_points = []
+    frames = 0
+    width = 0
+    scales = []               # Skala wejścia modelu w kolejnych klatkach (tryb ROI)
+    full_frame_searches = 0   # Klatki przeszukiwane w całości (tryb ROI)
+
+    start = time.perf_counter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames += 1
+        width = frame.shape[1]
+
+        if keyframes is not None:
+            results = keyframes(frame)
+            inference = results.source if results.keyframe else None
+        else:
+            results = inference = process_frame(frame)
+        if roi_inference is not None and inference is not None:
+            scales.append(inference.scale)
+            full_frame_searches += not inference.tracked
+        if results.pose_landmarks:
+            frames_points.append(landmark_buffer.update(results.pose_landmarks.landmark).copy())
+    cap.release()
+
+    if frames_points:
+        reps, error_counts = score_sequence(exercise, np.stack(frames_points), width)
+    else:
+        reps, error_counts = 0, {flag: 0 for flag in ERROR_FLAGS[exercise]}
+    elapsed = time.perf_counter() - start
+
+    row = {
+        "file": path,
+        "exercise": exercise,
+        "reps": reps,
+        "frames": frames,
+        "frames_with_pose": len(frames_points),
+        "seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+    if roi_inference is not None:
+        row["mean_scale"] = round(float(np.mean(scales)), 3) if scales else 0.0
+        row["full_frame_searches"] = full_frame_searches
+    if keyframes is not None:
+        row["keyframes"] = keyframes.keyframes
+    row.update(error_counts)
+    return row
+
+def main():
+    parser = argparse.ArgumentParser(description='Wsadowe liczenie powtórzeń na nagranych filmach (bez okna)')
+    parser.add_argument('inputs', nargs='+', help='Pliki wideo lub katalogi z nagraniami')
+    parser.add_argument('--exercise', choices=sorted(ERROR_FLAGS), required=True, help='Rodzaj ćwiczenia')
+    parser.add_argument('--output', default='-', help='Plik CSV z wynikami (domyślnie standardowe wyjście)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Liczba procesów roboczych')
+    parser.add_argument('--extensions', default='.mp4,.avi,.mov,.mkv', help='Rozszerzenia plików w katalogach')
+    parser.add_argument('--min-detection-confidence', type=float, default=0.5)
+    parser.add_argument('--min-tracking-confidence', type=float, default=0.5)
+    parser.add_argument('--model-complexity', type=int, choices=(0, 1, 2), default=1, help='Złożoność modelu Pose')
+    parser.add_argument('--roi', action='store_true', help='Wnioskowanie na wycinku wokół sylwetki z adaptacyjną skalą')
+    parser.add_argument('--target-fps', type=float, default=30, help='Docelowy FPS dla adaptacyjnej skali (z --roi)')
+    parser.add_argument('--max-skip', type=int, default=1,
+                        help='Maksymalny odstęp klatek kluczowych modelu (1 - model na każdej klatce)')
+    args = parser.parse_args()
+
+    extensions = {ext.strip().lower() for ext in args.extensions.split(',')}
+    videos = collect_videos(args.inputs, extensions)
+    if not videos:
+        parser.error("Nie znaleziono plików wideo")
+
+    fieldnames = ["file", "exercise", "reps", "frames", "frames_with_pose", "seconds", "fps"]
+    fieldnames += ERROR_FLAGS[args.exercise]
+    if args.roi:
+        fieldnames += ["mean_scale", "full_frame_searches"]
+    if args.max_skip > 1:
+        fieldnames.append("keyframes")
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    writer = csv.DictWriter(out, fieldnames=fieldnames)
+    writer.writeheader()
+
+    failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(args.min_detection_confidence, args.min_tracking_confidence,
+                                       args.roi, args.target_fps, args.max_skip,
+                                       args.model_complexity)) as executor:
+        futures = {executor.submit(score_video, path, args.exercise): path for path in videos}
+        for future in as_completed(futures):
+            try:
+                writer.writerow(future.result())
+                out.flush()
+            except Exception as e:
+                # Błąd jednego pliku nie przerywa całej partii
+                failed += 1
+                print(f"Błąd przetwarzania {futures[future]}: {e}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    if out is not sys.stdout:
+        out.close()
+    print(f"Przetworzono {len(videos) - failed}/{len(videos)} plików w {elapsed:.1f}s", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
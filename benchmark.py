@@ -0,0 +1,848 @@
+import argparse
+import ast
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from enum import IntEnum
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+import exercise_logic
+from exercise_logic import (
+    calculate_angle, verify_squat, verify_pushup, hysteresis,
+    LandmarkBuffer, NUM_LANDMARKS, ALL_LANDMARKS,
+    SQUAT_LANDMARKS, PUSHUP_LANDMARKS, LEFT_HIP, LEFT_KNEE, LEFT_ANKLE, LEFT_HEEL, LEFT_FOOT_INDEX
+)
+from exercise_rules import SQUAT, PUSHUP, JUMPING_JACK, CompiledRules, RuleCounter
+from pipeline import RgbBuffer, FramePipeline, AsyncFramePipeline
+from rep_segmentation import RepSegmenter
+from render import SidebarCompositor
+from text_render import TextRenderer
+
+# Benchmarki wydajności w czterech częściach:
+#   micro  - funkcje logiki (kąty, weryfikacja, liczniki) na syntetycznych sekwencjach punktów
+#   stage  - etapy klatki: konwersja kolorów, pose.process, draw_landmarks, składanie sidebara
+#   render - składanie obrazu: dotychczasowe rysowanie vs SidebarCompositor
+#   frame  - ścieżka klatki bez modelu: konwersje kolorów, alokacje i kopie pełnych klatek
+#   e2e    - pełna pętla klatki na krótkich nagraniach (--clips), z podstwa_przysiad2.py jako punktem odniesienia
+#   backends - potok na nagraniach odtwarzanych w tempie kamery: legacy Pose.process w wątkach,
+#            procesy z klatkami w pamięci współdzielonej i asynchroniczny PoseLandmarker
+#            (live_stream, wymaga --model)
+#   startup - start skryptu ćwiczenia w świeżym procesie: --help (czas do argparse),
+#            import silnika i mediapipe, a z nagraniem - otwarcie kamery, model i pierwsza sylwetka
+# Uruchomienie: python benchmark.py [--sections micro,stage,render,e2e] [--output wyniki.json]
+#                                   [--compare poprzednie.json]
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(SCRIPT_DIR, "podstwa_przysiad2.py")
+
+# Typowe napisy sidebara w fazie ćwiczenia - kąt zmienia się co klatkę, licznik co kilkadziesiąt
+def sample_sidebar_messages(i):
+    angle = 90 + 70 * np.sin(i / 15.0)
+    messages = [
+        (f"Squat OK! Angle: {angle:.2f}", (0, 255, 0)),
+        ("Seria: 1/3", (255, 255, 255)),
+        (f"Przysiady: {i // 40}/10", (0, 255, 0)),
+    ]
+    errors = ["Błąd: Kolano wychodzi"] if (i // 25) % 3 == 0 else []
+    return messages, errors
+
+# Dotychczasowe składanie obrazu ze skryptów ćwiczeń (punkt odniesienia)
+def legacy_render(frame, image, messages, errors, sidebar_width=500):
+    height, width, _ = frame.shape
+    main_image = np.zeros((height, width + sidebar_width, 3), dtype=np.uint8)
+    main_image[:, :width] = frame
+    cv2.rectangle(main_image, (width, 0), (width + sidebar_width, height), (40, 40, 40), -1)
+    cv2.rectangle(main_image, (width, 0), (width + sidebar_width, 60), (70, 70, 70), -1)
+    cv2.putText(main_image, "PRZYSIAD", (width + 80, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    main_image[:, :width] = image
+    for i, (msg, color) in enumerate(messages):
+        cv2.putText(main_image, msg, (width + 20, 100 + i * 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+    for i, msg in enumerate(errors):
+        cv2.putText(main_image, msg, (width + 20, 200 + i * 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+    cv2.putText(main_image, "Naciśnij 'q' aby zakończyć", (width + 20, height - 50),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2)
+    return main_image
+
+# Składanie obrazu przez SidebarCompositor
+def make_compositor_render():
+    compositor = SidebarCompositor("PRZYSIAD", 80, sidebar_width=500)
+
+    def render(frame, image, messages, errors):
+        texts = [(msg, (20, 100 + i * 40), 0.7, color, 2) for i, (msg, color) in enumerate(messages)]
+        texts += [(msg, (20, 200 + i * 40), 0.7, (0, 0, 255), 2) for i, msg in enumerate(errors)]
+        return compositor.compose(image, texts)
+    return render
+
+# Funkcja mierząca czas i alokacje na klatkę dla danej funkcji składania obrazu
+def measure_render(render, frames, height, width):
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    inputs = [sample_sidebar_messages(i) for i in range(frames)]
+
+    # Rozgrzewka (pierwsza klatka alokuje płótno i szablon)
+    render(frame, frame, *inputs[0])
+
+    times = []
+    for messages, errors in inputs:
+        start = time.perf_counter()
+        render(frame, frame, messages, errors)
+        times.append(time.perf_counter() - start)
+
+    # Alokacje mierzone w osobnym przebiegu - tracemalloc spowalnia wykonanie
+    tracemalloc.start()
+    peaks = []
+    for messages, errors in inputs[:min(frames, 100)]:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        render(frame, frame, messages, errors)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    times_ms = np.array(times) * 1000.0
+    return {
+        "mean_ms": round(float(times_ms.mean()), 3),
+        "p95_ms": round(float(np.percentile(times_ms, 95)), 3),
+        "alloc_kb_per_frame": round(float(np.mean(peaks)) / 1024.0, 1),
+    }
+
+# --- Ścieżka klatki (bez modelu) ---
+
+# Zastępcze rysowanie punktów ciała (draw_landmarks wymaga MediaPipe)
+def draw_points(image, points_px):
+    for a, b in zip(points_px[:-1], points_px[1:]):
+        cv2.line(image, a, b, (255, 255, 255), 2)
+    for point in points_px:
+        cv2.circle(image, point, 4, (0, 0, 255), -1)
+
+# Dotychczasowa ścieżka: BGR -> RGB dla modelu, RGB -> BGR do rysowania,
+# nowe płótno i dwie kopie obrazu do main_image
+def legacy_frame_path(frame, points_px, messages, errors):
+    image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    image.flags.writeable = False
+    image.flags.writeable = True
+    image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    draw_points(image, points_px)
+    return legacy_render(frame, image, messages, errors)
+
+# Obecna ścieżka: jedna konwersja do bufora RGB, jedna kopia klatki do płótna
+# i rysowanie punktów bezpośrednio w płótnie
+def make_current_frame_path():
+    rgb = RgbBuffer()
+    compositor = SidebarCompositor("PRZYSIAD", 80, sidebar_width=500)
+
+    def path(frame, points_px, messages, errors):
+        rgb.convert(frame)
+        view = compositor.blit(frame)
+        draw_points(view, points_px)
+        texts = [(msg, (20, 100 + i * 40), 0.7, color, 2) for i, (msg, color) in enumerate(messages)]
+        texts += [(msg, (20, 200 + i * 40), 0.7, (0, 0, 255), 2) for i, msg in enumerate(errors)]
+        return compositor.draw_texts(texts)
+    return path
+
+# Czas, liczba konwersji kolorów i alokacje (w pełnych klatkach) na klatkę
+def measure_frame_path(path, frames, height, width):
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    points_px = [(int(x * width), int(y * height)) for x, y, _, _ in synthetic_points(1)[0].tolist()]
+    inputs = [sample_sidebar_messages(i) for i in range(frames)]
+    path(frame, points_px, *inputs[0])
+
+    times = []
+    for messages, errors in inputs:
+        start = time.perf_counter()
+        path(frame, points_px, messages, errors)
+        times.append(time.perf_counter() - start)
+
+    # Konwersje kolorów liczone przez podmianę cv2.cvtColor na czas jednego przebiegu
+    conversions = [0]
+    cvt_color = cv2.cvtColor
+
+    def counting_cvt_color(*args, **kwargs):
+        conversions[0] += 1
+        return cvt_color(*args, **kwargs)
+
+    cv2.cvtColor = counting_cvt_color
+    try:
+        path(frame, points_px, *inputs[1 % frames])
+    finally:
+        cv2.cvtColor = cvt_color
+
+    tracemalloc.start()
+    allocated = []
+    for messages, errors in inputs[:min(frames, 50)]:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        path(frame, points_px, messages, errors)
+        allocated.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    stats = summarize(times)
+    stats["color_conversions"] = conversions[0]
+    stats["frames_allocated"] = round(float(np.mean(allocated)) / frame.nbytes, 2)
+    return stats
+
+def bench_frame_path(frames, height, width):
+    return {
+        "legacy": measure_frame_path(legacy_frame_path, frames, height, width),
+        "current": measure_frame_path(make_current_frame_path(), frames, height, width),
+    }
+
+# Jedna linia sidebara: cv2.putText vs gotowy napis z pamięci podręcznej text_render
+def bench_text(frames):
+    lines = [msg for i in range(4) for msg, _ in sample_sidebar_messages(i)[0]]
+    lines += ["Ćwiczenie zakończone!", "Następna seria: 2/3", "Naciśnij 'q' aby zakończyć"]
+    sidebar = np.zeros((480, 500, 3), dtype=np.uint8)
+    renderer = TextRenderer()
+
+    def put_text():
+        for i, line in enumerate(lines):
+            cv2.putText(sidebar, line, (20, 40 + i * 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+    def cached():
+        for i, line in enumerate(lines):
+            renderer.put_text(sidebar, line, (20, 40 + i * 40), 0.7, (255, 255, 255), 2)
+
+    results = {}
+    for name, fn in (("putText", put_text), ("glyph_cache", cached)):
+        stats = measure(fn, frames)
+        results[name] = {key: round(value / len(lines), 6) for key, value in stats.items()}
+    results["glyph_cache"].update(renderer.stats())
+    return results
+
+def bench_render(frames, height, width):
+    return {
+        "legacy": measure_render(legacy_render, frames, height, width),
+        "compositor": measure_render(make_compositor_render(), frames, height, width),
+    }
+
+# Statystyki czasów (w milisekundach)
+def summarize(times):
+    times_ms = np.array(times) * 1000.0
+    return {
+        "mean_ms": round(float(times_ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(times_ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(times_ms, 95)), 4),
+    }
+
+# Pomiar funkcji bez argumentów: rozgrzewka, potem repeat wywołań
+def measure(fn, repeat, warmup=3):
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return summarize(times)
+
+# Pomiar funkcji przetwarzającej całą sekwencję - wynik w przeliczeniu na klatkę
+def measure_per_frame(fn, frames, repeat):
+    stats = measure(fn, repeat, warmup=1)
+    return {key: round(value / frames, 6) for key, value in stats.items()}
+
+
+# --- Punkt odniesienia: funkcje z podstwa_przysiad2.py ---
+
+# Indeksy punktów używane przez funkcje skryptu bazowego (jak mp_pose.PoseLandmark)
+BASELINE_POSE = SimpleNamespace(PoseLandmark=IntEnum("PoseLandmark", {
+    "LEFT_HIP": LEFT_HIP, "LEFT_KNEE": LEFT_KNEE, "LEFT_ANKLE": LEFT_ANKLE,
+    "LEFT_HEEL": LEFT_HEEL, "LEFT_FOOT_INDEX": LEFT_FOOT_INDEX,
+}))
+
+def imports_mediapipe(node):
+    if isinstance(node, ast.ImportFrom):
+        return (node.module or "").split(".")[0] == "mediapipe"
+    return any(alias.name.split(".")[0] == "mediapipe" for alias in node.names)
+
+# Skrypt bazowy uruchamia kamerę przy imporcie, więc wczytujemy z niego tylko
+# importy i definicje funkcji (bez kodu na poziomie modułu). Funkcje potrzebują
+# z mediapipe tylko indeksów punktów, więc mikrobenchmarki działają bez importu mediapipe
+def load_baseline(path=BASELINE_PATH):
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    tree.body = [node for node in tree.body
+                 if isinstance(node, ast.FunctionDef)
+                 or (isinstance(node, (ast.Import, ast.ImportFrom)) and not imports_mediapipe(node))]
+    namespace = {"mp_pose": BASELINE_POSE}
+    exec(compile(tree, path, "exec"), namespace)
+    return namespace
+
+
+# --- Syntetyczne dane ---
+
+# Punkt ciała o interfejsie NormalizedLandmark z MediaPipe
+class SyntheticLandmark:
+    __slots__ = ("x", "y", "z", "visibility")
+
+    def __init__(self, x, y, z, visibility):
+        self.x, self.y, self.z, self.visibility = x, y, z, visibility
+
+# Sekwencja (T, 33, 4) - przysiady: kąt w kolanie oscyluje między ~80 a ~170 stopni,
+# pozostałe punkty drgają wokół losowych położeń
+def synthetic_points(frames, seed=0):
+    rng = np.random.default_rng(seed)
+    points = np.empty((frames, NUM_LANDMARKS, 4), dtype=np.float32)
+    t = np.arange(frames, dtype=np.float32)[:, None]
+    points[..., :3] = rng.uniform(0.3, 0.7, (NUM_LANDMARKS, 3)) + 0.02 * np.sin(t / 7.0 + rng.uniform(0, 6.28, NUM_LANDMARKS))[..., None]
+    points[..., 3] = 0.9
+    angle = np.radians(125 + 45 * np.cos(t[:, 0] * 2 * np.pi / 60))
+    points[:, LEFT_KNEE, :2] = (0.5, 0.6)
+    points[:, LEFT_HIP, :2] = (0.5, 0.4)
+    points[:, LEFT_ANKLE, 0] = 0.5 + 0.2 * np.sin(angle)
+    points[:, LEFT_ANKLE, 1] = 0.6 - 0.2 * np.cos(angle)
+    return points
+
+def as_landmark_lists(points):
+    return [[SyntheticLandmark(*lm) for lm in frame.tolist()] for frame in points]
+
+
+# --- Mikrobenchmarki logiki ---
+
+def bench_micro(frames, repeat):
+    baseline = load_baseline()
+    points = synthetic_points(frames)
+    landmark_lists = as_landmark_lists(points)
+    triplets = [(frame[LEFT_HIP][:2], frame[LEFT_KNEE][:2], frame[LEFT_ANKLE][:2]) for frame in points.tolist()]
+
+    def angles_baseline():
+        for a, b, c in triplets:
+            baseline["calculate_angle"](a, b, c)
+
+    def angles_current():
+        for a, b, c in triplets:
+            calculate_angle(a, b, c)
+
+    def squat_baseline():
+        for landmarks in landmark_lists:
+            baseline["verify_squat"](landmarks)
+
+    squat_buffer = LandmarkBuffer(SQUAT_LANDMARKS)
+
+    def squat_per_frame():
+        for landmarks in landmark_lists:
+            verify_squat(squat_buffer.update(landmarks))
+
+    pushup_buffer = LandmarkBuffer(PUSHUP_LANDMARKS)
+
+    def pushup_per_frame():
+        for landmarks in landmark_lists:
+            verify_pushup(pushup_buffer.update(landmarks))
+
+    # Liczniki powtórzeń: RuleCounter klatka po klatce kontra histereza na całej sekwencji
+    def counter_benches(rules):
+        values = rules.evaluate(points, 640)
+        per_frame = [dict(zip(values, row)) for row in zip(*(v.tolist() for v in values.values()))]
+
+        def loop():
+            counter = RuleCounter(rules)
+            for frame_values in per_frame:
+                counter.update(frame_values)
+
+        def vectorized():
+            hysteresis(rules.check(rules.enter, values), rules.check(rules.leave, values))
+        return loop, vectorized
+
+    squat_counter_loop, squat_counter_vectorized = counter_benches(CompiledRules(SQUAT))
+    jumping_jack_counter_loop, jumping_jack_counter_vectorized = counter_benches(CompiledRules(JUMPING_JACK))
+
+    # Skompilowane reguły (exercise_rules) - tak liczy silnik ćwiczeń
+    squat_rules = CompiledRules(SQUAT)
+    pushup_rules = CompiledRules(PUSHUP)
+
+    def rules_per_frame(rules, buffer):
+        def run():
+            counter = RuleCounter(rules)
+            for landmarks in landmark_lists:
+                values = rules.evaluate(buffer.update(landmarks), 640)
+                counter.update(values)
+                rules.error_flags(values, counter.position)
+        return run
+
+    # Podział na powtórzenia z rekordami tempa i zakresu (rep_segmentation)
+    def segmenter_per_frame(rules, buffer):
+        def run():
+            segmenter = RepSegmenter(rules)
+            for i, landmarks in enumerate(landmark_lists):
+                segmenter.update(rules.evaluate(buffer.update(landmarks), 640), i / 30.0)
+        return run
+
+    benches = {
+        "calculate_angle/baseline": angles_baseline,
+        "calculate_angle/current": angles_current,
+        "verify_squat/baseline": squat_baseline,
+        "verify_squat/per_frame": squat_per_frame,
+        "verify_squat/sequence": lambda: verify_squat(points),
+        "verify_pushup/per_frame": pushup_per_frame,
+        "verify_pushup/sequence": lambda: verify_pushup(points),
+        "squat_counter/loop": squat_counter_loop,
+        "squat_counter/vectorized": squat_counter_vectorized,
+        "jumping_jack_counter/loop": jumping_jack_counter_loop,
+        "jumping_jack_counter/vectorized": jumping_jack_counter_vectorized,
+        "rules_squat/per_frame": rules_per_frame(squat_rules, squat_buffer),
+        "rules_squat/sequence": lambda: squat_rules.score(points, 640),
+        "rules_squat/segmenter": segmenter_per_frame(squat_rules, squat_buffer),
+        "rules_pushup/per_frame": rules_per_frame(pushup_rules, pushup_buffer),
+        "rules_pushup/sequence": lambda: pushup_rules.score(points, 640),
+    }
+    return {name: measure_per_frame(fn, frames, repeat) for name, fn in benches.items()}
+
+
+# --- Klatki z nagrań ---
+
+# Funkcja zbierająca nagrania (pliki lub katalogi)
+def collect_clips(paths):
+    clips = []
+    for path in paths:
+        if os.path.isdir(path):
+            clips += [os.path.join(path, name) for name in sorted(os.listdir(path))
+                      if os.path.splitext(name)[1].lower() in ('.mp4', '.avi', '.mov', '.mkv')]
+        elif os.path.isfile(path):
+            clips.append(path)
+    return clips
+
+# Klatki nagrania wczytane do pamięci - dekodowanie nie wlicza się do pomiarów
+def read_frames(path, max_frames):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+# --- Etapy klatki ---
+
+def bench_stages(frame, repeat):
+    from mediapipe.framework.formats import landmark_pb2
+    mp_pose = exercise_logic.mp_pose
+    mp_drawing = exercise_logic.mp_drawing
+
+    height, width = frame.shape[:2]
+    pose = mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    results = pose.process(rgb)
+    landmarks = results.pose_landmarks
+    if landmarks is None:
+        # Brak sylwetki w klatce - rysujemy punkty syntetyczne
+        landmarks = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z, visibility in synthetic_points(1)[0].tolist():
+            landmarks.landmark.add(x=x, y=y, z=z, visibility=visibility)
+
+    canvas = frame.copy()
+    compositor = SidebarCompositor("PRZYSIAD", 80, sidebar_width=500)
+    texts = [("Seria: 1/3", (20, 100), 0.7, (255, 255, 255), 2)]
+
+    def compose():
+        texts.append((f"Przysiady: {len(texts)}/10", (20, 140), 0.7, (0, 255, 0), 2))
+        compositor.compose(canvas, texts[-2:])
+
+    stats = {
+        "cvtColor": measure(lambda: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), repeat),
+        # Ten sam obraz w każdym wywołaniu - model pracuje w trybie śledzenia, jak w pętli na żywo
+        "pose.process": measure(lambda: pose.process(rgb), repeat),
+        "draw_landmarks": measure(lambda: mp_drawing.draw_landmarks(canvas, landmarks, mp_pose.POSE_CONNECTIONS),
+                                  repeat),
+        "sidebar_compose": measure(compose, repeat),
+    }
+    pose.close()
+    stats["resolution"] = f"{width}x{height}"
+    return stats
+
+
+# --- Pełna pętla klatki ---
+
+# Pętla z podstwa_przysiad2.py bez okna: dwie konwersje kolorów, rysowanie na
+# obrazie, weryfikacja na obiektach punktów i napisy putText
+def make_baseline_loop(pose, baseline):
+    mp_pose = exercise_logic.mp_pose
+    mp_drawing = exercise_logic.mp_drawing
+    state = {"count": 0, "position": False}
+
+    def step(frame):
+        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image.flags.writeable = False
+        results = pose.process(image)
+        image.flags.writeable = True
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        if results.pose_landmarks:
+            mp_drawing.draw_landmarks(image, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+            squat_success, angle, knee_error, heel_error = baseline["verify_squat"](results.pose_landmarks.landmark)
+            if squat_success and angle < 90 and not state["position"]:
+                state["position"] = True
+            elif state["position"] and angle > 160:
+                state["position"] = False
+                state["count"] += 1
+            cv2.putText(image, f"Squat OK! Angle: {angle:.2f}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            cv2.putText(image, f"Squats: {state['count']}", (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        return image
+    return step, state
+
+# Wyświetlanie silnika ćwiczeń (jak Workout.step, bez okna) dla klatki i wyniku modelu
+def make_engine_display():
+    mp_pose = exercise_logic.mp_pose
+    mp_drawing = exercise_logic.mp_drawing
+    rules = CompiledRules(SQUAT)
+    counter = RuleCounter(rules)
+    buffer = LandmarkBuffer(SQUAT.landmarks)
+    compositor = SidebarCompositor("PRZYSIAD", 80, sidebar_width=500)
+    state = {"count": 0}
+
+    def display(frame, results):
+        texts = []
+        view = compositor.blit(frame)
+        if results.pose_landmarks:
+            mp_drawing.draw_landmarks(view, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+            values = rules.evaluate(buffer.update(results.pose_landmarks.landmark), frame.shape[1])
+            counter.update(values)
+            rules.error_flags(values, counter.position)
+            state["count"] = counter.count
+        texts.append((f"Przysiady: {counter.count}/10", (20, 140), 0.7, (0, 255, 0), 2))
+        return compositor.draw_texts(texts)
+    return display, state
+
+# Pętla silnika bez potoku wątków; infer - funkcja wnioskowania: pełna klatka, ROI lub klatki kluczowe
+def make_engine_loop(infer):
+    display, state = make_engine_display()
+
+    def step(frame):
+        return display(frame, infer(frame))
+    return step, state
+
+def run_loop(step, state, frames):
+    times = []
+    for frame in frames:
+        start = time.perf_counter()
+        step(frame)
+        times.append(time.perf_counter() - start)
+    stats = summarize(times)
+    stats["fps"] = round(len(times) / sum(times), 2) if times else 0.0
+    stats["reps"] = state["count"]
+    return stats
+
+def bench_e2e(clips, max_frames):
+    from keyframe_inference import KeyframePoseInference
+    from roi_inference import RoiPoseInference
+    baseline = load_baseline()
+    results = {}
+    for clip in clips:
+        frames = read_frames(clip, max_frames)
+        if not frames:
+            continue
+        pose = exercise_logic.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+        rgb = RgbBuffer()
+
+        def full_frame(frame):
+            return pose.process(rgb.convert(frame))
+
+        variants = {
+            "baseline": lambda: make_baseline_loop(pose, baseline),
+            "engine": lambda: make_engine_loop(full_frame),
+            "engine_roi": lambda: make_engine_loop(RoiPoseInference(pose)),
+            "engine_keyframes": lambda: make_engine_loop(KeyframePoseInference(full_frame, joints=CompiledRules(SQUAT).angle_triplets)),
+        }
+        clip_results = {}
+        for name, make_loop in variants.items():
+            # Każdy wariant zaczyna od czystego stanu śledzenia modelu
+            pose.reset()
+            clip_results[name] = run_loop(*make_loop(), frames)
+        clip_results["frames"] = len(frames)
+        clip_results["resolution"] = f"{frames[0].shape[1]}x{frames[0].shape[0]}"
+        pose.close()
+        results[os.path.basename(clip)] = clip_results
+    return results
+
+
+# --- Backendy wnioskowania w potoku wątków ---
+
+# Nagranie w pamięci odtwarzane w tempie kamery (interfejs cv2.VideoCapture)
+class PacedCapture:
+    def __init__(self, frames, fps):
+        self.frames = frames
+        self.interval = 1.0 / fps
+        self.index = 0
+        self.next_time = None
+
+    def read(self):
+        if self.index >= len(self.frames):
+            return False, None
+        now = time.perf_counter()
+        if self.next_time is None:
+            self.next_time = now
+        elif now < self.next_time:
+            time.sleep(self.next_time - now)
+        self.next_time += self.interval
+        frame = self.frames[self.index]
+        self.index += 1
+        return True, frame
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        pass
+
+# Pętla wyświetlania jak w Workout.run: najnowszy wynik, opóźnienie przechwycenie -> wyświetlenie
+def run_pipeline(pipeline, display, state):
+    latencies = []
+    start = time.perf_counter()
+    pipeline.start()
+    try:
+        while pipeline.running:
+            item = pipeline.get()
+            if item is None:
+                continue
+            display(item.frame, item.result)
+            pipeline.mark_displayed(item)
+            latencies.append(pipeline.last_latency_ms)
+    finally:
+        pipeline.stop()
+    elapsed = time.perf_counter() - start
+    if pipeline.error is not None:
+        raise pipeline.error
+    latencies.sort()
+    stats = pipeline.stats()
+    stats["fps"] = round(len(latencies) / elapsed, 2)
+    stats["latency_p50_ms"] = round(latencies[len(latencies) // 2], 2) if latencies else 0.0
+    stats["latency_p95_ms"] = round(latencies[int(len(latencies) * 0.95)], 2) if latencies else 0.0
+    stats["dropped"] = pipeline.dropped
+    stats["reps"] = state["count"]
+    return stats
+
+def bench_backends(clips, max_frames, model_path):
+    from live_stream_inference import LiveStreamPoseInference
+    from shared_frames import ProcessFramePipeline
+    results = {}
+    for clip in clips:
+        cap = cv2.VideoCapture(clip)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        cap.release()
+        frames = read_frames(clip, max_frames)
+        if not frames:
+            continue
+        clip_results = {}
+
+        pose = exercise_logic.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        rgb = RgbBuffer()
+        display, state = make_engine_display()
+        pipeline = FramePipeline(PacedCapture(frames, fps), lambda frame: pose.process(rgb.convert(frame)))
+        clip_results["legacy"] = run_pipeline(pipeline, display, state)
+        pose.close()
+
+        # Przechwytywanie (dekodowanie całego nagrania) i model w osobnych procesach
+        pipeline = ProcessFramePipeline(clip, realtime=True).launch()
+        display, state = make_engine_display()
+        try:
+            clip_results["processes"] = run_pipeline(pipeline, display, state)
+        finally:
+            pipeline.shutdown()
+
+        if model_path and os.path.exists(model_path):
+            backend = LiveStreamPoseInference(model_path)
+            display, state = make_engine_display()
+            pipeline = AsyncFramePipeline(PacedCapture(frames, fps), backend)
+            clip_results["live_stream"] = run_pipeline(pipeline, display, state)
+            backend.close()
+        else:
+            print(f"Backend live_stream pominięty: brak modelu {model_path}", file=sys.stderr)
+
+        clip_results["frames"] = len(frames)
+        clip_results["source_fps"] = round(fps, 2)
+        results[os.path.basename(clip)] = clip_results
+    return results
+
+
+# --- Start skryptów ćwiczeń ---
+
+# Czas działania polecenia w świeżym procesie; None, gdy polecenie się nie powiodło
+def run_process(command, runs):
+    times = []
+    outputs = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run(command, cwd=SCRIPT_DIR, capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines() or [f"kod {completed.returncode}"]
+            print(f"Start: {' '.join(command)} zakończone błędem: {error[-1]}", file=sys.stderr)
+            return None, []
+        outputs.append(completed.stdout)
+    return summarize(times), outputs
+
+def bench_startup(clips, runs):
+    script = os.path.join(SCRIPT_DIR, "przysiad.py")
+    commands = {
+        "interpreter": [sys.executable, "-c", "pass"],
+        "import_engine": [sys.executable, "-c", "import exercise_engine"],
+        # Koszt odroczony do wątku ładowania modelu
+        "import_mediapipe": [sys.executable, "-c", "import mediapipe; mediapipe.solutions.pose"],
+        "help": [sys.executable, script, "--help"],
+    }
+    if clips:
+        commands["first_landmark"] = [sys.executable, script, "--startup-check", "--prep-time", "0",
+                                      "--camera", os.path.abspath(clips[0])]
+    results = {}
+    for name, command in commands.items():
+        stats, outputs = run_process(command, runs)
+        if stats is None:
+            continue
+        if name == "first_landmark":
+            # Etapy startu zgłoszone przez skrypt (od startu zasobów, zaraz po argparse)
+            stages = [json.loads(output.strip().splitlines()[-1]) for output in outputs]
+            for stage in stages[0]:
+                values = [s[stage] for s in stages if stage in s]
+                stats[f"{stage}_ms"] = round(float(np.median(values)) * 1000.0, 1)
+        results[name] = stats
+    return results
+
+
+# --- Zapis i porównanie wyników ---
+
+def environment():
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+# Spłaszczenie zagnieżdżonych wyników do {"sekcja/nazwa/miara": wartość}
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+# Regresje: czasy (*_ms) wyższe lub FPS niższe od poprzedniego przebiegu o więcej niż tolerance
+def compare(current, previous, tolerance):
+    regressions = []
+    old = flatten(previous.get("results", {}))
+    for name, value in flatten(current["results"]).items():
+        if name not in old or not old[name]:
+            continue
+        change = (value - old[name]) / old[name]
+        if (name.endswith("_ms") and change > tolerance) or (name.endswith("/fps") and change < -tolerance):
+            regressions.append((name, old[name], value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarki FitDetector')
+    parser.add_argument('--sections', default='micro,stage,render,frame,e2e,startup',
+                        help='Części do uruchomienia, oddzielone przecinkami '
+                             '(micro, stage, render, frame, e2e, backends, startup)')
+    parser.add_argument('--frames', type=int, default=500, help='Liczba klatek na pomiar')
+    parser.add_argument('--repeat', type=int, default=20, help='Liczba powtórzeń pomiarów micro i stage')
+    parser.add_argument('--resolution', default='1280x720', help='Rozdzielczość klatki SZEROKOŚĆxWYSOKOŚĆ')
+    parser.add_argument('--clips', nargs='*', default=['clips'], help='Krótkie nagrania (pliki lub katalogi) do e2e')
+    parser.add_argument('--startup-runs', type=int, default=5, help='Liczba uruchomień procesu w części startup')
+    parser.add_argument('--model', default='pose_landmarker_full.task',
+                        help='Model PoseLandmarker (.task) dla backendu live_stream w części backends')
+    parser.add_argument('--output', help='Plik JSON z wynikami')
+    parser.add_argument('--compare', help='Plik JSON z poprzedniego przebiegu do wykrywania regresji')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Dopuszczalne pogorszenie (ułamek) przy --compare')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.lower().split('x'))
+    sections = [name.strip() for name in args.sections.split(',')]
+    clips = collect_clips(args.clips)
+    report = {"environment": environment(), "results": {}}
+    results = report["results"]
+
+    if "micro" in sections:
+        results["micro"] = bench_micro(args.frames, args.repeat)
+        print(f"Mikrobenchmarki ({args.frames} klatek, czas na klatkę):")
+        for name, stats in results["micro"].items():
+            print(f"  {name:<34} średnio {stats['mean_ms'] * 1000:9.2f} us  p95 {stats['p95_ms'] * 1000:9.2f} us")
+
+    if "stage" in sections:
+        # Klatka z pierwszego nagrania (z sylwetką), a bez nagrań - losowy obraz
+        frames = read_frames(clips[0], 1) if clips else []
+        frame = frames[0] if frames else np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+        results["stage"] = bench_stages(frame, args.repeat)
+        print(f"Etapy klatki ({results['stage']['resolution']}):")
+        for name, stats in results["stage"].items():
+            if isinstance(stats, dict):
+                print(f"  {name:<16} średnio {stats['mean_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms")
+
+    if "render" in sections:
+        results["render"] = bench_render(args.frames, height, width)
+        print(f"Składanie obrazu {width}x{height} ({args.frames} klatek):")
+        for name, stats in results["render"].items():
+            print(f"  {name:<11} średnio {stats['mean_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms  "
+                  f"alokacje {stats['alloc_kb_per_frame']:8.1f} KB/klatkę")
+        results["text"] = bench_text(args.frames)
+        print("Napis w sidebarze (na linię):")
+        for name, stats in results["text"].items():
+            print(f"  {name:<11} średnio {stats['mean_ms'] * 1000:7.1f} us  p95 {stats['p95_ms'] * 1000:7.1f} us")
+
+    if "frame" in sections:
+        results["frame"] = bench_frame_path(args.frames, height, width)
+        print(f"Ścieżka klatki {width}x{height} (bez modelu):")
+        for name, stats in results["frame"].items():
+            print(f"  {name:<8} średnio {stats['mean_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms  "
+                  f"konwersje {stats['color_conversions']}  alokacje {stats['frames_allocated']:.2f} klatki")
+
+    if "e2e" in sections:
+        if clips:
+            results["e2e"] = bench_e2e(clips, args.frames)
+            for clip, variants in results["e2e"].items():
+                print(f"Pełna pętla: {clip} ({variants['frames']} klatek, {variants['resolution']}):")
+                for name, stats in variants.items():
+                    if isinstance(stats, dict):
+                        print(f"  {name:<17} {stats['fps']:7.1f} FPS  p50 {stats['p50_ms']:7.2f} ms  "
+                              f"p95 {stats['p95_ms']:7.2f} ms  powtórzenia {stats['reps']}")
+        else:
+            print("Pełna pętla: brak nagrań (podaj --clips)", file=sys.stderr)
+
+    if "backends" in sections:
+        if clips:
+            results["backends"] = bench_backends(clips, args.frames, args.model)
+            for clip, variants in results["backends"].items():
+                print(f"Backendy: {clip} ({variants['frames']} klatek, {variants['source_fps']} FPS źródła):")
+                for name, stats in variants.items():
+                    if isinstance(stats, dict):
+                        print(f"  {name:<12} {stats['fps']:7.1f} FPS  opóźnienie p50 {stats['latency_p50_ms']:7.2f} ms  "
+                              f"p95 {stats['latency_p95_ms']:7.2f} ms  pominięte {stats['dropped']}  "
+                              f"powtórzenia {stats['reps']}")
+        else:
+            print("Backendy: brak nagrań (podaj --clips)", file=sys.stderr)
+
+    if "startup" in sections:
+        results["startup"] = bench_startup(clips, args.startup_runs)
+        print(f"Start skryptu ćwiczenia ({args.startup_runs} uruchomień, czas procesu):")
+        for name, stats in results["startup"].items():
+            stages = "  ".join(f"{key[:-3]} {value:.0f} ms" for key, value in stats.items()
+                               if key not in ("mean_ms", "p50_ms", "p95_ms"))
+            print(f"  {name:<16} p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  {stages}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for name, old, new, change in regressions:
+            print(f"REGRESJA {name}: {old} -> {new} ({change:+.0%})", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from batch_score import init_worker, score_video
+from scoring import ERROR_FLAGS
+
+# Ocena dokładności i szybkości liczenia na opisanych nagraniach. Manifest (CSV)
+# podaje dla każdego nagrania ćwiczenie, prawdziwą liczbę powtórzeń i - opcjonalnie -
+# liczbę wystąpień błędów formy (kolumny o nazwach flag, np. knee_error; puste pole -
+# brak etykiety). Każdy tryb wydajności jest liczony na tych samych nagraniach
+# w procesach roboczych (batch_score), a wyniki są zestawiane obok siebie:
+#   python evaluate.py etykiety.csv --modes full,skip2,skip4,roi,complexity0,complexity2
+#
+#   file,exercise,reps,knee_error,heel_error
+#   nagrania/przysiady_01.mp4,przysiady,12,2,0
+
+DEFAULT_MODES = "full,skip2,skip4,roi,complexity0,complexity2"
+
+
+# Tryb: części połączone "+", np. roi+skip2 - full, roi, skipN (klatki kluczowe), complexityN (0-2)
+def parse_mode(spec):
+    options = {"roi": False, "skip": 1, "model_complexity": 1}
+    for part in spec.split('+'):
+        if part == "full":
+            continue
+        if part == "roi":
+            options["roi"] = True
+        elif part.startswith("skip") and part[4:].isdigit() and int(part[4:]) >= 1:
+            options["skip"] = int(part[4:])
+        elif part.startswith("complexity") and part[10:] in ("0", "1", "2"):
+            options["model_complexity"] = int(part[10:])
+        else:
+            raise argparse.ArgumentTypeError(f"Nieznany tryb: {part} (full, roi, skipN, complexity0-2)")
+    return options
+
+def parse_modes(value):
+    return {spec.strip(): parse_mode(spec.strip()) for spec in value.split(',') if spec.strip()}
+
+# Manifest z etykietami; ścieżki względne liczone od katalogu manifestu
+def load_manifest(path):
+    base = os.path.dirname(os.path.abspath(path))
+    clips = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            exercise = row["exercise"]
+            if exercise not in ERROR_FLAGS:
+                raise ValueError(f"{path}:{line}: nieznane ćwiczenie {exercise}")
+            errors = {flag: int(row[flag]) for flag in ERROR_FLAGS[exercise]
+                      if (row.get(flag) or "").strip()}
+            clips.append({
+                "file": os.path.join(base, row["file"]),
+                "exercise": exercise,
+                "reps": int(row["reps"]),
+                "errors": errors,
+            })
+    return clips
+
+
+# Jeden tryb: wszystkie nagrania w puli procesów z modelem ustawionym dla trybu
+def run_mode(clips, options, workers, min_detection_confidence, min_tracking_confidence, target_fps):
+    rows = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(min_detection_confidence, min_tracking_confidence, options["roi"],
+                                       target_fps, options["skip"], options["model_complexity"])) as executor:
+        futures = {executor.submit(score_video, clip["file"], clip["exercise"]): clip["file"] for clip in clips}
+        for future in as_completed(futures):
+            try:
+                rows[futures[future]] = future.result()
+            except Exception as e:
+                # Błąd jednego pliku nie przerywa oceny
+                print(f"Błąd przetwarzania {futures[future]}: {e}", file=sys.stderr)
+    return rows, time.perf_counter() - start
+
+# Precyzja i czułość z liczby wystąpień: trafienia to mniejsza z liczb wykrytych i oznaczonych
+def precision_recall(tp, fp, fn):
+    return {
+        "precision": round(tp / (tp + fp), 3) if tp + fp else None,
+        "recall": round(tp / (tp + fn), 3) if tp + fn else None,
+    }
+
+def score_mode(clips, rows, wall_seconds):
+    differences = []
+    by_exercise = {}
+    flags = {}  # flaga -> [tp, fp, fn]
+    frames = 0
+    seconds = 0.0
+    for clip in clips:
+        row = rows.get(clip["file"])
+        if row is None:
+            continue
+        difference = row["reps"] - clip["reps"]
+        differences.append(difference)
+        by_exercise.setdefault(clip["exercise"], []).append(abs(difference))
+        for flag, expected in clip["errors"].items():
+            detected = row[flag]
+            counts = flags.setdefault(flag, [0, 0, 0])
+            counts[0] += min(detected, expected)
+            counts[1] += max(detected - expected, 0)
+            counts[2] += max(expected - detected, 0)
+        frames += row["frames"]
+        seconds += row["seconds"]
+
+    differences = np.array(differences)
+    return {
+        "clips": len(differences),
+        "failed": len(clips) - len(differences),
+        "count_mae": round(float(np.abs(differences).mean()), 3) if len(differences) else None,
+        "count_bias": round(float(differences.mean()), 3) if len(differences) else None,
+        "count_exact": round(float(np.mean(differences == 0)), 3) if len(differences) else None,
+        "count_mae_by_exercise": {name: round(float(np.mean(errors)), 3) for name, errors in by_exercise.items()},
+        "errors": {flag: precision_recall(*counts) for flag, counts in sorted(flags.items())},
+        # FPS jednego procesu (czas nagrań w procesach roboczych) i przepustowość całej puli
+        "fps": round(frames / seconds, 2) if seconds > 0 else 0.0,
+        "throughput_fps": round(frames / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+    }
+
+# Regresje: tryb liczy gorzej od pierwszego (odniesienia) o więcej niż tolerance powtórzenia
+def find_regressions(results, tolerance):
+    names = list(results)
+    reference = results[names[0]]["count_mae"]
+    if reference is None:
+        return []
+    return [name for name in names[1:]
+            if results[name]["count_mae"] is not None and results[name]["count_mae"] > reference + tolerance]
+
+def format_ratio(value):
+    return "   -" if value is None else f"{value:4.2f}"
+
+def print_report(results, regressions):
+    flags = sorted(set().union(*(metrics["errors"] for metrics in results.values())))
+    header = f"{'tryb':<22} {'MAE':>6} {'trafne':>7} {'bias':>6} {'FPS':>8} {'pula FPS':>9}"
+    header += "".join(f"  {flag + ' P/R':>22}" for flag in flags)
+    print(header)
+    for name, metrics in results.items():
+        mae = "     -" if metrics["count_mae"] is None else f"{metrics['count_mae']:6.2f}"
+        exact = "      -" if metrics["count_exact"] is None else f"{metrics['count_exact']:7.0%}"
+        bias = "     -" if metrics["count_bias"] is None else f"{metrics['count_bias']:+6.2f}"
+        line = f"{name:<22} {mae} {exact} {bias} {metrics['fps']:8.1f} {metrics['throughput_fps']:9.1f}"
+        for flag in flags:
+            pr = metrics["errors"].get(flag, {"precision": None, "recall": None})
+            line += f"  {format_ratio(pr['precision']) + ' / ' + format_ratio(pr['recall']):>22}"
+        if metrics["failed"]:
+            line += f"  (błędy: {metrics['failed']})"
+        if name in regressions:
+            line += "  REGRESJA"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ocena dokładności i szybkości liczenia na opisanych nagraniach')
+    parser.add_argument('manifest', help='CSV z kolumnami file, exercise, reps i opcjonalnie flagami błędów')
+    parser.add_argument('--modes', type=parse_modes, default=parse_modes(DEFAULT_MODES),
+                        help=f'Tryby wydajności oddzielone przecinkami, pierwszy jest odniesieniem '
+                             f'(domyślnie {DEFAULT_MODES})')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Liczba procesów roboczych')
+    parser.add_argument('--min-detection-confidence', type=float, default=0.5)
+    parser.add_argument('--min-tracking-confidence', type=float, default=0.5)
+    parser.add_argument('--target-fps', type=float, default=30, help='Docelowy FPS dla adaptacyjnej skali (tryb roi)')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Dopuszczalny wzrost średniego błędu liczby powtórzeń względem odniesienia')
+    parser.add_argument('--output', help='Plik JSON z metrykami trybów i wynikami każdego nagrania')
+    args = parser.parse_args()
+
+    try:
+        clips = load_manifest(args.manifest)
+    except (OSError, KeyError, ValueError) as e:
+        parser.error(f"Niepoprawny manifest: {e}")
+    if not clips:
+        parser.error("Manifest nie zawiera nagrań")
+
+    results = {}
+    per_clip = {}
+    for name, options in args.modes.items():
+        print(f"Tryb {name}: {len(clips)} nagrań...", file=sys.stderr)
+        rows, wall_seconds = run_mode(clips, options, args.workers, args.min_detection_confidence,
+                                      args.min_tracking_confidence, args.target_fps)
+        results[name] = score_mode(clips, rows, wall_seconds)
+        per_clip[name] = [rows[clip["file"]] for clip in clips if clip["file"] in rows]
+
+    regressions = find_regressions(results, args.tolerance)
+    print_report(results, regressions)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"modes": results, "clips": per_clip, "labels": clips}, f, indent=2, ensure_ascii=False)
+    failed = any(metrics["failed"] for metrics in results.values())
+    return 1 if regressions or failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
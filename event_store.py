@@ -0,0 +1,352 @@
+import argparse
+import getpass
+import json
+import os
+import queue
+import random
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+from events import REP, STATE, FORM_ERROR, SUMMARY
+
+# Trwały zapis zdarzeń treningu w lokalnej bazie SQLite. Zdarzenia (powtórzenia,
+# przejścia serii, błędy formy, podsumowania) są tylko dopisywane do tabeli events,
+# a zapisuje je wątek w tle partiami (jedna transakcja na partię) - pętla klatek
+# jedynie wkłada zdarzenie do kolejki. W tej samej transakcji aktualizowana jest
+# tabela dzienna daily (dzień x użytkownik x stanowisko x ćwiczenie), więc zapytania
+# zbiorcze czytają po jednym wierszu na dzień zamiast milionów powtórzeń.
+# Przykłady:
+#   python event_store.py --by day --user jan               - domyślna baza aplikacji
+#   python event_store.py /tmp/test.db --synthetic 2000000   - test wydajności
+
+# Domyślna baza obok skryptów, niezależnie od katalogu, z którego uruchomiono aplikację
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "treningi.db")
+
+# Typy zdarzeń zapisywane w bazie (statystyki klatek są pomijane)
+STORED_TYPES = {REP, STATE, FORM_ERROR, SUMMARY}
+
+# Pola zdarzenia zapisywane w osobnych kolumnach - pozostałe trafiają do kolumny data (JSON)
+EVENT_FIELDS = {"type", "exercise", "time", "series", "count", "name", "new"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    user TEXT NOT NULL,
+    station TEXT NOT NULL,
+    session TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    type TEXT NOT NULL,
+    series INTEGER,
+    count INTEGER,
+    name TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS events_user_day ON events (user, day);
+CREATE INDEX IF NOT EXISTS events_exercise_day ON events (exercise, day);
+CREATE INDEX IF NOT EXISTS events_session ON events (session);
+
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT NOT NULL,
+    user TEXT NOT NULL,
+    station TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    reps INTEGER NOT NULL DEFAULT 0,
+    form_errors INTEGER NOT NULL DEFAULT 0,
+    series INTEGER NOT NULL DEFAULT 0,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    exercise_seconds REAL NOT NULL DEFAULT 0,
+    kcal REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, user, station, exercise)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS daily_user_day ON daily (user, day);
+CREATE INDEX IF NOT EXISTS daily_exercise_day ON daily (exercise, day);
+"""
+
+# Kolumny tabeli dziennej sumowane w zapytaniach
+DAILY_COLUMNS = ["reps", "form_errors", "series", "sessions", "completed", "exercise_seconds", "kcal"]
+
+UPSERT_DAILY = f"""
+INSERT INTO daily (day, user, station, exercise, {", ".join(DAILY_COLUMNS)})
+VALUES (?, ?, ?, ?, {", ".join("?" * len(DAILY_COLUMNS))})
+ON CONFLICT (day, user, station, exercise) DO UPDATE SET
+    {", ".join(f"{c} = {c} + excluded.{c}" for c in DAILY_COLUMNS)}
+"""
+
+# Grupowania dostępne w zapytaniach zbiorczych
+GROUPS = ("day", "user", "station", "exercise")
+
+# Funkcja zwracająca dzień (czas lokalny) dla znacznika czasu
+def day_of(ts):
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+# Przyrosty kolumn tabeli dziennej dla jednego zdarzenia
+def daily_increments(event):
+    kind = event["type"]
+    if kind == REP:
+        return {"reps": 1}
+    if kind == FORM_ERROR:
+        return {"form_errors": 1}
+    if kind == STATE and event.get("new") == "exercise":
+        return {"series": 1}
+    if kind == SUMMARY:
+        return {"sessions": 1, "completed": int(bool(event.get("completed"))),
+                "exercise_seconds": event.get("exercise_time", 0.0), "kcal": event.get("kcal", 0.0)}
+    return None
+
+
+class EventStore:
+    def __init__(self, path=DEFAULT_PATH, batch_size=1000, flush_interval=0.5, max_pending=100000):
+        self.path = path
+        self.batch_size = batch_size          # Maksymalna liczba zdarzeń w jednej transakcji
+        self.flush_interval = flush_interval  # Jak długo zbierać partię po pierwszym zdarzeniu (s)
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self.writer_loop, daemon=True)
+        self.written = 0
+        self.dropped = 0  # Zdarzenia odrzucone przy przepełnionej kolejce (zapis nie nadąża)
+        self.failed = 0   # Zdarzenia z partii, których zapis się nie powiódł
+        self.error = None  # Ostatni błąd zapisu
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=30.0)
+        connection.execute("PRAGMA journal_mode=WAL")     # Odczyty nie blokują zapisu
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def start(self):
+        with self.connect() as connection:
+            connection.executescript(SCHEMA)
+        connection.close()
+        self.thread.start()
+        return self
+
+    # Sesja treningu jednego użytkownika na jednym stanowisku - jej record()
+    # można bezpośrednio zasubskrybować w EventChannel
+    def session(self, user=None, station=None):
+        return EventSession(self, user or getpass.getuser(), station or socket.gethostname())
+
+    # Wywoływane w wątku publikującym zdarzenie - tylko włożenie do kolejki
+    def put(self, user, station, session, event):
+        if event["type"] not in STORED_TYPES:
+            return
+        # Wątek zapisu zakończony błędem połączenia - zdarzenia nie trafiłyby do bazy
+        if self.error is not None and not self.thread.is_alive():
+            self.dropped += 1
+            return
+        try:
+            self.queue.put_nowait((time.time(), user, station, session, event))
+        except queue.Full:
+            self.dropped += 1
+
+    # Zamknięcie: zapis zaległych zdarzeń i zakończenie wątku
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    # Wątek zapisu: pierwsze zdarzenie otwiera partię, która zbiera kolejne przez
+    # flush_interval (albo do batch_size) i jest zapisywana jedną transakcją
+    def writer_loop(self):
+        try:
+            connection = self.connect()
+        except sqlite3.Error as e:
+            self.error = e
+            print(f"Zapis zdarzeń niemożliwy: {e}", file=sys.stderr)
+            return
+        try:
+            stopping = False
+            while not stopping:
+                item = self.queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                # Błąd jednej partii (zablokowana baza, brak miejsca, zły wiersz) nie kończy
+                # wątku - transakcja jest wycofana, a kolejne partie są zapisywane dalej
+                try:
+                    self.write(connection, batch)
+                except Exception as e:
+                    self.error = e
+                    self.failed += len(batch)
+                    print(f"Nie zapisano {len(batch)} zdarzeń: {e}", file=sys.stderr)
+            # Statystyki tabeli dziennej dla planisty zapytań (np. filtr po dniach
+            # z grupowaniem po użytkownikach korzysta wtedy z indeksu user, day)
+            if self.written:
+                connection.execute("ANALYZE daily")
+        except Exception as e:
+            self.error = e
+            print(f"Zapis zdarzeń przerwany: {e}", file=sys.stderr)
+        finally:
+            connection.close()
+
+    def write(self, connection, batch):
+        rows = []
+        daily = {}
+        for ts, user, station, session, event in batch:
+            day = day_of(ts)
+            exercise = event.get("exercise", "").lower()
+            extra = {k: v for k, v in event.items() if k not in EVENT_FIELDS}
+            rows.append((ts, day, user, station, session, exercise, event["type"], event.get("series"),
+                         event.get("count"), event.get("name", event.get("new")),
+                         json.dumps(extra, ensure_ascii=False) if extra else None))
+            increments = daily_increments(event)
+            if increments:
+                totals = daily.setdefault((day, user, station, exercise), dict.fromkeys(DAILY_COLUMNS, 0))
+                for column, value in increments.items():
+                    totals[column] += value
+        with connection:
+            connection.executemany(
+                "INSERT INTO events (ts, day, user, station, session, exercise, type, series, count, name, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany(UPSERT_DAILY, [key + tuple(totals[c] for c in DAILY_COLUMNS)
+                                                  for key, totals in daily.items()])
+        self.written += len(rows)
+
+    # --- Zapytania ---
+
+    # Sumy z tabeli dziennej pogrupowane po by (day, user, station, exercise),
+    # z filtrami na użytkownika, ćwiczenie, stanowisko i zakres dni (RRRR-MM-DD, włącznie)
+    def aggregate(self, by="day", user=None, exercise=None, station=None, since=None, until=None):
+        if by not in GROUPS:
+            raise ValueError(f"Nieznane grupowanie '{by}' (dostępne: {', '.join(GROUPS)})")
+        conditions, params = [], []
+        for column, value in (("user", user), ("exercise", exercise), ("station", station)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("day >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("day <= ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sums = ", ".join(f"SUM({c})" for c in DAILY_COLUMNS)
+        connection = self.connect()
+        try:
+            rows = connection.execute(f"SELECT {by}, {sums} FROM daily {where} GROUP BY {by} ORDER BY {by}",
+                                      params).fetchall()
+        finally:
+            connection.close()
+        return [dict(zip([by] + DAILY_COLUMNS, row)) for row in rows]
+
+    # Wszystkie zdarzenia jednej sesji w kolejności zapisu
+    def session_events(self, session):
+        connection = self.connect()
+        try:
+            rows = connection.execute(
+                "SELECT ts, type, exercise, series, count, name, data FROM events WHERE session = ? ORDER BY id",
+                (session,)).fetchall()
+        finally:
+            connection.close()
+        events = []
+        for ts, kind, exercise, series, count, name, data in rows:
+            event = {"ts": ts, "type": kind, "exercise": exercise, "series": series, "count": count, "name": name}
+            event.update(json.loads(data) if data else {})
+            events.append(event)
+        return events
+
+
+class EventSession:
+    def __init__(self, store, user, station):
+        self.store = store
+        self.user = user
+        self.station = station
+        self.id = uuid.uuid4().hex
+
+    def record(self, event):
+        self.store.put(self.user, self.station, self.id, event)
+
+
+# Wypełnienie bazy syntetycznymi treningami i pomiar zapisu oraz zapytań
+def synthetic_benchmark(store, reps, users=50, stations=10, days=3 * 365):
+    exercises = ["przysiady", "pompki", "pajacyki"]
+    rng = random.Random(0)
+    now = time.time()
+    start = time.perf_counter()
+    written = 0
+    while written < reps:
+        # Jedna sesja: kilka serii po kilkanaście powtórzeń w losowym dniu
+        session = EventSession(store, f"user{rng.randrange(users)}", f"stanowisko{rng.randrange(stations)}")
+        ts = now - rng.randrange(days) * 86400
+        exercise = exercises[rng.randrange(len(exercises))]
+        batch = []
+        for series in range(1, 4):
+            batch.append((ts, {"type": STATE, "exercise": exercise, "new": "exercise", "series": series}))
+            for count in range(1, 16):
+                batch.append((ts, {"type": REP, "exercise": exercise, "count": count, "series": series}))
+                if rng.random() < 0.1:
+                    batch.append((ts, {"type": FORM_ERROR, "exercise": exercise, "name": "knee_error",
+                                       "series": series}))
+        batch.append((ts, {"type": SUMMARY, "exercise": exercise, "completed": True, "exercise_time": 120.0,
+                           "total_reps": 45}))
+        for ts, event in batch:
+            # Blokujące wstawienie - test mierzy przepustowość zapisu, bez odrzucania
+            store.queue.put((ts, session.user, session.station, session.id, event))
+        written += 45
+    store.close()
+    write_seconds = time.perf_counter() - start
+
+    queries = {
+        "per_day_user": lambda: store.aggregate("day", user="user1"),
+        "per_exercise_user": lambda: store.aggregate("exercise", user="user1"),
+        "per_user_last_30_days": lambda: store.aggregate("user", since=day_of(now - 30 * 86400)),
+        "per_day_exercise": lambda: store.aggregate("day", exercise="pompki"),
+    }
+    timings = {}
+    for name, query in queries.items():
+        query()
+        start = time.perf_counter()
+        for _ in range(10):
+            query()
+        timings[name] = (time.perf_counter() - start) / 10 * 1000.0
+    return written, write_seconds, timings
+
+def main():
+    parser = argparse.ArgumentParser(description='Zapytania zbiorcze do bazy zdarzeń treningów')
+    parser.add_argument('database', nargs='?', default=DEFAULT_PATH, help='Plik bazy SQLite')
+    parser.add_argument('--by', choices=GROUPS, default='day', help='Grupowanie wyników')
+    parser.add_argument('--user', help='Tylko ten użytkownik')
+    parser.add_argument('--exercise', help='Tylko to ćwiczenie')
+    parser.add_argument('--station', help='Tylko to stanowisko')
+    parser.add_argument('--since', help='Od dnia (RRRR-MM-DD)')
+    parser.add_argument('--until', help='Do dnia (RRRR-MM-DD)')
+    parser.add_argument('--synthetic', type=int, metavar='N',
+                        help='Dopisz N syntetycznych powtórzeń i zmierz czas zapisu oraz zapytań')
+    args = parser.parse_args()
+
+    store = EventStore(args.database).start()
+    if args.synthetic:
+        reps, seconds, timings = synthetic_benchmark(store, args.synthetic)
+        print(f"Zapisano {store.written} zdarzeń ({reps} powtórzeń) w {seconds:.1f}s "
+              f"({store.written / seconds:.0f} zdarzeń/s)")
+        for name, ms in timings.items():
+            print(f"  {name:<24} {ms:8.2f} ms")
+        return
+    store.close()
+
+    rows = store.aggregate(args.by, user=args.user, exercise=args.exercise, station=args.station,
+                           since=args.since, until=args.until)
+    print(f"{args.by:<20} {'powt.':>8} {'błędy':>7} {'serie':>6} {'sesje':>6} {'czas [min]':>11} {'kcal':>8}")
+    for row in rows:
+        print(f"{row[args.by]:<20} {row['reps']:>8} {row['form_errors']:>7} {row['series']:>6} "
+              f"{row['sessions']:>6} {row['exercise_seconds'] / 60:>11.1f} {row['kcal']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import threading
+
+# Kanał zdarzeń treningu (powtórzenia, zmiany stanu serii, statystyki klatek,
+# podsumowanie). Zdarzenia to słowniki z kluczem "type"; subskrybenci są
+# wywoływani synchronicznie w wątku, który opublikował zdarzenie.
+
+REP = "rep"            # Zaliczone powtórzenie
+STATE = "state"        # Przejście stanu sesji (prep/exercise/rest/completed)
+FORM_ERROR = "form_error"  # Pojawienie się błędu formy (raz na wystąpienie, nie co klatkę)
+FRAME = "frame"        # Statystyki wyświetlonej klatki
+SUMMARY = "summary"    # Podsumowanie zakończonego (lub przerwanego) treningu
+
+
+class EventChannel:
+    def __init__(self):
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self.lock:
+            self.subscribers = self.subscribers + [callback]
+        return callback
+
+    def unsubscribe(self, callback):
+        with self.lock:
+            self.subscribers = [cb for cb in self.subscribers if cb is not callback]
+
+    def publish(self, event):
+        # Lista subskrybentów jest podmieniana przy zmianach, więc iterujemy bez blokady
+        for callback in self.subscribers:
+            callback(event)
@@ -1,17 +1,41 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 import time
-import threading
-import subprocess
-import sys
-import os
+
+from autotune import DEFAULT_PATH as DEFAULT_PROFILE, load_settings
+from event_store import EventStore, DEFAULT_PATH as DEFAULT_STORE
+from events import REP, STATE, FRAME, SUMMARY
+from exercise_engine import PoseResources, BACKENDS
+from live_stream_inference import DEFAULT_MODEL
+from jumpingjacks import JumpingJackWorkout
+from przysiad import SquatWorkout
+from pushup import PushupWorkout
+
+# Mapowanie ćwiczeń do klas treningów uruchamianych w tym samym procesie
+WORKOUTS = {
+    "Pompki": PushupWorkout,
+    "Przysiady": SquatWorkout,
+    "Pajacyki": JumpingJackWorkout,
+}
+
+# Szacunkowe kalorie na jedno powtórzenie
+CALORIES_PER_REP = {
+    "Pompki": 0.5,
+    "Przysiady": 0.32,
+    "Pajacyki": 0.2
+}
+
+def estimate_kcal(exercise, reps):
+    return CALORIES_PER_REP.get(exercise, 0.3) * reps
 
 class ExerciseApp:
-    def __init__(self, root):
+    def __init__(self, root, backend="legacy", model_path=DEFAULT_MODEL, profile=DEFAULT_PROFILE, processes=False,
+                 store_path=DEFAULT_STORE):
         self.root = root
         self.root.title("Aplikacja do Ćwiczeń")
-        self.root.geometry("520x630")
+        self.root.geometry("520x660")
         
         # Style
         style = ttk.Style()
@@ -28,7 +52,8 @@ class ExerciseApp:
         self.prep_time = tk.IntVar(value=5)   # czas oczekiwania przed startem (domyślnie 5s)
         self.current_series = 0
         self.is_running = False
-        self.process = None
+        self.workout = None
+        self.last_summary = None
         self.timer_id = None
         self.remaining_rest_time = 0
         self.in_rest_period = False
@@ -38,6 +63,15 @@ class ExerciseApp:
         
         # Create UI
         self.create_widgets()
+
+        # Kamera i model Pose ładują się w tle, gdy użytkownik ustawia parametry
+        # z ustawieniami modelu z profilu wydajności tego komputera (autotune.py), jeśli istnieje
+        self.resources = PoseResources(backend=backend, model_path=model_path, processes=processes,
+                                       **load_settings(profile)).start()
+
+        # Zdarzenia treningów zapisywane w lokalnej bazie (wątek w tle, bez blokowania pętli klatek)
+        self.store = EventStore(store_path).start()
+        self.store_session = None
     
     def create_widgets(self):
         # Header
@@ -158,6 +192,14 @@ class ExerciseApp:
         # Label na podsumowanie kalorii
         self.summary_label = ttk.Label(self.root, text="", font=('Helvetica', 13, 'bold'), anchor='center')
         self.summary_label.pack(pady=(10, 6), padx=10, fill="x")
+
+        # Label na tempo i zakres ruchu ostatniego powtórzenia
+        self.rep_label = ttk.Label(self.root, text="", font=('Helvetica', 11), anchor='center')
+        self.rep_label.pack(pady=(0, 4), padx=10, fill="x")
+
+        # Label na statystyki klatek (FPS, opóźnienie) w trakcie treningu
+        self.stats_label = ttk.Label(self.root, text="", font=('Helvetica', 10), foreground='gray', anchor='center')
+        self.stats_label.pack(pady=(0, 4), padx=10, fill="x")
     
     def update_reps_label(self):
         self.reps_label.config(text=f"{self.reps.get()} powtórzeń")
@@ -185,6 +227,7 @@ class ExerciseApp:
         self.rest_time_count = self.rest_time.get()
         self.current_series = 1
         self.exercise_start_time = time.time()
+        self.last_summary = None
         
         # Aktualizacja UI
         self.status_label.config(text=f"Wykonywanie: {self.exercise}", foreground='blue')
@@ -193,8 +236,8 @@ class ExerciseApp:
         if hasattr(self, 'summary_label'):
             self.summary_label.config(text="")
         
-        # Rozpoczęcie ćwiczenia bezpośrednio - wszystkimi seriami zarządza skrypt ćwiczenia
-        threading.Thread(target=self.run_exercise, args=(self.exercise, self.reps_count, True), daemon=True).start()
+        # Rozpoczęcie ćwiczenia w tym samym procesie - wszystkimi seriami zarządza klasa treningu
+        self.timer_id = self.root.after(0, self.run_exercise)
     
     # Funkcja usunięta - odliczanie jest teraz w skryptach ćwiczeń
     
@@ -228,67 +271,107 @@ class ExerciseApp:
         self.reset_ui()
         self.status_label.config(text="Trening zatrzymany", foreground='red')
         if hasattr(self, 'summary_label'):
-            self.summary_label.config(text="Trening został przerwany.", foreground='red')
+            text = "Trening został przerwany."
+            if self.last_summary is not None:
+                text += f"\nWykonano powtórzeń: {self.last_summary['total_reps']}"
+            self.summary_label.config(text=text, foreground='red')
     
-    def run_exercise(self, exercise, reps, is_last_series):
+    def run_exercise(self):
+        # Kolejne klatki treningu przesuwane z pętli zdarzeń Tk
+        self.timer_id = None
+        if not self.is_running:
+            return
         try:
-            # Mapowanie ćwiczeń do odpowiednich skryptów
-            exercise_map = {
-                "Pompki": "pushup.py",
-                "Przysiady": "przysiad.py",
-                "Pajacyki": "jumpingjacks.py"
-            }
-            
-            script_name = exercise_map.get(exercise)
-            if not script_name or not os.path.exists(script_name):
-                raise FileNotFoundError(f"Nie znaleziono skryptu dla ćwiczenia: {exercise}")
-            
-            # Uruchomienie odpowiedniego skryptu ze wszystkimi parametrami
-            self.process = subprocess.Popen([
-                sys.executable, 
-                script_name, 
-                "--target", str(reps),
-                "--series", str(self.series.get()),
-                "--rest-time", str(self.rest_time.get()),
-                "--prep-time", str(self.prep_time.get())
-            ])
-            
-            # Oczekiwanie na zakończenie ćwiczenia
-            while self.process.poll() is None and self.is_running:
-                time.sleep(0.1)
-                
-            if self.process.returncode != 0 and self.is_running:
-                error_msg = f"Błąd podczas wykonywania ćwiczenia. Kod błędu: {self.process.returncode}"
-                self.root.after(0, lambda msg=error_msg: messagebox.showerror("Błąd", msg))
+            if self.workout is None:
+                # Czekamy, aż kamera i model będą gotowe (zwykle już są)
+                if not self.resources.is_ready():
+                    self.status_label.config(text="Uruchamianie kamery...", foreground='blue')
+                    self.timer_id = self.root.after(50, self.run_exercise)
+                    return
+                self.status_label.config(text=f"Wykonywanie: {self.exercise}", foreground='blue')
+                workout_class = WORKOUTS[self.exercise]
+                self.workout = workout_class(self.resources, self.reps_count, self.series_count,
+                                             self.rest_time_count, self.prep_time.get())
+                # Postęp treningu przychodzi jako zdarzenia - bez odpytywania
+                self.store_session = self.store.session()
+                self.workout.events.subscribe(self.on_workout_event)
+                self.workout.start()
+
+            if self.workout.step(timeout=0.005):
+                self.timer_id = self.root.after(1, self.run_exercise)
                 return
-                
-            if self.is_running:
-                # Wszystkie serie już zostały wykonane w oknie ćwiczenia
-                self.root.after(0, self.exercise_complete)
-                
+
+            # Wszystkie serie zostały wykonane (lub użytkownik zakończył klawiszem 'q')
+            self.close_workout()
+            self.exercise_complete()
         except Exception as e:
-            error_msg = str(e)
-            self.root.after(0, lambda msg=error_msg: messagebox.showerror("Błąd", msg))
-        finally:
-            if hasattr(self, 'process') and self.process:
-                self.process.terminate()
-                self.process = None
-    
+            self.close_workout()
+            self.reset_ui()
+            messagebox.showerror("Błąd", str(e))
+
+    def close_workout(self):
+        if self.workout is not None:
+            self.workout.stop()
+            self.workout = None
+
+    def on_close(self):
+        self.close_workout()
+        self.resources.release()
+        self.store.close()
+        self.root.destroy()
+
+    # Obsługa zdarzeń z treningu (wywoływana w wątku Tk, bo stamtąd jest przesuwany trening)
+    def on_workout_event(self, event):
+        kind = event["type"]
+        if kind == SUMMARY:
+            # Podsumowanie zapisywane razem z szacunkiem kalorii
+            event = dict(event, kcal=estimate_kcal(self.exercise, event["total_reps"]))
+        if kind != FRAME:
+            self.store_session.record(event)
+        if kind == REP:
+            self.update_counter(event["count"], self.exercise)
+            self.update_rep_label(event["rep"])
+        elif kind == STATE:
+            self.current_series = event["series"]
+            self.in_rest_period = event["new"] == "rest"
+            if event["new"] == "rest":
+                self.status_label.config(text=f"Przerwa po serii {event['series']}/{event['total_series']}",
+                                         foreground='orange')
+            elif event["new"] == "exercise":
+                self.status_label.config(text=f"{self.exercise}: seria {event['series']}/{event['total_series']}",
+                                         foreground='blue')
+        elif kind == FRAME:
+            # Label odświeżany co 15 klatek - wystarczy do podglądu, a nie obciąża Tk
+            if event["frame"] % 15 == 0:
+                self.stats_label.config(text=f"{event['fps']:.0f} FPS, opóźnienie {event['latency_ms']:.0f} ms, "
+                                             f"pominięte klatki: {event['dropped']}")
+        elif kind == SUMMARY:
+            self.last_summary = event
+
     def update_counter(self, count, exercise):
-        self.start_button.config(text=f"{exercise}: {count}...")
+        self.status_label.config(text=f"{exercise}: {count}/{self.reps_count} (seria {self.current_series}/{self.series_count})",
+                                 foreground='blue')
     
+    def update_rep_label(self, rep):
+        text = (f"Powtórzenie {rep['index']}: {rep['eccentric']:.1f} s + {rep['concentric']:.1f} s, "
+                f"zakres {rep['extreme']:.2f}")
+        if rep["errors"]:
+            text += f", błędy: {', '.join(rep['errors'])}"
+        self.rep_label.config(text=text)
+
     def exercise_complete(self):
-        # Oblicz kalorie
-        calories_per_rep = {
-            "Pompki": 0.5,
-            "Przysiady": 0.32,
-            "Pajacyki": 0.2
-        }
+        # Oblicz kalorie na podstawie faktycznie wykonanych powtórzeń
         exercise = getattr(self, 'exercise', self.selected_exercise.get())
-        reps = getattr(self, 'reps_count', self.reps.get())
-        series = getattr(self, 'series_count', self.series.get())
-        kcal = calories_per_rep.get(exercise, 0.3) * reps * series
-        summary = f"Trening zakończony pomyślnie!\nSpalone kalorie: {kcal:.1f} kcal"
+        if self.last_summary is not None:
+            reps = self.last_summary["total_reps"]
+            duration = self.last_summary["duration"]
+        else:
+            reps = 0
+            duration = time.time() - self.exercise_start_time
+        kcal = estimate_kcal(exercise, reps)
+        mins, secs = divmod(int(duration), 60)
+        summary = (f"Trening zakończony pomyślnie!\nWykonane powtórzenia: {reps}\n"
+                   f"Czas treningu: {mins:02d}:{secs:02d}\nSpalone kalorie: {kcal:.1f} kcal")
         self.status_label.config(text="Trening zakończony!", foreground='green')
         if hasattr(self, 'summary_label'):
             self.summary_label.config(text=summary, foreground='purple')
@@ -301,10 +384,10 @@ class ExerciseApp:
         self.current_series = 0
         self.start_button.config(state="normal")
         self.stop_button.config(state="disabled")
+        self.stats_label.config(text="")
+        self.rep_label.config(text="")
         # NIE czyść summary_label tutaj, aby podsumowanie pozostało po zakończeniu treningu
-        if hasattr(self, 'process') and self.process:
-            self.process.terminate()
-            self.process = None
+        self.close_workout()
         if hasattr(self, 'timer_id') and self.timer_id:
             self.root.after_cancel(self.timer_id)
             self.timer_id = None
@@ -313,8 +396,22 @@ class ExerciseApp:
             self.prep_timer_id = None
 
 def main():
+    parser = argparse.ArgumentParser(description='Aplikacja do ćwiczeń')
+    parser.add_argument('--backend', choices=BACKENDS, default='legacy',
+                        help='Wnioskowanie: legacy (synchroniczne) lub live_stream (asynchroniczne, MediaPipe Tasks)')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='Plik .task modelu PoseLandmarker (live_stream)')
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, help='Profil wydajności z autotune.py')
+    parser.add_argument('--processes', action='store_true',
+                        help='Kamera i model w osobnych procesach (klatki w pamięci współdzielonej, tylko legacy)')
+    parser.add_argument('--store', default=DEFAULT_STORE,
+                        help='Baza SQLite ze zdarzeniami treningów (domyślnie treningi.db obok skryptów)')
+    args = parser.parse_args()
+    if args.processes and args.backend != "legacy":
+        parser.error("--processes działa tylko z backendem legacy")
     root = tk.Tk()
-    app = ExerciseApp(root)
+    app = ExerciseApp(root, backend=args.backend, model_path=args.model, profile=args.profile,
+                      processes=args.processes, store_path=args.store)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
 
 if __name__ == "__main__":
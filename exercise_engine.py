@@ -0,0 +1,561 @@
+import argparse
+import json
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import exercise_logic
+from autotune import DEFAULT_PATH as DEFAULT_PROFILE, load_settings
+from event_store import EventStore
+from events import EventChannel, REP, STATE, FORM_ERROR, FRAME, SUMMARY
+from exercise_logic import LandmarkBuffer
+from exercise_rules import CompiledRules
+from keyframe_inference import KeyframePoseInference
+from landmark_recording import LandmarkRecorder
+from live_stream_inference import LiveStreamPoseInference, DEFAULT_MODEL
+from pipeline import FramePipeline, AsyncFramePipeline, RgbBuffer, ResizeBuffer
+from rep_segmentation import RepSegmenter
+from render import SidebarCompositor
+from roi_inference import RoiPoseInference
+from session_state import ExerciseSession, EXERCISE, COMPLETED
+from shared_frames import ProcessFramePipeline
+from stage_timing import StageTimer, NULL_TIMER
+
+# Silnik ćwiczeń działający w bieżącym procesie. Model Pose i kamera są
+# ładowane raz (w tle) i używane ponownie w kolejnych treningach, a trening
+# jest przesuwany klatka po klatce metodą step() - z własnej pętli skryptu
+# albo z pętli zdarzeń Tk w aplikacji. MediaPipe jest importowany dopiero
+# w wątku ładowania modelu (exercise_logic.mp_pose), równolegle z otwieraniem
+# kamery - argparse i okno aplikacji nie czekają na import.
+
+
+# Backendy wnioskowania: legacy - synchroniczne mp.solutions.pose.Pose.process,
+# live_stream - asynchroniczny PoseLandmarker (MediaPipe Tasks) z callbackiem
+BACKENDS = ("legacy", "live_stream")
+
+
+# Współdzielone zasoby: kamera i "rozgrzany" model MediaPipe Pose
+class PoseResources:
+    def __init__(self, camera_index=0, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 roi=False, target_fps=30, max_skip=1, backend="legacy", model_path=DEFAULT_MODEL,
+                 model_complexity=1, input_width=None, processes=False):
+        self.camera_index = camera_index
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.model_complexity = model_complexity  # Złożoność modelu Pose (0-2, profil z autotune.py)
+        self.roi = roi                  # Wnioskowanie na wycinku wokół sylwetki (RoiPoseInference)
+        self.target_fps = target_fps
+        self.max_skip = max_skip        # > 1 - model tylko na klatkach kluczowych (KeyframePoseInference)
+        self.backend = backend
+        self.model_path = model_path    # Plik .task modelu PoseLandmarker (backend live_stream)
+        self.processes = processes      # Kamera i model w osobnych procesach (shared_frames)
+        self.cap = None
+        self.pose = None
+        self.live_stream = None         # LiveStreamPoseInference (backend live_stream)
+        self.process_pipeline = None    # ProcessFramePipeline (processes=True)
+        self.roi_inference = None
+        self.rgb = RgbBuffer()          # Bufor RGB dla modelu, wspólny dla kolejnych klatek
+        self.resize = ResizeBuffer(input_width)  # Szersze klatki zmniejszane przed modelem (bez ROI)
+        self.timer = NULL_TIMER         # Pomiar czasu etapów wnioskowania (ustawiany przez Workout)
+        self.error = None
+        self.ready = threading.Event()
+        self.started = None
+        self.startup = {}               # Etap startu -> sekundy od start() (camera_open, model_ready, ...)
+
+    # Otwarcie kamery i budowa modelu równolegle, w wątkach w tle
+    def start(self):
+        self.started = time.perf_counter()
+        target = self.launch_processes if self.processes else self.load
+        threading.Thread(target=target, daemon=True).start()
+        return self
+
+    # Zapis chwili pierwszego wystąpienia etapu startu
+    def mark_startup(self, name):
+        if name not in self.startup:
+            self.startup[name] = round(time.perf_counter() - self.started, 3)
+
+    def load(self):
+        camera_thread = threading.Thread(target=self.open_camera, daemon=True)
+        camera_thread.start()
+        try:
+            if self.backend == "live_stream":
+                self.live_stream = LiveStreamPoseInference(self.model_path, self.min_detection_confidence,
+                                                           self.min_tracking_confidence)
+            else:
+                mp_pose = exercise_logic.mp_pose
+                self.mark_startup("mediapipe_import")
+                pose = mp_pose.Pose(model_complexity=self.model_complexity,
+                                    min_detection_confidence=self.min_detection_confidence,
+                                    min_tracking_confidence=self.min_tracking_confidence)
+                # Pierwsze wywołanie inicjalizuje graf - robimy je teraz, a nie przy pierwszej klatce
+                pose.process(np.zeros((256, 256, 3), dtype=np.uint8))
+                pose.reset()
+                self.pose = pose
+                if self.roi:
+                    self.roi_inference = RoiPoseInference(pose, target_fps=self.target_fps)
+            self.mark_startup("model_ready")
+        except Exception as e:
+            self.error = e
+        camera_thread.join()
+        self.ready.set()
+
+    # Układ wieloprocesowy: kamera i model startują w swoich procesach, równolegle
+    def launch_processes(self):
+        try:
+            self.process_pipeline = ProcessFramePipeline(
+                self.camera_index, model_complexity=self.model_complexity, input_width=self.resize.width,
+                min_detection_confidence=self.min_detection_confidence,
+                min_tracking_confidence=self.min_tracking_confidence).launch(self.mark_startup)
+        except Exception as e:
+            self.error = e
+        self.ready.set()
+
+    def open_camera(self):
+        cap = cv2.VideoCapture(self.camera_index)
+        if not cap.isOpened():
+            self.error = IOError(f"Nie można otworzyć kamery: {self.camera_index}")
+        self.cap = cap
+        self.mark_startup("camera_open")
+
+    def is_ready(self):
+        if self.ready.is_set() and self.error is not None:
+            raise self.error
+        return self.ready.is_set()
+
+    def wait_ready(self, timeout=None):
+        self.ready.wait(timeout)
+        return self.is_ready()
+
+    # Czyszczenie stanu śledzenia przed nowym treningiem
+    def reset(self):
+        if self.process_pipeline is not None:
+            self.process_pipeline.reset()
+        elif self.live_stream is not None:
+            self.live_stream.reset()
+        elif self.roi_inference is not None:
+            self.roi_inference.reset()
+        else:
+            self.pose.reset()
+
+    # Funkcja wnioskowania uruchamiana w wątku potoku
+    def process(self, frame):
+        if self.roi_inference is not None:
+            result = self.roi_inference(frame)
+            self.timer.lap("roi_inference")
+            return result
+        image = self.rgb.convert(self.resize.resize(frame))
+        self.timer.lap("cvtColor")
+        result = self.pose.process(image)
+        self.timer.lap("pose.process")
+        return result
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        if self.pose is not None:
+            self.pose.close()
+            self.pose = None
+        if self.live_stream is not None:
+            self.live_stream.close()
+            self.live_stream = None
+        if self.process_pipeline is not None:
+            self.process_pipeline.shutdown()
+            self.process_pipeline = None
+
+
+# Wspólna część wszystkich ćwiczeń: potok klatek, stan sesji, sidebar i wyświetlanie.
+# Klasy ćwiczeń podają tylko deklaratywne reguły (exercise_rules) i wygląd sidebara;
+# reguły są kompilowane raz i oceniane jednym przebiegiem w każdej klatce. Postęp
+# treningu jest publikowany w kanale events (zdarzenia rep, state, frame i summary)
+class Workout:
+    title = ""
+    title_x = 80
+    sidebar_width = 500
+    window_name = "Exercise"
+    counter_label = ""
+    rules = None            # Reguły ćwiczenia (ExerciseRules)
+    params = {}             # Nadpisane progi reguł
+    error_style = "errors"  # "errors" - błędy pod komunikatami, "hints" - wskazówki pod licznikiem w fazie ćwiczenia
+
+    def __init__(self, resources, target, total_series=1, rest_time=30, prep_time=5, record_path=None,
+                 timer=NULL_TIMER, show_timings=False, timings_csv=None):
+        self.resources = resources
+        self.target = target
+        self.counter = self.make_counter()
+        self.landmark_buffer = LandmarkBuffer(self.rules.landmarks)
+        self.session = ExerciseSession(self.counter, target, total_series, rest_time, prep_time)
+        self.compositor = SidebarCompositor(self.title, self.title_x, sidebar_width=self.sidebar_width)
+        self.pipeline = None
+        self.keyframes = None
+        self.record_path = record_path  # Plik .fdlm z zapisem punktów ciała (None - bez zapisu)
+        self.recorder = None
+        self.timer = timer                # Pomiar czasu etapów (StageTimer lub NULL_TIMER)
+        self.show_timings = show_timings  # Percentyle czasów etapów w sidebarze
+        self.timings_csv = timings_csv    # Plik CSV z czasami każdej klatki, zapisywany na koniec
+        self.timing_texts = []
+        self.error_texts = []   # Komunikaty o błędach z ostatniej klatki z wykrytą sylwetką
+        self.values = {}        # Miary z ostatniej klatki z wykrytą sylwetką
+        self.hints = []
+        self.active_errors = set()  # Błędy formy aktywne w poprzedniej analizowanej klatce
+        self.quit = False       # Użytkownik nacisnął 'q'
+        self.window_shown = False  # Okno powstaje przy pierwszym imshow
+
+        self.events = EventChannel()
+        self.started_at = None
+        self.exercise_time = 0.0  # Łączny czas w fazie ćwiczenia (bez przygotowania i przerw)
+        self.exercise_started = None
+        self.frames = 0
+        self.fps = 0.0
+        self.last_frame_time = None
+        self.summary = None
+
+    def make_counter(self):
+        self.compiled = CompiledRules(self.rules, self.params)
+        return RepSegmenter(self.compiled)
+
+    # Analiza punktów ciała jednej klatki: aktualizuje licznik i error_texts,
+    # zwraca komunikaty wyświetlane nad stanem ćwiczenia; timestamp - czas przechwycenia klatki
+    def analyze(self, points, width, timestamp=0.0):
+        self.values = self.compiled.evaluate(points, width)
+
+        # Liczenie i podział na powtórzenia tylko w fazie ćwiczenia
+        if self.session.state == EXERCISE:
+            self.counter.update(self.values, timestamp)
+            flags = self.counter.flags
+        else:
+            flags = self.compiled.error_flags(self.values, self.counter.position)
+        # Zdarzenie tylko przy pojawieniu się błędu (w fazie ćwiczenia), nie w każdej klatce, w której trwa
+        active = {name for name, flag in flags.items() if flag}
+        if self.session.state == EXERCISE:
+            for name in sorted(active - self.active_errors):
+                self.emit(FORM_ERROR, name=name, series=self.session.current_series)
+        self.active_errors = active
+
+        errors = self.compiled.error_messages(flags)
+        if self.error_style == "hints":
+            self.hints = [(msg, (0, 140, 255)) for msg in errors]
+        else:
+            self.error_texts = errors
+        return self.messages()
+
+    # Komunikaty ćwiczenia na górze sidebara (na podstawie self.values)
+    def messages(self):
+        return []
+
+    # Dodatkowe wskazówki wyświetlane w fazie ćwiczenia pod licznikiem
+    def exercise_hints(self):
+        return self.hints
+
+    @property
+    def finished(self):
+        return self.quit or self.session.state == COMPLETED
+
+    def start(self):
+        self.resources.reset()
+        self.resources.timer = self.timer
+        self.started_at = self.session.clock()
+        if self.resources.process_pipeline is not None:
+            # Procesy przechwytywania i wnioskowania działają od załadowania zasobów
+            self.pipeline = self.resources.process_pipeline
+            self.pipeline.timer = self.timer
+            self.pipeline.start()
+            return self
+        if self.resources.live_stream is not None:
+            # Wnioskowanie asynchroniczne - wyniki przychodzą z callbacku modelu
+            self.resources.live_stream.timer = self.timer
+            self.pipeline = AsyncFramePipeline(self.resources.cap, self.resources.live_stream,
+                                               timer=self.timer).start()
+            return self
+        infer = self.resources.process
+        if self.resources.max_skip > 1:
+            self.keyframes = KeyframePoseInference(infer, joints=self.compiled.angle_triplets,
+                                                   max_skip=self.resources.max_skip)
+            infer = self.keyframes
+        self.pipeline = FramePipeline(self.resources.cap, infer, timer=self.timer).start()
+        return self
+
+    def stop(self):
+        # Podsumowanie publikowane zawsze, także gdy sprzątanie się nie powiedzie
+        try:
+            if self.pipeline is not None:
+                self.pipeline.stop()
+            if self.recorder is not None:
+                self.recorder.close()
+            self.resources.timer = NULL_TIMER
+            if self.timings_csv is not None:
+                self.timer.write_csv(self.timings_csv)
+        finally:
+            self.finish()
+            # Okna nie ma, jeśli zatrzymano przed pierwszą klatką (lub OpenCV bez GUI)
+            if self.window_shown:
+                cv2.destroyWindow(self.window_name)
+
+    def emit(self, kind, **data):
+        data["type"] = kind
+        data["exercise"] = self.counter_label
+        data["time"] = self.session.clock()
+        self.events.publish(data)
+
+    # Publikacja przejść stanu sesji i zliczanie czasu spędzonego w fazie ćwiczenia
+    def advance_session(self):
+        for old, new, at in self.session.update():
+            if old == EXERCISE:
+                self.exercise_time += at - self.exercise_started
+            if new == EXERCISE:
+                self.exercise_started = at
+            self.emit(STATE, old=old, new=new, series=self.session.current_series,
+                      total_series=self.session.total_series)
+
+    # Podsumowanie z faktycznie zmierzonych powtórzeń i czasów (publikowane raz)
+    def finish(self):
+        if self.summary is not None or self.started_at is None:
+            return self.summary
+        now = self.session.clock()
+        series_reps = list(self.session.series_reps)
+        exercise_time = self.exercise_time
+        if self.session.state == EXERCISE:
+            # Trening przerwany w trakcie serii - liczy się to, co zdążono zrobić
+            series_reps.append(self.counter.count)
+            exercise_time += now - self.exercise_started
+        self.summary = {
+            "completed": self.session.state == COMPLETED,
+            "series_reps": series_reps,
+            "total_reps": sum(series_reps),
+            "target": self.target,
+            "total_series": self.session.total_series,
+            "duration": now - self.started_at,
+            "exercise_time": exercise_time,
+        }
+        self.emit(SUMMARY, **self.summary)
+        return self.summary
+
+    # Komunikaty stanu ćwiczenia i liczniki
+    def state_messages(self):
+        session = self.session
+        state = session.state
+        if state == "prep":
+            return [(f"Przygotowanie: {session.remaining()}s", (255, 255, 0))]
+        if state == "exercise":
+            return [(f"Seria: {session.current_series}/{session.total_series}", (255, 255, 255)),
+                    (f"{self.counter_label}: {self.counter.count}/{self.target}", (0, 255, 0))] + self.exercise_hints()
+        if state == "rest":
+            return [(f"Przerwa: {session.remaining()}s", (0, 255, 255)),
+                    (f"Następna seria: {session.current_series}/{session.total_series}", (255, 255, 255))]
+        return [("Ćwiczenie zakończone!", (0, 255, 0))]
+
+    # Tempo i zakres ruchu ostatniego powtórzenia (w fazie ćwiczenia)
+    def rep_texts(self):
+        record = self.counter.last
+        if record is None or self.session.state != EXERCISE:
+            return []
+        extreme = f"{record.extreme:.0f}°" if self.counter.angle else f"{record.extreme:.2f}"
+        lines = [f"Ostatnie: {record.duration:.1f} s ({record.eccentric:.1f} + {record.concentric:.1f} s)",
+                 f"Zakres: {extreme}" + (f", błędy: {len(record.errors)}" if record.errors else "")]
+        return [(line, (20, 310 + i * 30), 0.6, (200, 200, 200), 1) for i, line in enumerate(lines)]
+
+    # Napisy z percentylami p50/p95/p99 czasów etapów, nad linią opóźnienia
+    def make_timing_texts(self, height):
+        lines = [f"{stage}: {p50:.1f} / {p95:.1f} / {p99:.1f} ms"
+                 for stage, (p50, p95, p99) in self.timer.percentiles().items()]
+        lines.append("Etapy p50 / p95 / p99:")
+        return [(line, (20, height - 115 - i * 18), 0.45, (150, 150, 150), 1) for i, line in enumerate(lines)]
+
+    # Jedna iteracja pętli wyświetlania - zwraca False, gdy trening się zakończył
+    def step(self, timeout=0.1):
+        item = self.pipeline.get(timeout)
+        if item is None:
+            cv2.waitKey(1)
+            if not self.pipeline.running:
+                self.quit = True
+            return not self.finished
+        timer = self.timer
+        timer.begin(item.seq)
+        frame = item.frame
+        results = item.result
+        height, width, _ = frame.shape
+
+        # Przesunięcie stanu sesji (koniec przygotowania / przerwy)
+        self.advance_session()
+
+        # Zapis strumienia punktów ciała do późniejszego odtwarzania (replay.py)
+        if self.record_path is not None:
+            if self.recorder is None:
+                self.recorder = LandmarkRecorder(self.record_path, width, height, self.counter_label.lower())
+            self.recorder.write(item.capture_time,
+                                results.pose_landmarks.landmark if results.pose_landmarks else None)
+
+        # Klatka BGR z potoku kopiowana raz do płótna; punkty ciała rysujemy już w płótnie
+        image = self.compositor.blit(frame)
+        messages = []
+        # Wycinek użyty przez wnioskowanie ROI (jeśli włączone)
+        inference_info = results.info() if hasattr(results, "info") else None
+        if inference_info is not None and inference_info.get("tracked"):
+            x1, y1, x2, y2 = inference_info["roi"]
+            cv2.rectangle(image, (x1, y1), (x2 - 1, y2 - 1), (0, 200, 255), 1)
+
+        timer.lap("session")
+
+        if results.pose_landmarks:
+            self.resources.mark_startup("first_landmark")
+            exercise_logic.mp_drawing.draw_landmarks(image, results.pose_landmarks,
+                                                     exercise_logic.mp_pose.POSE_CONNECTIONS)
+            timer.lap("draw_landmarks")
+            count = self.counter.count
+            messages = self.analyze(self.landmark_buffer.update(results.pose_landmarks.landmark), width,
+                                    item.capture_time)
+            timer.lap("analyze")
+            if self.counter.count > count:
+                self.emit(REP, count=self.counter.count, target=self.target,
+                          series=self.session.current_series, rep=self.counter.last.as_dict())
+
+        # Po osiągnięciu celu sesja przechodzi do przerwy lub kończy się
+        self.advance_session()
+
+        # Napisy w sidebarze (współrzędne względem lewej krawędzi sidebara)
+        sidebar_messages = messages + self.state_messages()
+        texts = [(msg, (20, 100 + i * 40), 0.7, color, 2) for i, (msg, color) in enumerate(sidebar_messages)]
+        texts += [(msg, (20, 200 + i * 40), 0.7, (0, 0, 255), 2) for i, msg in enumerate(self.error_texts)]
+        texts += self.rep_texts()
+
+        # Opóźnienie kamera -> ekran i liczba pominiętych klatek
+        texts.append((f"Opóźnienie: {self.pipeline.latency_ms:.0f} ms, pominięte: {self.pipeline.dropped}",
+                      (20, height - 90), 0.5, (150, 150, 150), 1))
+
+        # Percentyle czasów etapów (odświeżane co 15 klatek)
+        if self.show_timings and timer.enabled:
+            if self.frames % 15 == 0:
+                self.timing_texts = self.make_timing_texts(height)
+            texts += self.timing_texts
+
+        main_image = self.compositor.draw_texts(texts)
+        timer.lap("sidebar")
+        cv2.imshow(self.window_name, main_image)
+        self.window_shown = True
+        timer.lap("imshow")
+        self.pipeline.mark_displayed(item)
+        timer.record(item.seq, "latency", time.perf_counter() - item.capture_time)
+
+        # Statystyki klatki (wygładzone FPS wyświetlania, opóźnienie, pominięte klatki)
+        now = time.perf_counter()
+        if self.last_frame_time is not None and now > self.last_frame_time:
+            fps = 1.0 / (now - self.last_frame_time)
+            self.fps = fps if self.frames == 1 else self.fps + 0.1 * (fps - self.fps)
+        self.last_frame_time = now
+        self.frames += 1
+        self.emit(FRAME, frame=self.frames, fps=self.fps, latency_ms=self.pipeline.latency_ms,
+                  dropped=self.pipeline.dropped, pose_detected=bool(results.pose_landmarks),
+                  inference=inference_info)
+
+        # Przerwij po naciśnięciu klawisza 'q' lub zakończeniu wszystkich serii
+        timer.lap("events")
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            self.quit = True
+        timer.lap("waitKey")
+        if self.finished:
+            self.finish()
+        return not self.finished
+
+
+# Parsowanie argumentów wiersza poleceń wspólne dla skryptów ćwiczeń
+def parse_workout_args(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--target', type=int, default=10, help='Docelowa liczba powtórzeń')
+    parser.add_argument('--camera', default='0', help='Indeks kamery albo plik wideo')
+    parser.add_argument('--rest-time', type=int, default=30, help='Czas przerwy między seriami (sekundy)')
+    parser.add_argument('--series', type=int, default=1, help='Liczba serii')
+    parser.add_argument('--prep-time', type=int, default=5, help='Czas przygotowania przed ćwiczeniem (sekundy)')
+    parser.add_argument('--roi', action='store_true', help='Wnioskowanie na wycinku wokół sylwetki z adaptacyjną skalą')
+    parser.add_argument('--target-fps', type=float, default=30, help='Docelowy FPS dla adaptacyjnej skali (z --roi)')
+    parser.add_argument('--max-skip', type=int, default=1,
+                        help='Maksymalny odstęp klatek kluczowych modelu (1 - model na każdej klatce)')
+    parser.add_argument('--record', help='Zapis punktów ciała do pliku .fdlm (do odtwarzania w replay.py)')
+    parser.add_argument('--timings', action='store_true', help='Percentyle czasów etapów pętli w sidebarze')
+    parser.add_argument('--timings-csv', help='Zapis czasów etapów każdej klatki do pliku CSV po zakończeniu')
+    parser.add_argument('--store', help='Baza SQLite, do której zapisywane są zdarzenia treningu (event_store.py)')
+    parser.add_argument('--user', help='Użytkownik zapisywany w bazie zdarzeń (domyślnie login)')
+    parser.add_argument('--backend', choices=BACKENDS, default='legacy',
+                        help='Wnioskowanie: legacy (synchroniczne Pose.process) lub live_stream '
+                             '(asynchroniczny PoseLandmarker z MediaPipe Tasks)')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='Plik .task modelu PoseLandmarker (z --backend live_stream)')
+    parser.add_argument('--processes', action='store_true',
+                        help='Przechwytywanie i wnioskowanie w osobnych procesach (klatki w pamięci współdzielonej)')
+    parser.add_argument('--profile', default=DEFAULT_PROFILE,
+                        help='Profil wydajności z autotune.py (złożoność modelu, szerokość wejścia, progi pewności)')
+    parser.add_argument('--startup-check', action='store_true',
+                        help='Tylko pomiar startu (kamera, model, pierwsza sylwetka) bez okna - wynik w JSON')
+    args = parser.parse_args()
+    if args.camera.isdigit():
+        args.camera = int(args.camera)
+    if args.backend == "live_stream" and (args.roi or args.max_skip > 1):
+        parser.error("--roi i --max-skip działają tylko z backendem legacy")
+    if args.processes and (args.roi or args.max_skip > 1 or args.backend != "legacy"):
+        parser.error("--processes działa tylko z backendem legacy, bez --roi i --max-skip")
+    return args
+
+# Pomiar startu bez okna (działa też z OpenCV bez GUI): potok treningu rusza jak
+# zwykle, a pętla czeka tylko na pierwszą klatkę z wykrytą sylwetką (czasy
+# w sekundach od startu zasobów)
+def check_startup(workout, timeout=30.0):
+    resources = workout.resources
+    deadline = time.monotonic() + timeout
+    workout.start()
+    try:
+        while "first_landmark" not in resources.startup and time.monotonic() < deadline:
+            item = workout.pipeline.get()
+            if item is None:
+                if not workout.pipeline.running:
+                    break
+                continue
+            resources.mark_startup("first_frame")
+            if item.result.pose_landmarks:
+                resources.mark_startup("first_landmark")
+    finally:
+        workout.pipeline.stop()
+    return resources.startup
+
+# Uruchomienie ćwiczenia jako samodzielnego skryptu
+def run_standalone(workout_class, description):
+    args = parse_workout_args(description)
+    settings = load_settings(args.profile)
+    if settings:
+        print(f"Profil wydajności: {settings}")
+    resources = PoseResources(camera_index=args.camera, roi=args.roi, target_fps=args.target_fps,
+                              max_skip=args.max_skip, backend=args.backend, model_path=args.model,
+                              processes=args.processes, **settings).start()
+    try:
+        resources.wait_ready()
+        timer = NULL_TIMER
+        if args.timings or args.timings_csv:
+            # Wiersze każdej klatki trzymane tylko dla eksportu CSV
+            timer = StageTimer(keep_rows=args.timings_csv is not None)
+        workout = workout_class(resources, args.target, args.series, args.rest_time, args.prep_time,
+                                record_path=args.record, timer=timer, show_timings=args.timings,
+                                timings_csv=args.timings_csv)
+        if args.startup_check:
+            print(json.dumps(check_startup(workout)))
+            return
+        store = EventStore(args.store).start() if args.store else None
+        if store is not None:
+            workout.events.subscribe(store.session(args.user).record)
+        workout.start()
+        try:
+            while workout.step():
+                pass
+        finally:
+            workout.stop()
+            if store is not None:
+                store.close()
+            print(f"Statystyki potoku: {workout.pipeline.stats()}")
+            if workout.keyframes is not None:
+                print(f"Klatki kluczowe: {workout.keyframes.stats()}")
+            if resources.live_stream is not None:
+                print(f"Wnioskowanie live_stream: {resources.live_stream.stats()}")
+            print(f"Start (s): {resources.startup}")
+            print(f"Podsumowanie: {workout.summary}")
+    finally:
+        resources.release()
+        if not args.startup_check:
+            cv2.destroyAllWindows()
@@ -0,0 +1,165 @@
+import numpy as np
+
+# Wspólna logika weryfikacji i liczenia powtórzeń - używana przez skrypty
+# ćwiczeń z kamerą oraz przez tryb wsadowy (batch_score.py)
+
+# Moduły mediapipe.solutions importowane dopiero przy pierwszym użyciu
+# (exercise_logic.mp_pose, from exercise_logic import mp_drawing) - sam import
+# mediapipe trwa kilka sekund, a logika ćwiczeń i argparse go nie potrzebują
+MEDIAPIPE_SOLUTIONS = {"mp_pose": "pose", "mp_drawing": "drawing_utils"}
+
+def __getattr__(name):
+    if name not in MEDIAPIPE_SOLUTIONS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import mediapipe as mp
+    module = getattr(mp.solutions, MEDIAPIPE_SOLUTIONS[name])
+    globals()[name] = module
+    return module
+
+# Indeksy punktów ciała MediaPipe Pose (mp_pose.PoseLandmark, topologia BlazePose)
+# używanych przez ćwiczenia
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_ELBOW = 13
+RIGHT_ELBOW = 14
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_KNEE = 25
+LEFT_ANKLE = 27
+RIGHT_ANKLE = 28
+LEFT_HEEL = 29
+LEFT_FOOT_INDEX = 31
+
+# Kąty w stawach jako trójki punktów (a, b - wierzchołek kąta, c)
+JOINTS = {
+    "left_knee": (LEFT_HIP, LEFT_KNEE, LEFT_ANKLE),
+    "left_elbow": (LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST),
+    "right_elbow": (RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST),
+}
+
+# Tablice trójek dla poszczególnych ćwiczeń - liczone jednym przebiegiem
+SQUAT_JOINTS = np.array([JOINTS["left_knee"]])
+PUSHUP_JOINTS = np.array([JOINTS["left_elbow"], JOINTS["right_elbow"]])
+
+# Funkcja do obliczania kąta (w stopniach) w punkcie b; a, b, c to tablice
+# o kształcie (..., 2) - pojedyncze punkty albo całe sekwencje naraz
+def angle_between(a, b, c):
+    radians = np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0]) - np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0])
+    angle = np.abs(np.degrees(radians))
+    return np.where(angle > 180.0, 360 - angle, angle)
+
+# Funkcja do obliczania kąta między trzema punktami
+def calculate_angle(a, b, c):
+    return float(angle_between(np.asarray(a), np.asarray(b), np.asarray(c)))
+
+# Funkcja licząca wszystkie kąty z tablicy trójek jednym wektorowym przebiegiem.
+# points: (33, C) dla jednej klatki albo (T, 33, C) dla sekwencji, wynik: (..., liczba kątów)
+def joint_angles(points, triplets):
+    xy = points[..., :2]
+    return angle_between(xy[..., triplets[:, 0], :], xy[..., triplets[:, 1], :], xy[..., triplets[:, 2], :])
+
+# Liczba punktów ciała zwracanych przez MediaPipe Pose
+NUM_LANDMARKS = 33
+
+# Tablice indeksów punktów potrzebnych poszczególnym ćwiczeniom - tylko te
+# punkty są przepisywane z wyniku MediaPipe w każdej klatce
+SQUAT_LANDMARKS = (LEFT_HIP, LEFT_KNEE, LEFT_ANKLE, LEFT_HEEL, LEFT_FOOT_INDEX)
+PUSHUP_LANDMARKS = (LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_ELBOW, RIGHT_ELBOW,
+                    LEFT_WRIST, RIGHT_WRIST, LEFT_HIP, RIGHT_HIP)
+JUMPING_JACK_LANDMARKS = (LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_WRIST, RIGHT_WRIST,
+                          LEFT_ANKLE, RIGHT_ANKLE)
+ALL_LANDMARKS = tuple(range(NUM_LANDMARKS))
+
+# Bufor punktów ciała jednej klatki: prealokowana tablica float32 (33, 4)
+# z kolumnami x, y, z, visibility, nadpisywana w miejscu w każdej klatce
+class LandmarkBuffer:
+    def __init__(self, indices=ALL_LANDMARKS):
+        self.points = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        # Przesunięcia w płaskim widoku bufora liczone raz, przy tworzeniu
+        self.offsets = tuple((i, i * 4) for i in indices)
+        # Zapis przez memoryview omija tworzenie skalarów numpy przy każdym przypisaniu
+        self.flat = memoryview(self.points.reshape(-1))
+
+    def update(self, landmarks):
+        flat = self.flat
+        for i, offset in self.offsets:
+            lm = landmarks[i]
+            flat[offset] = lm.x
+            flat[offset + 1] = lm.y
+            flat[offset + 2] = lm.z
+            flat[offset + 3] = lm.visibility
+        return self.points
+
+# Funkcja do weryfikacji ćwiczenia (np. przysiad). Działa zarówno na jednej
+# klatce (33, C), jak i na całej sekwencji (T, 33, C) - wtedy zwraca tablice
+def verify_squat(points, knee_tolerance=0.03, heel_tolerance=0.02):
+    # Oblicz kąt w kolanie
+    angle = joint_angles(points, SQUAT_JOINTS)[..., 0]
+
+    left_knee_x = points[..., LEFT_KNEE, 0]
+    left_heel_y = points[..., LEFT_HEEL, 1]
+    left_foot_index_x = points[..., LEFT_FOOT_INDEX, 0]
+    left_foot_index_y = points[..., LEFT_FOOT_INDEX, 1]
+
+    # Progi tolerancji (można dostosować): knee_tolerance - kolano (ułamek szerokości
+    # obrazu), heel_tolerance - pięta (ułamek wysokości obrazu)
+
+    # Sprawdź, czy kąt jest w zakresie przysiadu
+    squat_success = angle < 120  # Przykładowy warunek dla przysiadu
+
+    # Sprawdź, czy kolano wychodzi poza linię palców (z tolerancją)
+    knee_over_toes = left_knee_x > left_foot_index_x  # Porównaj współrzędne x
+    knee_error = knee_over_toes & (np.abs(left_knee_x - left_foot_index_x) > knee_tolerance)
+
+    # Sprawdź, czy pięta jest podniesiona wyżej niż palce (z tolerancją)
+    heel_raised = left_heel_y < left_foot_index_y  # Porównaj współrzędne y
+    heel_error = heel_raised & (np.abs(left_heel_y - left_foot_index_y) > heel_tolerance)
+
+    return squat_success, angle, knee_error, heel_error
+
+# Funkcja do weryfikacji pompki (jedna klatka lub sekwencja, jak verify_squat)
+def verify_pushup(points):
+    # Oblicz kąt w łokciach
+    angles = joint_angles(points, PUSHUP_JOINTS)
+    avg_angle = angles.mean(axis=-1)
+
+    # Sprawdź różnicę wysokości między biodrami a ramionami
+    shoulders_y = (points[..., LEFT_SHOULDER, 1] + points[..., RIGHT_SHOULDER, 1]) / 2
+    hips_y = (points[..., LEFT_HIP, 1] + points[..., RIGHT_HIP, 1]) / 2
+    body_aligned = np.abs(shoulders_y - hips_y) < 0.1  # Tolerancja dla prostego ciała
+
+    # Warunki dla poprawnej pompki
+    pushup_success = avg_angle < 90  # Pozycja dolna
+
+    # Sprawdź, czy ciało jest proste
+    alignment_error = ~body_aligned
+
+    return pushup_success, avg_angle, alignment_error
+
+# Funkcja do weryfikacji pajacyka - zwraca rozstaw stóp (jako ułamek
+# szerokości obrazu) oraz informację, czy dłonie są powyżej barków
+def verify_jumping_jack(points, width):
+    # Sprawdź dystans między stopami (w pikselach)
+    foot_dist = np.abs(np.trunc(points[..., LEFT_ANKLE, 0] * width) - np.trunc(points[..., RIGHT_ANKLE, 0] * width))
+
+    # Sprawdź czy dłonie są powyżej barków
+    hands_above_shoulders = ((points[..., LEFT_WRIST, 1] < points[..., LEFT_SHOULDER, 1])
+                             & (points[..., RIGHT_WRIST, 1] < points[..., RIGHT_SHOULDER, 1]))
+
+    return foot_dist / width, hands_above_shoulders
+
+# Wektorowy odpowiednik liczników poniżej dla całej sekwencji: enter[i] - warunek
+# wejścia w stan (dół / rozstaw), leave[i] - warunek wyjścia, który zalicza powtórzenie.
+# Zwraca liczbę powtórzeń i stan po każdej klatce
+def hysteresis(enter, leave):
+    events = np.where(enter, 1, np.where(leave, -1, 0))
+    # Powtórzenie to wyjście występujące bezpośrednio po wejściu w ciągu zdarzeń
+    changes = events[events != 0]
+    count = int(np.count_nonzero((changes[1:] == -1) & (changes[:-1] == 1)))
+    # Stan po klatce wyznacza ostatnie zdarzenie do tej klatki włącznie
+    last = np.maximum.accumulate(np.where(events != 0, np.arange(len(events)), -1))
+    state = (last >= 0) & (events[np.maximum(last, 0)] == 1)
+    return count, state
+
@@ -0,0 +1,232 @@
+import operator
+
+import numpy as np
+
+from exercise_logic import (
+    joint_angles, hysteresis, JOINTS,
+    LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_WRIST, RIGHT_WRIST, LEFT_HIP, RIGHT_HIP,
+    LEFT_KNEE, LEFT_ANKLE, RIGHT_ANKLE, LEFT_HEEL, LEFT_FOOT_INDEX
+)
+
+# Deklaratywny opis ćwiczeń: miary (kąty w stawach, odległości między punktami),
+# warunki wejścia/wyjścia licznika z histerezą i reguły błędów formy. Opis jest
+# kompilowany (CompiledRules) do tablic indeksów, więc wszystkie kąty i wszystkie
+# odległości ćwiczenia liczone są jednym wektorowym przebiegiem - na jednej klatce
+# (33, 4) w trybie na żywo albo na całej sekwencji (T, 33, 4) w trybie wsadowym.
+# Warunek to krotka (miara, operator, próg), gdzie próg jest liczbą albo nazwą
+# parametru ćwiczenia; miara "position" oznacza stan licznika (dolna pozycja / rozstaw).
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+# Kąt w stawie - średnia z kątów dla podanych trójek punktów (a, b - wierzchołek, c)
+class Angle:
+    def __init__(self, name, joints):
+        self.name = name
+        self.joints = np.asarray(joints).reshape(-1, 3)
+
+    def landmarks(self):
+        return set(self.joints.ravel().tolist())
+
+
+# Różnica współrzędnych par punktów (a[i] - b[i]) na osi 0 (x) lub 1 (y),
+# zredukowana po parach (mean/min/max); pixels - różnica pełnych pikseli
+# (jak w dotychczasowym rozstawie stóp), wynik zawsze w ułamku szerokości obrazu
+class Offset:
+    def __init__(self, name, a, b, axis, reduce="mean", absolute=False, pixels=False):
+        self.name = name
+        self.a = tuple(a)
+        self.b = tuple(b)
+        self.axis = axis
+        self.reduce = reduce
+        self.absolute = absolute
+        self.pixels = pixels
+
+    def landmarks(self):
+        return set(self.a) | set(self.b)
+
+
+class ExerciseRules:
+    def __init__(self, name, measures, enter, leave, errors, params):
+        self.name = name            # Nazwa ćwiczenia (jak w batch_score: przysiady, pompki, pajacyki)
+        self.measures = measures    # Lista miar Angle / Offset
+        self.enter = enter          # Warunki wejścia w dolną pozycję / rozstaw (wszystkie naraz)
+        self.leave = leave          # Warunki wyjścia, które zalicza powtórzenie
+        self.errors = errors        # Lista (nazwa błędu, warunki, komunikat)
+        self.params = params        # Domyślne wartości progów
+
+    # Punkty ciała potrzebne do policzenia wszystkich miar
+    @property
+    def landmarks(self):
+        return tuple(sorted(set().union(*(measure.landmarks() for measure in self.measures))))
+
+    @property
+    def error_names(self):
+        return [name for name, _, _ in self.errors]
+
+
+class CompiledRules:
+    def __init__(self, rules, params=None):
+        self.rules = rules
+        self.params = dict(rules.params, **(params or {}))
+
+        # Wszystkie kąty ćwiczenia jako jedna tablica trójek
+        angles = [m for m in rules.measures if isinstance(m, Angle)]
+        self.angle_triplets = np.concatenate([m.joints for m in angles]) if angles else None
+        self.angle_groups = []
+        start = 0
+        for m in angles:
+            self.angle_groups.append((m.name, slice(start, start + len(m.joints))))
+            start += len(m.joints)
+
+        # Wszystkie różnice współrzędnych jako jedna para tablic indeksów
+        offsets = [m for m in rules.measures if isinstance(m, Offset)]
+        # (indeksy w spłaszczonej tablicy punktów x, y, z, visibility: punkt * 4 + oś)
+        self.offset_a = np.array([i * 4 + m.axis for m in offsets for i in m.a], dtype=np.intp)
+        self.offset_b = np.array([i * 4 + m.axis for m in offsets for i in m.b], dtype=np.intp)
+        self.offset_groups = []
+        start = 0
+        for m in offsets:
+            # Pojedyncza para nie wymaga redukcji - wybieramy ją indeksem
+            group = start if len(m.a) == 1 else slice(start, start + len(m.a))
+            self.offset_groups.append((m, group))
+            start += len(m.a)
+
+        self.enter = self.resolve(rules.enter)
+        self.leave = self.resolve(rules.leave)
+        self.errors = [(name, self.resolve(conditions), message) for name, conditions, message in rules.errors]
+
+    # Zamiana nazw parametrów i operatorów na wartości i funkcje
+    def resolve(self, conditions):
+        return [(measure, OPERATORS[op], self.params[threshold] if isinstance(threshold, str) else threshold)
+                for measure, op, threshold in conditions]
+
+    # Wartości wszystkich miar: skalary dla klatki (33, 4), tablice (T,) dla sekwencji
+    def evaluate(self, points, width):
+        values = {}
+        if self.angle_triplets is not None:
+            angles = joint_angles(points, self.angle_triplets)
+            for name, group in self.angle_groups:
+                values[name] = angles[..., group].mean(axis=-1)
+        if self.offset_groups:
+            flat = points.reshape(points.shape[:-2] + (-1,))
+            a = flat[..., self.offset_a]
+            b = flat[..., self.offset_b]
+            diffs = a - b
+            for m, group in self.offset_groups:
+                if m.pixels:
+                    diff = (np.trunc(a[..., group] * width) - np.trunc(b[..., group] * width)) / width
+                else:
+                    diff = diffs[..., group]
+                if isinstance(group, slice):
+                    diff = getattr(diff, m.reduce)(axis=-1)
+                values[m.name] = np.abs(diff) if m.absolute else diff
+        return values
+
+    def check(self, conditions, values):
+        result = True
+        for measure, compare, threshold in conditions:
+            result = result & compare(values[measure], threshold)
+        return result
+
+    # Flagi błędów formy; position - stan licznika po bieżącej klatce (lub tablica stanów)
+    def error_flags(self, values, position):
+        values = dict(values, position=position)
+        return {name: self.check(conditions, values) for name, conditions, _ in self.errors}
+
+    # Komunikaty aktywnych błędów
+    def error_messages(self, flags):
+        return [message for name, _, message in self.errors if flags[name]]
+
+    # Ocena całej sekwencji: liczba powtórzeń i flagi błędów w każdej klatce
+    def score(self, points, width):
+        values = self.evaluate(points, width)
+        reps, position = hysteresis(self.check(self.enter, values), self.check(self.leave, values))
+        return reps, self.error_flags(values, position)
+
+
+# Licznik powtórzeń dla skompilowanych reguł (tryb na żywo, klatka po klatce)
+class RuleCounter:
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.count = 0
+        self.position = False  # Czy jesteśmy w dolnej pozycji / rozstawie
+
+    def update(self, values):
+        if self.compiled.check(self.compiled.enter, values):
+            self.position = True
+        elif self.position and self.compiled.check(self.compiled.leave, values):
+            self.position = False
+            self.count += 1
+            return True
+        return False
+
+    def reset(self):
+        self.count = 0
+
+
+# --- Ćwiczenia ---
+
+SQUAT = ExerciseRules(
+    "przysiady",
+    measures=[
+        Angle("knee_angle", [JOINTS["left_knee"]]),
+        # Wysunięcie kolana przed palce (x) i uniesienie pięty ponad palce (y)
+        Offset("knee_over_toes", [LEFT_KNEE], [LEFT_FOOT_INDEX], axis=0),
+        Offset("heel_raise", [LEFT_FOOT_INDEX], [LEFT_HEEL], axis=1),
+    ],
+    enter=[("knee_angle", "<", "success_angle"), ("knee_angle", "<", "min_angle_threshold")],
+    leave=[("knee_angle", ">", "max_angle_threshold")],
+    errors=[
+        ("knee_error", [("knee_over_toes", ">", "knee_tolerance")], "Błąd: Kolano wychodzi"),
+        ("heel_error", [("heel_raise", ">", "heel_tolerance")], "Błąd: Pięta uniesiona"),
+    ],
+    params={
+        "min_angle_threshold": 90,   # Minimalny kąt do uznania za pełny przysiad
+        "max_angle_threshold": 160,  # Maksymalny kąt do uznania za pozycję stojącą
+        "success_angle": 120,        # Kąt, poniżej którego pozycja jest przysiadem
+        "knee_tolerance": 0.03,      # Tolerancja dla kolana (ułamek szerokości obrazu)
+        "heel_tolerance": 0.02,      # Tolerancja dla pięty (ułamek wysokości obrazu)
+    },
+)
+
+PUSHUP = ExerciseRules(
+    "pompki",
+    measures=[
+        Angle("elbow_angle", [JOINTS["left_elbow"], JOINTS["right_elbow"]]),
+        # Różnica wysokości środka barków i środka bioder
+        Offset("body_tilt", [LEFT_SHOULDER, RIGHT_SHOULDER], [LEFT_HIP, RIGHT_HIP], axis=1, absolute=True),
+    ],
+    enter=[("elbow_angle", "<", "success_angle"), ("elbow_angle", "<", "min_angle_threshold")],
+    leave=[("elbow_angle", ">", "max_angle_threshold")],
+    errors=[
+        ("alignment_error", [("body_tilt", ">=", "alignment_tolerance")], "Błąd: Trzymaj ciało prosto"),
+    ],
+    params={
+        "min_angle_threshold": 90,   # Minimalny kąt do uznania za dolną pozycję
+        "max_angle_threshold": 160,  # Maksymalny kąt do uznania za górną pozycję
+        "success_angle": 90,         # Kąt, poniżej którego pozycja jest dolną pozycją pompki
+        "alignment_tolerance": 0.1,  # Tolerancja dla prostego ciała
+    },
+)
+
+JUMPING_JACK = ExerciseRules(
+    "pajacyki",
+    measures=[
+        # Rozstaw stóp (ułamek szerokości obrazu) i wysokość dłoni nad barkami (> 0 - obie powyżej)
+        Offset("foot_ratio", [LEFT_ANKLE], [RIGHT_ANKLE], axis=0, absolute=True, pixels=True),
+        Offset("hands_up", [LEFT_SHOULDER, RIGHT_SHOULDER], [LEFT_WRIST, RIGHT_WRIST], axis=1, reduce="min"),
+    ],
+    enter=[("foot_ratio", ">", "open_threshold"), ("hands_up", ">", 0)],
+    leave=[("foot_ratio", "<", "close_threshold")],
+    errors=[
+        ("hands_error", [("hands_up", "<=", 0), ("position", ">", 0)], "Podnieś ręce wyżej!"),
+        ("feet_error", [("foot_ratio", "<=", "open_threshold")], "Rozstaw szerzej nogi!"),
+    ],
+    params={
+        "open_threshold": 0.2,   # im większa wartość, tym szerzej trzeba rozstawić nogi
+        "close_threshold": 0.18,
+    },
+)
+
+EXERCISES = {rules.name: rules for rules in (SQUAT, PUSHUP, JUMPING_JACK)}
@@ -0,0 +1,445 @@
+import argparse
+import asyncio
+import json
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+import exercise_logic
+from autotune import DEFAULT_PATH as DEFAULT_PROFILE, load_settings
+from event_store import EventStore
+from events import REP, FORM_ERROR, FRAME, SUMMARY
+from exercise_logic import LandmarkBuffer, NUM_LANDMARKS
+from exercise_rules import EXERCISES, CompiledRules
+from pipeline import RgbBuffer, ResizeBuffer
+from rep_segmentation import RepSegmenter
+
+# Serwer wnioskowania dla słabych stanowisk (np. tabletów): klient wysyła przez
+# TCP klatki JPEG albo gotowe punkty ciała, a serwer uruchamia model Pose (osobny
+# dla każdego połączenia - śledzenie sylwetki jest stanem strumienia) i licznik
+# powtórzeń ćwiczenia, odsyłając zdarzenia (powtórzenia, błędy formy, potwierdzenia
+# klatek). Każde połączenie trzyma tylko najnowszą nieprzetworzoną klatkę, a klatka,
+# która czekała na wolny wątek modelu dłużej niż max_age, jest odrzucana.
+# Obciążenie na jednym komputerze: python load_client.py nagranie.mp4 --local --clients 8
+#
+# Wiadomość: rodzaj (1 bajt), długość treści (uint32, big-endian) i treść.
+#   H - powitanie klienta (JSON: exercise, opcjonalnie width, params, user, station)
+#   J - klatka JPEG: FRAME_HEADER (numer klatki, czas przechwycenia u klienta) + JPEG
+#   L - punkty ciała: FRAME_HEADER + float32 (33, 4) x, y, z, visibility (bez punktów - brak sylwetki)
+#   R - nowa seria (licznik od zera)
+#   B - koniec sesji, serwer odsyła podsumowanie i zamyka połączenie
+#   E - zdarzenie serwera (JSON z kluczem "type", jak w events.py)
+
+HELLO = b"H"
+JPEG = b"J"
+LANDMARKS = b"L"
+RESET = b"R"
+BYE = b"B"
+EVENT = b"E"
+
+HEADER = struct.Struct("!cI")
+FRAME_HEADER = struct.Struct("!Id")
+POINTS_SIZE = NUM_LANDMARKS * 4 * 4
+MAX_PAYLOAD = 8 * 1024 * 1024
+
+DEFAULT_PORT = 8765
+
+# Zdarzenia serwera spoza events.py
+READY = "ready"    # Odpowiedź na powitanie (ustawienia serwera)
+ERROR = "error"    # Błąd protokołu lub odrzucone połączenie
+
+
+class ProtocolError(Exception):
+    pass
+
+
+# --- Protokół (wspólny z load_client.py) ---
+
+async def read_message(reader):
+    kind, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if length > MAX_PAYLOAD:
+        raise ProtocolError(f"Zbyt długa wiadomość: {length} B")
+    return kind, await reader.readexactly(length)
+
+def encode_message(kind, payload=b""):
+    return HEADER.pack(kind, len(payload)) + payload
+
+def encode_json(kind, data):
+    return encode_message(kind, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+def encode_frame(kind, seq, capture_time, data=b""):
+    return encode_message(kind, FRAME_HEADER.pack(seq, capture_time) + data)
+
+
+# Klatka oczekująca na przetworzenie
+class PendingFrame:
+    def __init__(self, kind, seq, capture_time, data, received):
+        self.kind = kind
+        self.seq = seq                    # Numer klatki nadany przez klienta
+        self.capture_time = capture_time  # Czas przechwycenia wg zegara klienta (s)
+        self.data = data                  # JPEG albo punkty ciała
+        self.received = received          # Odebranie przez serwer (time.perf_counter)
+
+
+# Jedno połączenie: odbiór wiadomości i przetwarzanie najnowszej klatki działają
+# jako osobne zadania, więc odbiór nie czeka na model, a model nie dostaje kolejki
+# przeterminowanych klatek
+class ClientConnection:
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        peer = writer.get_extra_info("peername")
+        self.name = f"{peer[0]}:{peer[1]}" if peer else "?"
+        self.exercise = None
+        self.compiled = None
+        self.counter = None
+        self.buffer = None
+        self.width = 0
+        self.pose = None           # Model Pose połączenia (tworzony przy pierwszej klatce JPEG)
+        self.rgb = RgbBuffer()
+        self.resize = ResizeBuffer(server.options["input_width"])
+        self.session = None        # Sesja w bazie zdarzeń (event_store)
+        self.active_errors = set()
+
+        self.pending = None
+        self.wakeup = asyncio.Event()
+        self.closing = False
+        self.completed = False     # Klient zakończył sesję wiadomością B
+
+        # Statystyki
+        self.started = time.perf_counter()
+        self.received = 0
+        self.processed = 0
+        self.frames_with_pose = 0
+        self.dropped_overwritten = 0  # Klatki zastąpione nowszą przed przetworzeniem
+        self.dropped_late = 0         # Klatki starsze niż max_age w chwili przetwarzania
+        self.times = deque(maxlen=300)  # Czas odebranie -> wynik (s)
+
+    async def run(self):
+        try:
+            await self.handshake()
+            receiving = asyncio.create_task(self.receive_loop())
+            processing = asyncio.create_task(self.process_loop())
+            try:
+                await asyncio.wait((receiving, processing), return_when=asyncio.FIRST_COMPLETED)
+                if not receiving.done():
+                    # Przetwarzanie kończy się przed odbiorem tylko wyjątkiem
+                    processing.result()
+                receiving.result()
+            finally:
+                # Po końcu odbioru przetwarzana jest jeszcze ostatnia oczekująca klatka
+                self.closing = True
+                self.wakeup.set()
+                receiving.cancel()
+                await asyncio.gather(processing, return_exceptions=True)
+            if self.completed:
+                await self.send(SUMMARY, **self.summary())
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except (ProtocolError, ValueError, asyncio.TimeoutError) as e:
+            print(f"Klient {self.name}: {e}", file=sys.stderr)
+            await self.send(ERROR, error=str(e))
+        finally:
+            await self.close()
+
+    async def handshake(self):
+        kind, payload = await asyncio.wait_for(read_message(self.reader), self.server.options["hello_timeout"])
+        if kind != HELLO:
+            raise ProtocolError("Oczekiwano powitania (H)")
+        hello = json.loads(payload)
+        if not isinstance(hello, dict):
+            raise ProtocolError("Powitanie musi być obiektem JSON")
+        exercise = hello.get("exercise")
+        if exercise not in EXERCISES:
+            raise ProtocolError(f"Nieznane ćwiczenie: {exercise}")
+        params = hello.get("params") or {}
+        if not isinstance(params, dict):
+            raise ProtocolError("Progi (params) muszą być obiektem JSON")
+        for name, value in params.items():
+            if name not in EXERCISES[exercise].params:
+                raise ProtocolError(f"Nieznany próg ćwiczenia {exercise}: {name}")
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ProtocolError(f"Próg {name} musi być liczbą")
+        width = hello.get("width") or 0
+        if isinstance(width, bool) or not isinstance(width, (int, float)):
+            raise ProtocolError("Szerokość obrazu (width) musi być liczbą")
+        self.exercise = exercise
+        self.compiled = CompiledRules(EXERCISES[exercise], params)
+        self.counter = RepSegmenter(self.compiled)
+        self.buffer = LandmarkBuffer(EXERCISES[exercise].landmarks)
+        self.width = int(width)  # Szerokość obrazu klienta (tryb punktów ciała)
+        if self.server.store is not None:
+            self.session = self.server.store.session(hello.get("user"), hello.get("station") or self.name)
+        await self.send(READY, exercise=exercise, max_age_ms=self.server.options["max_age"] * 1000.0,
+                        input_width=self.server.options["input_width"])
+
+    async def receive_loop(self):
+        while True:
+            try:
+                kind, payload = await read_message(self.reader)
+            except asyncio.IncompleteReadError:
+                return
+            if kind in (JPEG, LANDMARKS):
+                if len(payload) < FRAME_HEADER.size:
+                    raise ProtocolError("Niepełny nagłówek klatki")
+                seq, capture_time = FRAME_HEADER.unpack_from(payload)
+                if self.pending is not None:
+                    self.dropped_overwritten += 1
+                self.pending = PendingFrame(kind, seq, capture_time, payload[FRAME_HEADER.size:],
+                                            time.perf_counter())
+                self.received += 1
+                self.wakeup.set()
+            elif kind == RESET:
+                self.counter.reset()
+            elif kind == BYE:
+                self.completed = True
+                return
+            else:
+                raise ProtocolError(f"Nieznany rodzaj wiadomości: {kind!r}")
+
+    async def process_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            frame = self.pending
+            self.pending = None
+            if frame is None:
+                if self.closing:
+                    break
+                continue
+            if frame.kind == JPEG:
+                result = await loop.run_in_executor(self.server.executor, self.infer, frame)
+            else:
+                result = self.decode_points(frame)
+            if result is None:
+                # Potwierdzenie odrzuconej klatki - klient zwalnia miejsce w oknie wysyłania
+                self.dropped_late += 1
+                await self.send(FRAME, seq=frame.seq, processed=False)
+                continue
+            points, width = result
+            self.processed += 1
+            if points is not None:
+                self.frames_with_pose += 1
+                await self.analyze(points, width, frame.capture_time)
+            elapsed = time.perf_counter() - frame.received
+            self.times.append(elapsed)
+            self.server.processed += 1
+            await self.send(FRAME, seq=frame.seq, processed=True, pose_detected=points is not None,
+                            server_ms=round(elapsed * 1000.0, 2), count=self.counter.count)
+
+    def late(self, frame):
+        return time.perf_counter() - frame.received > self.server.options["max_age"]
+
+    # Wątek modelu: dekodowanie JPEG i pose.process; None - klatka przeterminowana
+    # (czekała na wolny wątek, gdy serwer jest przeciążony)
+    def infer(self, frame):
+        if self.late(frame):
+            return None
+        options = self.server.options
+        if self.pose is None:
+            self.pose = exercise_logic.mp_pose.Pose(model_complexity=options["model_complexity"],
+                                                    min_detection_confidence=options["min_detection_confidence"],
+                                                    min_tracking_confidence=options["min_tracking_confidence"])
+        image = cv2.imdecode(np.frombuffer(frame.data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ProtocolError(f"Niepoprawna klatka JPEG {frame.seq}")
+        results = self.pose.process(self.rgb.convert(self.resize.resize(image)))
+        if not results.pose_landmarks:
+            return None, image.shape[1]
+        return self.buffer.update(results.pose_landmarks.landmark), image.shape[1]
+
+    def decode_points(self, frame):
+        if self.late(frame):
+            return None
+        if not frame.data:
+            return None, self.width
+        if len(frame.data) != POINTS_SIZE:
+            raise ProtocolError(f"Niepoprawny rozmiar punktów ciała: {len(frame.data)} B")
+        if not self.width:
+            raise ProtocolError("Tryb punktów ciała wymaga szerokości obrazu w powitaniu")
+        return np.frombuffer(frame.data, dtype=np.float32).reshape(NUM_LANDMARKS, 4), self.width
+
+    # Licznik i błędy formy jak w Workout.analyze (bez faz sesji - seria trwa do R)
+    async def analyze(self, points, width, timestamp):
+        values = self.compiled.evaluate(points, width)
+        count = self.counter.count
+        self.counter.update(values, timestamp)
+        active = {name for name, flag in self.counter.flags.items() if flag}
+        for name in sorted(active - self.active_errors):
+            await self.emit(FORM_ERROR, timestamp, name=name)
+        self.active_errors = active
+        if self.counter.count > count:
+            await self.emit(REP, timestamp, count=self.counter.count, rep=self.counter.last.as_dict())
+
+    async def emit(self, kind, timestamp, **data):
+        data["exercise"] = self.exercise
+        data["time"] = timestamp
+        if self.session is not None:
+            self.session.record(dict(data, type=kind))
+        await self.send(kind, **data)
+
+    # Zapis do klienta; drain() wstrzymuje przetwarzanie tylko tego połączenia,
+    # gdy klient nie nadąża z odbiorem
+    async def send(self, kind, **data):
+        data["type"] = kind
+        if self.writer.is_closing():
+            return
+        try:
+            self.writer.write(encode_json(EVENT, data))
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        times_ms = np.array(self.times) * 1000.0 if self.times else np.zeros(1)
+        return {
+            "client": self.name,
+            "exercise": self.exercise,
+            "reps": self.counter.count if self.counter is not None else 0,
+            "received": self.received,
+            "processed": self.processed,
+            "frames_with_pose": self.frames_with_pose,
+            "dropped_overwritten": self.dropped_overwritten,
+            "dropped_late": self.dropped_late,
+            "seconds": round(elapsed, 3),
+            "fps": round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+            "p50_ms": round(float(np.percentile(times_ms, 50)), 2),
+            "p95_ms": round(float(np.percentile(times_ms, 95)), 2),
+        }
+
+    async def close(self):
+        if self.counter is not None:
+            summary = self.summary()
+            if self.session is not None:
+                self.session.record({"type": SUMMARY, "exercise": self.exercise, "completed": self.completed,
+                                     "total_reps": summary["reps"], "exercise_time": summary["seconds"],
+                                     "frames": summary["processed"]})
+            if self.server.verbose:
+                print(f"Klient {self.name} rozłączony: {summary}", file=sys.stderr)
+        if self.pose is not None:
+            await asyncio.get_running_loop().run_in_executor(self.server.executor, self.pose.close)
+            self.pose = None
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class InferenceServer:
+    def __init__(self, workers=4, max_clients=32, max_age=0.25, model_complexity=1, input_width=None,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5, hello_timeout=5.0, store=None,
+                 verbose=True):
+        self.options = {
+            "max_age": max_age,                  # Maksymalny czas oczekiwania klatki na model (s)
+            "model_complexity": model_complexity,
+            "input_width": input_width,
+            "min_detection_confidence": min_detection_confidence,
+            "min_tracking_confidence": min_tracking_confidence,
+            "hello_timeout": hello_timeout,
+        }
+        self.max_clients = max_clients
+        # Wątki modelu wspólne dla wszystkich połączeń - pose.process zwalnia GIL
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pose")
+        self.store = store
+        self.verbose = verbose
+        self.connections = set()
+        self.tasks = set()          # Zadania obsługi połączeń (także zamykanych)
+        self.server = None
+        self.processed = 0
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader, writer):
+        connection = ClientConnection(self, reader, writer)
+        if len(self.connections) >= self.max_clients:
+            await connection.send(ERROR, error=f"Serwer obsługuje najwyżej {self.max_clients} klientów")
+            await connection.close()
+            return
+        task = asyncio.current_task()
+        self.connections.add(connection)
+        self.tasks.add(task)
+        try:
+            await connection.run()
+        finally:
+            self.connections.discard(connection)
+            self.tasks.discard(task)
+
+    # Okresowy raport obciążenia
+    async def report(self, interval):
+        last = self.processed
+        while True:
+            await asyncio.sleep(interval)
+            dropped = sum(c.dropped_overwritten + c.dropped_late for c in self.connections)
+            print(f"{len(self.connections)} klientów, {(self.processed - last) / interval:.1f} klatek/s, "
+                  f"odrzucone w bieżących połączeniach: {dropped}", file=sys.stderr)
+            last = self.processed
+
+    # Zamknięcie: bez nowych połączeń, bieżące mają timeout sekund na zakończenie
+    async def close(self, timeout=5.0):
+        if self.server is not None:
+            self.server.close()
+        if self.tasks:
+            _, pending = await asyncio.wait(set(self.tasks), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+
+async def serve(args, settings, store):
+    server = await InferenceServer(workers=args.workers, max_clients=args.max_clients, max_age=args.max_age / 1000.0,
+                                   store=store, **settings).start(args.host, args.port)
+    print(f"Serwer wnioskowania na {args.host}:{server.port} ({args.workers} wątków modelu)", file=sys.stderr)
+    reporter = asyncio.create_task(server.report(args.report_interval)) if args.report_interval > 0 else None
+    try:
+        await server.server.serve_forever()
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serwer wnioskowania Pose i liczenia powtórzeń dla zdalnych klientów')
+    parser.add_argument('--host', default='127.0.0.1', help='Adres nasłuchiwania (0.0.0.0 - wszystkie interfejsy)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=4, help='Liczba wątków modelu wspólnych dla klientów')
+    parser.add_argument('--max-clients', type=int, default=32, help='Maksymalna liczba jednoczesnych połączeń')
+    parser.add_argument('--max-age', type=float, default=250,
+                        help='Klatka czekająca na model dłużej niż tyle ms jest odrzucana')
+    parser.add_argument('--profile', default=DEFAULT_PROFILE,
+                        help='Profil wydajności z autotune.py (złożoność modelu, szerokość wejścia)')
+    parser.add_argument('--report-interval', type=float, default=5.0,
+                        help='Co ile sekund raportować obciążenie (0 - bez raportów)')
+    parser.add_argument('--store', help='Baza SQLite, do której zapisywane są zdarzenia klientów (event_store.py)')
+    args = parser.parse_args()
+
+    store = EventStore(args.store).start() if args.store else None
+    try:
+        asyncio.run(serve(args, load_settings(args.profile), store))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if store is not None:
+            store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import cv2
+import numpy as np
+
+from exercise_logic import LandmarkBuffer, ALL_LANDMARKS, joint_angles
+
+# Wnioskowanie z pomijaniem klatek: model Pose uruchamiany jest tylko na klatkach
+# kluczowych (co N-tą klatkę lub przy wyraźnym ruchu w obrazie), a punkty ciała
+# w klatkach pośrednich są przewidywane modelem stałej prędkości. N dobierane jest
+# do tempa zmian śledzonych kątów - przy szybkim ruchu model działa częściej.
+
+
+# Wynik klatki kluczowej lub przewidywanej
+class KeyframeResult:
+    def __init__(self, pose_landmarks, keyframe, skip, source):
+        self.pose_landmarks = pose_landmarks  # Punkty ciała (z modelu lub przewidziane)
+        self.keyframe = keyframe              # True - klatka przetworzona przez model
+        self.skip = skip                      # Bieżący odstęp między klatkami kluczowymi
+        self.source = source                  # Wynik ostatniej klatki kluczowej
+
+    def info(self):
+        info = self.source.info() if hasattr(self.source, "info") else {}
+        info.update({"keyframe": self.keyframe, "skip": self.skip})
+        return info
+
+
+class KeyframePoseInference:
+    def __init__(self, infer, joints=None, max_skip=4, max_angle_step=4.0, max_point_step=0.01,
+                 motion_threshold=12.0, thumbnail_size=(32, 24)):
+        self.infer = infer                        # Funkcja wnioskowania klatka -> wynik z pose_landmarks
+        self.joints = joints                      # Trójki punktów śledzonych kątów (np. SQUAT_JOINTS)
+        self.max_skip = max_skip
+        self.max_angle_step = max_angle_step      # Dopuszczalna zmiana kąta między klatkami kluczowymi (stopnie)
+        self.max_point_step = max_point_step      # To samo dla położenia punktów, gdy brak kątów
+        self.motion_threshold = motion_threshold  # Średnia różnica miniatur wymuszająca klatkę kluczową
+        self.thumbnail_size = thumbnail_size
+        self.buffer = LandmarkBuffer(ALL_LANDMARKS)
+        self.frames = 0
+        self.keyframes = 0
+        self.reset()
+
+    def reset(self):
+        self.last_result = None
+        self.last_points = None     # Punkty ostatniej klatki kluczowej (33, 4)
+        self.velocity = None        # Zmiana punktów na klatkę
+        self.last_frame = 0         # Numer ostatniej klatki kluczowej
+        self.thumbnail = None
+        self.skip = 1
+
+    def make_thumbnail(self, frame):
+        small = cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.int16)
+
+    # Odstęp między klatkami kluczowymi dobrany tak, aby śledzone kąty (lub punkty)
+    # zmieniały się między nimi najwyżej o max_angle_step (max_point_step)
+    def adapt_skip(self, previous, points, frames_between):
+        if self.joints is not None:
+            step = np.abs(joint_angles(points, self.joints) - joint_angles(previous, self.joints)).max()
+            speed = step / (frames_between * self.max_angle_step)
+        else:
+            step = np.abs(points[:, :2] - previous[:, :2]).max()
+            speed = step / (frames_between * self.max_point_step)
+        return int(np.clip(1.0 / speed, 1, self.max_skip)) if speed > 0 else self.max_skip
+
+    # Przewidywane punkty: kopia ostatniego wyniku modelu z położeniami przesuniętymi
+    # o prędkość razy liczbę klatek od klatki kluczowej
+    def predict(self):
+        source = self.last_result.pose_landmarks
+        landmarks = type(source)()
+        landmarks.CopyFrom(source)
+        points = self.last_points[:, :3] + self.velocity[:, :3] * (self.frames - self.last_frame)
+        for lm, (x, y, z) in zip(landmarks.landmark, points.tolist()):
+            lm.x, lm.y, lm.z = x, y, z
+        return landmarks
+
+    def __call__(self, frame):
+        self.frames += 1
+        thumbnail = self.make_thumbnail(frame)
+
+        # Klatka pośrednia tylko przy znanej sylwetce, w granicach odstępu i bez wyraźnego ruchu
+        if (self.last_points is not None and self.frames - self.last_frame < self.skip
+                and np.abs(thumbnail - self.thumbnail).mean() < self.motion_threshold):
+            return KeyframeResult(self.predict(), False, self.skip, self.last_result)
+
+        result = self.infer(frame)
+        self.keyframes += 1
+        self.thumbnail = thumbnail
+        if not result.pose_landmarks:
+            # Brak sylwetki - szukamy jej w każdej klatce
+            self.last_result = result
+            self.last_points = None
+            self.skip = 1
+            return KeyframeResult(None, True, self.skip, result)
+
+        points = self.buffer.update(result.pose_landmarks.landmark).copy()
+        if self.last_points is not None:
+            frames_between = self.frames - self.last_frame
+            self.velocity = (points - self.last_points) / frames_between
+            self.skip = self.adapt_skip(self.last_points, points, frames_between)
+        else:
+            self.velocity = np.zeros_like(points)
+            self.skip = 1
+        self.last_result = result
+        self.last_points = points
+        self.last_frame = self.frames
+        return KeyframeResult(result.pose_landmarks, True, self.skip, result)
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "keyframes": self.keyframes,
+            "keyframe_ratio": round(self.keyframes / self.frames, 3) if self.frames else 0.0,
+        }
@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+
+from exercise_logic import LandmarkBuffer, ALL_LANDMARKS, NUM_LANDMARKS
+
+# Zapis strumienia punktów ciała z sesji na żywo do zwartego pliku binarnego
+# i jego odczyt przez np.memmap - bez kopiowania i bez ponownego uruchamiania
+# modelu Pose. Plik: 64-bajtowy nagłówek, a po nim rekordy stałej długości.
+
+MAGIC = b"FDLM"
+VERSION = 1
+HEADER_SIZE = 64
+
+# Nagłówek: znacznik, wersja, rozdzielczość klatki i nazwa ćwiczenia (np. "przysiady")
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("width", "<u4"),
+    ("height", "<u4"),
+    ("exercise", "S48"),
+])
+
+# Rekord klatki: czas przechwycenia, czy wykryto sylwetkę, punkty (x, y, z, visibility)
+RECORD_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("detected", "u1"),
+    ("points", "<f4", (NUM_LANDMARKS, 4)),
+])
+
+
+class LandmarkRecorder:
+    def __init__(self, path, width, height, exercise=""):
+        self.path = path
+        self.file = open(path, "wb")
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header[0] = (MAGIC, VERSION, width, height, exercise.encode("utf-8"))
+        self.file.write(header.tobytes().ljust(HEADER_SIZE, b"\0"))
+        self.buffer = LandmarkBuffer(ALL_LANDMARKS)
+        self.record = np.zeros(1, dtype=RECORD_DTYPE)
+        self.frames = 0
+
+    # Zapis jednej klatki; landmarks=None - klatka bez wykrytej sylwetki
+    def write(self, capture_time, landmarks):
+        record = self.record[0]
+        record["time"] = capture_time
+        record["detected"] = landmarks is not None
+        if landmarks is not None:
+            record["points"] = self.buffer.update(landmarks)
+        else:
+            record["points"] = 0.0
+        self.file.write(self.record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+# Odczyt nagrania - rekordy są widokiem np.memmap na plik
+class LandmarkRecording:
+    def __init__(self, path):
+        self.path = path
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header[0]["magic"] != MAGIC:
+            raise ValueError(f"To nie jest nagranie punktów ciała: {path}")
+        if header[0]["version"] != VERSION:
+            raise ValueError(f"Nieobsługiwana wersja nagrania {header[0]['version']}: {path}")
+        self.width = int(header[0]["width"])
+        self.height = int(header[0]["height"])
+        self.exercise = header[0]["exercise"].decode("utf-8")
+        # Niepełny ostatni rekord (np. przerwany zapis) jest pomijany
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def times(self):
+        return self.records["time"]
+
+    # Punkty (T, 33, 4) z klatek, w których wykryto sylwetkę
+    def detected_points(self):
+        return self.records["points"][self.records["detected"].astype(bool)]
+
+    def duration(self):
+        return float(self.times[-1] - self.times[0]) if len(self) > 1 else 0.0
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+from pipeline import RgbBuffer
+from stage_timing import NULL_TIMER
+
+# Asynchroniczne wnioskowanie MediaPipe Tasks PoseLandmarker w trybie LIVE_STREAM.
+# Klatka jest przekazywana do modelu z (rosnącym) znacznikiem czasu i metoda
+# submit() od razu wraca; wynik przychodzi w wątku MediaPipe przez callback
+# i trafia do on_result(seq, capture_time, frame, result). Przechwytywanie
+# i wyświetlanie nie czekają na model (AsyncFramePipeline w pipeline.py).
+# Wynik ma pose_landmarks w formacie legacy (NormalizedLandmarkList), więc
+# rysowanie i analiza punktów działają bez zmian. MediaPipe jest importowany
+# dopiero przy budowie modelu (w wątku ładowania PoseResources).
+
+MODEL_URL = ("https://storage.googleapis.com/mediapipe-models/pose_landmarker/"
+             "pose_landmarker_full/float16/latest/pose_landmarker_full.task")
+DEFAULT_MODEL = "pose_landmarker_full.task"
+
+
+class LiveStreamResult:
+    def __init__(self, pose_landmarks, inference_ms):
+        self.pose_landmarks = pose_landmarks  # NormalizedLandmarkList albo None
+        self.inference_ms = inference_ms      # Czas od przekazania klatki do wyniku
+
+    def info(self):
+        return {"backend": "live_stream", "inference_ms": round(self.inference_ms, 1)}
+
+
+class LiveStreamPoseInference:
+    def __init__(self, model_path=DEFAULT_MODEL, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 max_pending=4):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Brak modelu {model_path} - pobierz go z {MODEL_URL}")
+        import mediapipe as mp
+        from mediapipe.framework.formats import landmark_pb2
+        self.mp = mp
+        self.landmark_pb2 = landmark_pb2
+        vision = mp.tasks.vision
+        options = vision.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_poses=1,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_pose_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self.on_landmarks,
+        )
+        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+        self.max_pending = max_pending  # Limit klatek w toku - kolejne są pomijane, zamiast się kolejkować
+        self.on_result = None           # Odbiorca wyników (ustawiany przez AsyncFramePipeline)
+        self.timer = NULL_TIMER
+        self.rgb = RgbBuffer()
+        self.condition = threading.Condition()
+        self.pending = {}               # znacznik czasu [ms] -> (seq, capture_time, frame, czas przekazania)
+        self.last_timestamp = -1
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0                # Klatki pominięte (limit w toku albo odrzucone przez zajęty model)
+
+    # Przekazanie klatki do modelu - nie czeka na wynik
+    def submit(self, seq, capture_time, frame):
+        with self.condition:
+            if len(self.pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            # Znaczniki czasu muszą ściśle rosnąć
+            timestamp = max(int(capture_time * 1000), self.last_timestamp + 1)
+            self.last_timestamp = timestamp
+            self.pending[timestamp] = (seq, capture_time, frame, time.perf_counter())
+            self.submitted += 1
+        image = self.mp.Image(image_format=self.mp.ImageFormat.SRGB, data=self.rgb.convert(frame))
+        self.landmarker.detect_async(image, timestamp)
+        return True
+
+    # Callback MediaPipe (wątek modelu)
+    def on_landmarks(self, result, output_image, timestamp_ms):
+        with self.condition:
+            entry = self.pending.pop(timestamp_ms, None)
+            # Wcześniejsze klatki bez wyniku zostały odrzucone przez zajęty model
+            stale = [t for t in self.pending if t < timestamp_ms]
+            for t in stale:
+                del self.pending[t]
+            self.dropped += len(stale)
+            self.completed += 1
+            self.condition.notify_all()
+        if entry is None:
+            return
+        seq, capture_time, frame, submitted_at = entry
+        inference = time.perf_counter() - submitted_at
+        self.timer.record(seq, "pose.detect_async", inference)
+
+        landmarks = None
+        landmark_pb2 = self.landmark_pb2
+        if result.pose_landmarks:
+            landmarks = landmark_pb2.NormalizedLandmarkList(landmark=[
+                landmark_pb2.NormalizedLandmark(x=lm.x, y=lm.y, z=lm.z, visibility=lm.visibility or 0.0)
+                for lm in result.pose_landmarks[0]
+            ])
+        on_result = self.on_result
+        if on_result is not None:
+            on_result(seq, capture_time, frame, LiveStreamResult(landmarks, inference * 1000.0))
+
+    # Czekanie na wyniki wszystkich klatek w toku
+    def wait_idle(self, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while self.pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    # Przed nowym treningiem - zapominamy klatki w toku (model śledzi dalej ze znacznikami czasu)
+    def reset(self):
+        with self.condition:
+            self.pending.clear()
+
+    def stats(self):
+        return {"submitted": self.submitted, "completed": self.completed, "dropped": self.dropped}
+
+    def close(self):
+        self.landmarker.close()
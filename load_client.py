@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from events import REP, FORM_ERROR, FRAME, SUMMARY
+from exercise_rules import EXERCISES
+from inference_server import (
+    InferenceServer, ProtocolError, DEFAULT_PORT, HELLO, JPEG, LANDMARKS, BYE, EVENT, READY, ERROR,
+    read_message, encode_json, encode_message, encode_frame
+)
+from landmark_recording import LandmarkRecording
+
+# Generator obciążenia serwera wnioskowania (inference_server.py): wielu
+# symulowanych klientów-tabletów w jednym procesie, każdy odtwarza to samo
+# nagranie w tempie kamery. Nagranie wideo jest wysyłane jako klatki JPEG
+# (kodowane raz, przed pomiarem), a nagranie punktów ciała (.fdlm z --record)
+# jako punkty. Klient ma najwyżej --window klatek bez potwierdzenia serwera;
+# klatki kamery przypadające na pełne okno są pomijane, jak na słabym urządzeniu.
+#   python load_client.py nagranie.mp4 --local --clients 8      - serwer w tym samym procesie
+#   python load_client.py sesja.fdlm --host 192.168.1.10 --clients 20
+
+
+# Nagranie przygotowane do wysyłania: lista treści klatek (JPEG lub punkty) i tempo
+class StreamSource:
+    def __init__(self, kind, frames, fps, width, exercise):
+        self.kind = kind          # JPEG albo LANDMARKS
+        self.frames = frames      # Treści kolejnych klatek (bytes)
+        self.fps = fps
+        self.width = width
+        self.exercise = exercise  # Ćwiczenie zapisane w nagraniu punktów ciała (lub None)
+
+    @classmethod
+    def load(cls, path, max_frames, width=None, quality=80, fps=None):
+        if os.path.splitext(path)[1].lower() == ".fdlm":
+            recording = LandmarkRecording(path)
+            records = recording.records[:max_frames]
+            frames = [record["points"].astype(np.float32).tobytes() if record["detected"] else b""
+                      for record in records]
+            if fps is None:
+                duration = recording.duration()
+                fps = (len(recording) - 1) / duration if duration > 0 else 30.0
+            return cls(LANDMARKS, frames, fps, recording.width, recording.exercise or None)
+
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise IOError(f"Nie można otworzyć pliku: {path}")
+        fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frames = []
+        frame_width = 0
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            height, frame_width = frame.shape[:2]
+            if width and frame_width > width:
+                # Klatka zmniejszona jak z kamery tabletu
+                frame = cv2.resize(frame, (width, round(height * width / frame_width)), interpolation=cv2.INTER_AREA)
+                frame_width = width
+            ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            frames.append(data.tobytes())
+        cap.release()
+        return cls(JPEG, frames, fps, frame_width, None)
+
+
+class LoadClient:
+    def __init__(self, name, source, exercise, window=2, loops=1):
+        self.name = name
+        self.source = source
+        self.exercise = exercise
+        self.window = window    # Najwięcej klatek wysłanych bez potwierdzenia
+        self.loops = loops      # Ile razy odtworzyć nagranie
+        self.in_flight = OrderedDict()  # Numer klatki -> czas wysłania (time.perf_counter)
+        self.sent = 0
+        self.skipped = 0        # Klatki pominięte przy pełnym oknie
+        self.processed = 0
+        self.late = 0           # Klatki odrzucone przez serwer jako przeterminowane
+        self.frames_with_pose = 0
+        self.reps = 0
+        self.form_errors = 0
+        self.round_trips = []   # Wysłanie -> potwierdzenie przetworzonej klatki (s)
+        self.summary = None
+        self.error = None
+        self.acked = asyncio.Event()
+        self.connected = False
+        self.seconds = 0.0
+
+    async def run(self, host, port):
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError as e:
+            self.error = str(e)
+            return self
+        try:
+            writer.write(encode_json(HELLO, {"exercise": self.exercise, "width": self.source.width,
+                                             "station": self.name}))
+            await writer.drain()
+            event = await self.read_event(reader)
+            if event["type"] != READY:
+                self.error = event.get("error", event["type"])
+                return self
+            self.connected = True
+            receiving = asyncio.create_task(self.receive_loop(reader))
+            await self.send_loop(writer)
+            writer.write(encode_message(BYE))
+            await writer.drain()
+            # Podsumowanie serwera przychodzi po ostatnim potwierdzeniu
+            await asyncio.wait_for(receiving, timeout=10.0)
+        except (OSError, ValueError, ProtocolError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+            self.error = self.error or f"{e.__class__.__name__}: {e}"
+        finally:
+            self.seconds = time.perf_counter() - started
+            writer.close()
+        return self
+
+    async def read_event(self, reader):
+        kind, payload = await read_message(reader)
+        if kind != EVENT:
+            raise ValueError(f"Nieoczekiwana wiadomość serwera: {kind!r}")
+        return json.loads(payload)
+
+    # Klatki w tempie nagrania; seq rośnie także przy powtórzeniach nagrania
+    async def send_loop(self, writer):
+        interval = 1.0 / self.source.fps
+        next_frame = time.perf_counter()
+        seq = 0
+        for _ in range(self.loops):
+            for data in self.source.frames:
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_frame += interval
+                if not self.connected:
+                    return
+                seq += 1
+                if len(self.in_flight) >= self.window:
+                    self.skipped += 1
+                    continue
+                now = time.perf_counter()
+                self.in_flight[seq] = now
+                writer.write(encode_frame(self.source.kind, seq, now, data))
+                await writer.drain()
+                self.sent += 1
+        # Czekamy na potwierdzenie wysłanych klatek
+        while self.in_flight and self.connected:
+            self.acked.clear()
+            await asyncio.wait_for(self.acked.wait(), timeout=10.0)
+
+    async def receive_loop(self, reader):
+        try:
+            while True:
+                event = await self.read_event(reader)
+                kind = event["type"]
+                if kind == FRAME:
+                    self.acknowledge(event)
+                elif kind == REP:
+                    self.reps = event["count"]
+                elif kind == FORM_ERROR:
+                    self.form_errors += 1
+                elif kind == SUMMARY:
+                    self.summary = event
+                    return
+                elif kind == ERROR:
+                    self.error = event["error"]
+                    return
+        finally:
+            # Koniec odbioru przerywa wysyłanie i oczekiwanie na potwierdzenia
+            self.connected = False
+            self.acked.set()
+
+    # Potwierdzenie jest kumulatywne: serwer przetwarza klatki w kolejności, więc
+    # starsze klatki bez potwierdzenia zostały zastąpione nowszą
+    def acknowledge(self, event):
+        seq = event["seq"]
+        sent = self.in_flight.get(seq)
+        while self.in_flight and next(iter(self.in_flight)) <= seq:
+            self.in_flight.popitem(last=False)
+        if event["processed"]:
+            self.processed += 1
+            self.frames_with_pose += event["pose_detected"]
+            if sent is not None:
+                self.round_trips.append(time.perf_counter() - sent)
+        else:
+            self.late += 1
+        self.acked.set()
+
+    def stats(self):
+        round_trips = np.array(self.round_trips) * 1000.0 if self.round_trips else np.zeros(1)
+        stats = {
+            "client": self.name,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "processed": self.processed,
+            "late": self.late,
+            "frames_with_pose": self.frames_with_pose,
+            "reps": self.reps,
+            "form_errors": self.form_errors,
+            "fps": round(self.processed / self.seconds, 2) if self.seconds > 0 else 0.0,
+            "rtt_p50_ms": round(float(np.percentile(round_trips, 50)), 2),
+            "rtt_p95_ms": round(float(np.percentile(round_trips, 95)), 2),
+            "error": self.error,
+        }
+        if self.summary is not None:
+            stats["dropped_overwritten"] = self.summary["dropped_overwritten"]
+            stats["server_p95_ms"] = self.summary["p95_ms"]
+        return stats
+
+
+async def run_load(args, source, exercise):
+    server = None
+    host, port = args.host, args.port
+    if args.local:
+        server = await InferenceServer(workers=args.workers, max_clients=args.clients, max_age=args.max_age / 1000.0,
+                                       verbose=False).start("127.0.0.1", 0)
+        host, port = "127.0.0.1", server.port
+    try:
+        clients = [LoadClient(f"klient{i + 1}", source, exercise, args.window, args.loops)
+                   for i in range(args.clients)]
+
+        # Klienci startują z przesunięciem, żeby klatki nie przychodziły w jednej chwili
+        async def start(client, delay):
+            await asyncio.sleep(delay)
+            return await client.run(host, port)
+
+        started = time.perf_counter()
+        spread = 1.0 / source.fps
+        await asyncio.gather(*(start(client, i * spread / len(clients)) for i, client in enumerate(clients)))
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            await server.close()
+    return clients, elapsed
+
+
+def print_report(rows, elapsed):
+    print(f"{'klient':<10} {'wysłane':>8} {'pominięte':>10} {'przetw.':>8} {'spóźn.':>7} {'FPS':>6} "
+          f"{'RTT p50':>8} {'RTT p95':>8} {'powt.':>6}")
+    for row in rows:
+        line = (f"{row['client']:<10} {row['sent']:>8} {row['skipped']:>10} {row['processed']:>8} {row['late']:>7} "
+                f"{row['fps']:>6.1f} {row['rtt_p50_ms']:>8.1f} {row['rtt_p95_ms']:>8.1f} {row['reps']:>6}")
+        if row["error"]:
+            line += f"  błąd: {row['error']}"
+        print(line)
+    processed = sum(row["processed"] for row in rows)
+    reps = sorted(set(row["reps"] for row in rows if not row["error"]))
+    print(f"Razem: {processed} klatek w {elapsed:.1f}s ({processed / elapsed:.1f} klatek/s), "
+          f"powtórzenia: {', '.join(map(str, reps)) or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Symulowani klienci serwera wnioskowania (test obciążenia)')
+    parser.add_argument('source', help='Nagranie wideo (klatki JPEG) albo nagranie punktów ciała .fdlm')
+    parser.add_argument('--exercise', choices=sorted(EXERCISES),
+                        help='Ćwiczenie (domyślnie z nagrania .fdlm, inaczej przysiady)')
+    parser.add_argument('--clients', type=int, default=4, help='Liczba jednoczesnych klientów')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--local', action='store_true', help='Serwer uruchamiany w tym procesie na wolnym porcie')
+    parser.add_argument('--workers', type=int, default=4, help='Wątki modelu serwera lokalnego (--local)')
+    parser.add_argument('--max-age', type=float, default=250, help='Limit oczekiwania klatki w serwerze lokalnym (ms)')
+    parser.add_argument('--window', type=int, default=2, help='Najwięcej klatek bez potwierdzenia na klienta')
+    parser.add_argument('--frames', type=int, default=900, help='Najwięcej klatek wczytywanych z nagrania')
+    parser.add_argument('--loops', type=int, default=1, help='Ile razy każdy klient odtwarza nagranie')
+    parser.add_argument('--fps', type=float, help='Tempo wysyłania (domyślnie z nagrania)')
+    parser.add_argument('--width', type=int, default=640, help='Szerokość klatek JPEG (0 - bez zmniejszania)')
+    parser.add_argument('--quality', type=int, default=80, help='Jakość JPEG')
+    parser.add_argument('--output', help='Plik JSON z wynikami klientów')
+    args = parser.parse_args()
+    if args.window < 1:
+        parser.error("--window musi być dodatnie")
+
+    try:
+        source = StreamSource.load(args.source, args.frames, args.width, args.quality, args.fps)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not source.frames:
+        parser.error(f"Brak klatek w nagraniu: {args.source}")
+    exercise = args.exercise or source.exercise or "przysiady"
+    if exercise not in EXERCISES:
+        parser.error(f"Nieznane ćwiczenie w nagraniu: {exercise}")
+
+    kind = "JPEG" if source.kind == JPEG else "punkty ciała"
+    print(f"{args.clients} klientów, {len(source.frames)} klatek ({kind}) x {args.loops}, {source.fps:.1f} FPS, "
+          f"ćwiczenie {exercise}", file=sys.stderr)
+    clients, elapsed = asyncio.run(run_load(args, source, exercise))
+    rows = [client.stats() for client in clients]
+    print_report(rows, elapsed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"clients": rows, "seconds": round(elapsed, 3)}, f, indent=2, ensure_ascii=False)
+    return 1 if any(row["error"] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
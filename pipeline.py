@@ -0,0 +1,243 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from stage_timing import NULL_TIMER
+
+# Potokowe przetwarzanie klatek: przechwytywanie, wnioskowanie i wyświetlanie
+# działają niezależnie. Każdy etap bierze tylko najnowszy wynik poprzedniego,
+# a nieodebrane, przeterminowane klatki są odrzucane (i liczone).
+
+# Konwersja BGR -> RGB dla modelu do bufora wielokrotnego użytku (bez alokacji
+# pełnej klatki w każdym wywołaniu). Wynik jest ważny do następnego convert().
+class RgbBuffer:
+    def __init__(self):
+        self.buffer = None
+
+    def convert(self, frame):
+        buffer = self.buffer
+        if buffer is None or buffer.shape != frame.shape:
+            buffer = self.buffer = np.empty_like(frame)
+        buffer.flags.writeable = True
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buffer)
+        buffer.flags.writeable = False
+        return buffer
+
+
+# Zmniejszenie klatki do szerokości wejścia modelu (profil wydajności z
+# autotune.py) do bufora wielokrotnego użytku; węższe klatki przechodzą bez zmian
+class ResizeBuffer:
+    def __init__(self, width=None):
+        self.width = width
+        self.buffer = None
+
+    def resize(self, frame):
+        height, width = frame.shape[:2]
+        if self.width is None or width <= self.width:
+            return frame
+        size = (self.width, round(height * self.width / width))
+        buffer = self.buffer
+        if buffer is None or buffer.shape[:2] != (size[1], size[0]):
+            buffer = self.buffer = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+        cv2.resize(frame, size, dst=buffer, interpolation=cv2.INTER_AREA)
+        return buffer
+
+
+# Element przekazywany z etapu wnioskowania do wyświetlania
+class PipelineItem:
+    def __init__(self, seq, capture_time, frame, result):
+        self.seq = seq                    # Numer klatki z kamery
+        self.capture_time = capture_time  # Czas odczytu klatki (time.perf_counter)
+        self.frame = frame                # Oryginalna klatka BGR
+        self.result = result              # Wynik funkcji wnioskowania
+
+
+class FramePipeline:
+    def __init__(self, cap, infer, latency_smoothing=0.1, timer=NULL_TIMER):
+        self.cap = cap
+        self.infer = infer  # Funkcja wywoływana na klatce BGR w wątku wnioskowania
+        self.timer = timer  # Pomiar czasu etapów (stage_timing)
+        self.latency_smoothing = latency_smoothing
+
+        # Ograniczamy kolejkę w sterowniku kamery - i tak bierzemy tylko najnowszą klatkę
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.capture_finished = False
+        self.inference_finished = False
+        self.latest_frame = None   # (seq, capture_time, frame) czekająca na wnioskowanie
+        self.latest_item = None    # PipelineItem czekający na wyświetlenie
+        self.error = None
+
+        # Statystyki
+        self.captured = 0
+        self.processed = 0
+        self.displayed = 0
+        self.dropped_capture = 0   # Klatki nadpisane przed wnioskowaniem
+        self.dropped_results = 0   # Wyniki nadpisane przed wyświetleniem
+        self.latency_ms = 0.0      # Wygładzone opóźnienie przechwycenie -> wyświetlenie
+        self.last_latency_ms = 0.0
+
+        self.capture_thread = threading.Thread(target=self.capture_loop, daemon=True)
+        self.inference_thread = threading.Thread(target=self.inference_loop, daemon=True)
+
+    @property
+    def dropped(self):
+        return self.dropped_capture + self.dropped_results
+
+    @property
+    def running(self):
+        with self.condition:
+            return not self.stopped and not (self.inference_finished and self.latest_item is None)
+
+    def start(self):
+        self.capture_thread.start()
+        self.inference_thread.start()
+        return self
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.capture_thread.join(timeout=1.0)
+        self.inference_thread.join(timeout=1.0)
+
+    # Wątek przechwytywania - trzyma tylko najnowszą klatkę
+    def capture_loop(self):
+        seq = 0
+        while True:
+            with self.condition:
+                if self.stopped:
+                    break
+            read_start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            capture_time = time.perf_counter()
+            seq += 1
+            self.timer.record(seq, "read", capture_time - read_start)
+            with self.condition:
+                if self.latest_frame is not None:
+                    self.dropped_capture += 1
+                self.latest_frame = (seq, capture_time, frame)
+                self.captured += 1
+                self.condition.notify_all()
+        with self.condition:
+            self.capture_finished = True
+            self.condition.notify_all()
+
+    # Wątek wnioskowania - przetwarza najnowszą dostępną klatkę
+    def inference_loop(self):
+        try:
+            while True:
+                with self.condition:
+                    while self.latest_frame is None and not self.capture_finished and not self.stopped:
+                        self.condition.wait()
+                    if self.stopped or self.latest_frame is None:
+                        break
+                    seq, capture_time, frame = self.latest_frame
+                    self.latest_frame = None
+
+                self.timer.begin(seq)
+                result = self.infer(frame)
+
+                with self.condition:
+                    if self.latest_item is not None:
+                        self.dropped_results += 1
+                    self.latest_item = PipelineItem(seq, capture_time, frame, result)
+                    self.processed += 1
+                    self.condition.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self.condition:
+                self.inference_finished = True
+                self.condition.notify_all()
+
+    # Pobranie najnowszego wyniku do wyświetlenia (None, gdy brak nowego w limicie czasu)
+    def get(self, timeout=0.1):
+        with self.condition:
+            if self.latest_item is None and not self.inference_finished and not self.stopped:
+                self.condition.wait(timeout)
+            item = self.latest_item
+            self.latest_item = None
+        if item is None and self.error is not None:
+            raise self.error
+        return item
+
+    # Oznaczenie wyniku jako wyświetlonego - aktualizuje opóźnienie
+    def mark_displayed(self, item):
+        latency = (time.perf_counter() - item.capture_time) * 1000.0
+        self.last_latency_ms = latency
+        if self.displayed == 0:
+            self.latency_ms = latency
+        else:
+            self.latency_ms += self.latency_smoothing * (latency - self.latency_ms)
+        self.displayed += 1
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "processed": self.processed,
+            "displayed": self.displayed,
+            "dropped_capture": self.dropped_capture,
+            "dropped_results": self.dropped_results,
+            "latency_ms": round(self.latency_ms, 1),
+        }
+
+
+# Potok z asynchronicznym wnioskowaniem (np. LiveStreamPoseInference): wątek
+# wnioskowania tylko przekazuje klatki do modelu, a wyniki trafiają do
+# wyświetlania z callbacku modelu - przechwytywanie i wyświetlanie działają,
+# gdy kolejne klatki są jeszcze w toku.
+class AsyncFramePipeline(FramePipeline):
+    def __init__(self, cap, backend, latency_smoothing=0.1, timer=NULL_TIMER):
+        super().__init__(cap, None, latency_smoothing=latency_smoothing, timer=timer)
+        self.backend = backend  # Obiekt z submit(seq, capture_time, frame), atrybutem on_result i wait_idle()
+        backend.on_result = self.deliver
+
+    @property
+    def dropped(self):
+        return self.dropped_capture + self.dropped_results + self.backend.dropped
+
+    def inference_loop(self):
+        try:
+            while True:
+                with self.condition:
+                    while self.latest_frame is None and not self.capture_finished and not self.stopped:
+                        self.condition.wait()
+                    if self.stopped or self.latest_frame is None:
+                        break
+                    seq, capture_time, frame = self.latest_frame
+                    self.latest_frame = None
+
+                submit_start = time.perf_counter()
+                self.backend.submit(seq, capture_time, frame)
+                self.timer.record(seq, "submit", time.perf_counter() - submit_start)
+            # Koniec źródła - czekamy na wyniki klatek w toku
+            if not self.stopped:
+                self.backend.wait_idle()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.backend.on_result = None
+            with self.condition:
+                self.inference_finished = True
+                self.condition.notify_all()
+
+    # Wynik z wątku modelu
+    def deliver(self, seq, capture_time, frame, result):
+        with self.condition:
+            if self.latest_item is not None:
+                self.dropped_results += 1
+            self.latest_item = PipelineItem(seq, capture_time, frame, result)
+            self.processed += 1
+            self.condition.notify_all()
+
+    def stats(self):
+        stats = super().stats()
+        stats["dropped_inference"] = self.backend.dropped
+        return stats
@@ -0,0 +1,105 @@
+import numpy as np
+
+from text_render import get_renderer
+
+# Składanie obrazu wyjściowego: obraz z kamery po lewej, sidebar po prawej.
+# Płótno alokowane jest raz na rozdzielczość, statyczna część sidebara (tło,
+# nagłówek, instrukcja) rysowana raz do szablonu, a w każdej klatce kopiowany
+# jest tylko obraz z kamery i przerysowywane napisy, które się zmieniły.
+# Napisy rysuje text_render (czcionka Unicode z atlasem glifów i pamięcią podręczną).
+
+SIDEBAR_COLOR = (40, 40, 40)
+HEADER_COLOR = (70, 70, 70)
+HEADER_HEIGHT = 60
+FOOTER_TEXT = "Naciśnij 'q' aby zakończyć"
+
+# Funkcja sprawdzająca, czy dwa prostokąty na siebie zachodzą
+def rects_overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class SidebarCompositor:
+    def __init__(self, title, title_x, sidebar_width=500, text_renderer=None):
+        self.title = title
+        self.title_x = title_x  # Położenie nagłówka względem lewej krawędzi sidebara
+        self.sidebar_width = sidebar_width
+        self.text_renderer = text_renderer or get_renderer()
+        self.canvas = None
+        self.template = None
+        self.shape = None
+        self.texts = []  # Napisy narysowane w poprzedniej klatce
+
+    # Statyczna warstwa sidebara dla danej wysokości obrazu
+    def build_template(self, height):
+        template = np.empty((height, self.sidebar_width, 3), dtype=np.uint8)
+        template[:] = SIDEBAR_COLOR
+        template[:HEADER_HEIGHT] = HEADER_COLOR
+        self.text_renderer.put_text(template, self.title, (self.title_x, 40), 1, (255, 255, 255), 2)
+        self.text_renderer.put_text(template, FOOTER_TEXT, (20, height - 50), 0.7, (200, 200, 200), 2)
+        return template
+
+    # Płótno i szablon tworzone są tylko przy pierwszej klatce lub zmianie rozdzielczości
+    def prepare(self, height, width):
+        if self.shape == (height, width):
+            return
+        self.shape = (height, width)
+        self.template = self.build_template(height)
+        self.canvas = np.empty((height, width + self.sidebar_width, 3), dtype=np.uint8)
+        self.canvas[:, width:] = self.template
+        self.texts = []
+
+    # Obraz z kamery - jedno kopiowanie na klatkę. Zwraca widok obszaru obrazu
+    # w płótnie, po którym można rysować (punkty ciała) bez dodatkowych kopii
+    def blit(self, image):
+        height, width = image.shape[:2]
+        self.prepare(height, width)
+        view = self.canvas[:, :width]
+        view[:] = image
+        return view
+
+    # texts: lista (tekst, (x, y) względem sidebara, skala, kolor, grubość)
+    def draw_texts(self, texts):
+        height, width = self.shape
+        canvas = self.canvas
+        sidebar = canvas[:, width:]
+
+        if texts != self.texts:
+            renderer = self.text_renderer
+            rects = [renderer.text_rect(text, org, scale, thickness) for text, org, scale, _, thickness in texts]
+
+            # Obszary do odświeżenia: napisy, które zniknęły lub się pojawiły
+            previous = set(self.texts)
+            current = set(texts)
+            dirty = [renderer.text_rect(t[0], t[1], t[2], t[4]) for t in previous ^ current]
+
+            # Napisy są mieszane z tłem (wygładzone krawędzie), więc nie można ich
+            # narysować drugi raz na sobie - niezmieniony napis zachodzący na odświeżany
+            # obszar też odświeżamy w całości (aż do braku nowych takich napisów)
+            redraw = [False] * len(texts)
+            changed = True
+            while changed:
+                changed = False
+                for i, rect in enumerate(rects):
+                    if not redraw[i] and any(rects_overlap(rect, d) for d in dirty):
+                        redraw[i] = changed = True
+                        dirty.append(rect)
+
+            # Przywracamy tło z szablonu tylko w zmienionych obszarach
+            for x1, y1, x2, y2 in dirty:
+                x1, y1 = max(x1, 0), max(y1, 0)
+                x2, y2 = min(x2, self.sidebar_width), min(y2, height)
+                if x1 < x2 and y1 < y2:
+                    sidebar[y1:y2, x1:x2] = self.template[y1:y2, x1:x2]
+
+            # Przerysowujemy napisy zachodzące na odświeżone obszary (także sąsiednie, niezmienione)
+            for (text, org, scale, color, thickness), needed in zip(texts, redraw):
+                if needed:
+                    renderer.put_text(sidebar, text, org, scale, color, thickness)
+
+            self.texts = list(texts)
+
+        return canvas
+
+    def compose(self, image, texts):
+        self.blit(image)
+        return self.draw_texts(texts)
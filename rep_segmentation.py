@@ -0,0 +1,117 @@
+from collections import deque
+
+from exercise_rules import Angle, RuleCounter
+
+# Przyrostowy podział sygnału ćwiczenia (kąta w stawie lub odległości) na
+# powtórzenia. Oprócz licznika (jak RuleCounter) dla każdego powtórzenia powstaje
+# rekord z czasami początku, punktu zwrotnego i końca, skrajną wartością miary
+# (np. najmniejszym kątem) oraz błędami formy, które wystąpiły w trakcie.
+# Każda klatka to stała liczba operacji i stała pamięć - bez przechowywania
+# historii sygnału (poza ograniczoną listą ostatnich rekordów).
+
+
+class RepRecord:
+    def __init__(self, index, start, bottom, end, measure, extreme, errors):
+        self.index = index        # Numer powtórzenia w serii
+        self.start = start        # Opuszczenie pozycji wyjściowej (s od pierwszej klatki)
+        self.bottom = bottom      # Punkt zwrotny - skrajna wartość miary
+        self.end = end            # Powrót do pozycji wyjściowej (zaliczenie powtórzenia)
+        self.measure = measure    # Nazwa miary sterującej licznikiem (np. knee_angle)
+        self.extreme = extreme    # Najmniejszy kąt / największa odległość w powtórzeniu
+        self.errors = errors      # Nazwy błędów formy zgłoszonych w trakcie powtórzenia
+
+    # Faza ekscentryczna (do punktu zwrotnego) i koncentryczna (powrót)
+    @property
+    def eccentric(self):
+        return self.bottom - self.start
+
+    @property
+    def concentric(self):
+        return self.end - self.bottom
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def as_dict(self):
+        return {
+            "index": self.index,
+            "start": round(self.start, 3),
+            "bottom": round(self.bottom, 3),
+            "end": round(self.end, 3),
+            "measure": self.measure,
+            "extreme": round(self.extreme, 4),
+            "eccentric": round(self.eccentric, 3),
+            "concentric": round(self.concentric, 3),
+            "errors": self.errors,
+        }
+
+
+class RepSegmenter(RuleCounter):
+    def __init__(self, compiled, history=50):
+        super().__init__(compiled)
+        # Miarą sterującą jest pierwsza miara warunku wyjścia; gdy wyjście to wzrost
+        # powyżej progu (kąt), punktem zwrotnym jest minimum, w przeciwnym razie maksimum
+        self.measure, op, _ = compiled.rules.leave[0]
+        self.minimum = op in (">", ">=")
+        self.angle = any(isinstance(m, Angle) and m.name == self.measure for m in compiled.rules.measures)
+        self.records = deque(maxlen=history)  # Ostatnie rekordy (dla GUI)
+        self.last = None
+        self.flags = {}                       # Flagi błędów formy z ostatniej klatki
+        self.origin = None
+        self.start = None
+        self.extreme = None
+        self.extreme_time = None
+        self.errors = set()
+
+    # Nowy początek powtórzenia - zapominamy skrajną wartość i błędy
+    def restart(self, timestamp):
+        self.start = timestamp
+        self.extreme = None
+        self.extreme_time = timestamp
+        self.errors = set()
+
+    # Zwraca True, gdy klatka zakończyła powtórzenie (nowy rekord w self.last)
+    def update(self, values, timestamp=0.0):
+        compiled = self.compiled
+        if self.origin is None:
+            self.origin = timestamp
+        if self.start is None:
+            self.restart(timestamp)
+
+        # Ta sama histereza co w RuleCounter; at_top - pozycja wyjściowa (warunek wyjścia spełniony)
+        entered = compiled.check(compiled.enter, values)
+        at_top = not entered and compiled.check(compiled.leave, values)
+        done = False
+        if entered:
+            self.position = True
+        elif at_top and self.position:
+            self.position = False
+            self.count += 1
+            done = True
+        self.flags = compiled.error_flags(values, self.position)
+
+        if at_top and not done:
+            # Stanie w pozycji wyjściowej przesuwa początek następnego powtórzenia
+            self.restart(timestamp)
+            return False
+
+        value = float(values[self.measure])
+        if self.extreme is None or (value < self.extreme if self.minimum else value > self.extreme):
+            self.extreme = value
+            self.extreme_time = timestamp
+        self.errors.update(name for name, flag in self.flags.items() if flag)
+
+        if done:
+            self.last = RepRecord(self.count, self.start - self.origin, self.extreme_time - self.origin,
+                                  timestamp - self.origin, self.measure, self.extreme, sorted(self.errors))
+            self.records.append(self.last)
+            self.restart(timestamp)
+        return done
+
+    # Nowa seria - liczenie od zera, powtórzenie zaczyna się od następnej klatki;
+    # rekordy poprzednich serii zostają w self.records
+    def reset(self):
+        super().reset()
+        self.start = None
+        self.last = None
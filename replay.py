@@ -0,0 +1,107 @@
+import argparse
+import csv
+import itertools
+import sys
+import time
+
+from exercise_rules import EXERCISES
+from landmark_recording import LandmarkRecording
+from scoring import ERROR_FLAGS, collect_videos, score_sequence
+
+# Odtwarzanie nagranych sesji (plików .fdlm) przez logikę liczenia i weryfikacji
+# bez modelu Pose - do strojenia progów. Każda kombinacja wartości z --set jest
+# liczona dla każdego nagrania, np.:
+#   python replay.py nagrania/ --set min_angle_threshold=80,85,90 --set max_angle_threshold=150,160
+
+# Nazwy progów wszystkich ćwiczeń
+PARAM_NAMES = sorted(set().union(*(rules.params for rules in EXERCISES.values())))
+
+# Funkcja parsująca "nazwa=v1,v2,..." na (nazwa, [wartości])
+def parse_sweep(spec):
+    name, _, values = spec.partition('=')
+    if name not in PARAM_NAMES or not values:
+        raise argparse.ArgumentTypeError(f"Oczekiwano NAZWA=v1,v2,... z nazwą spośród: {', '.join(PARAM_NAMES)}")
+    return name, [float(v) for v in values.split(',')]
+
+# Funkcja wczytująca oczekiwane liczby powtórzeń (CSV z kolumnami file, reps)
+def load_expected(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row["file"]: int(row["reps"]) for row in csv.DictReader(f)}
+
+# Odtworzenie jednego nagrania dla wszystkich kombinacji progów
+def replay_recording(recording, exercise, combinations):
+    points = recording.detected_points()
+    rows = []
+    for params in combinations:
+        if len(points):
+            reps, error_counts = score_sequence(exercise, points, recording.width, params)
+        else:
+            reps, error_counts = 0, {flag: 0 for flag in ERROR_FLAGS[exercise]}
+        row = {"file": recording.path, "exercise": exercise, "reps": reps}
+        row.update(params)
+        row.update(error_counts)
+        rows.append(row)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Odtwarzanie nagranych punktów ciała i strojenie progów')
+    parser.add_argument('inputs', nargs='+', help='Pliki .fdlm lub katalogi z nagraniami')
+    parser.add_argument('--exercise', choices=sorted(ERROR_FLAGS),
+                        help='Rodzaj ćwiczenia (domyślnie zapisany w nagraniu)')
+    parser.add_argument('--set', dest='sweeps', type=parse_sweep, action='append', default=[],
+                        help='Wartości progu do sprawdzenia: NAZWA=v1,v2,...')
+    parser.add_argument('--expected', help='CSV z oczekiwaną liczbą powtórzeń (kolumny file, reps)')
+    parser.add_argument('--output', default='-', help='Plik CSV z wynikami (domyślnie standardowe wyjście)')
+    args = parser.parse_args()
+
+    paths = collect_videos(args.inputs, {'.fdlm'})
+    if not paths:
+        parser.error("Nie znaleziono nagrań")
+
+    names = [name for name, _ in args.sweeps]
+    combinations = [dict(zip(names, values)) for values in itertools.product(*(v for _, v in args.sweeps))]
+    expected = load_expected(args.expected) if args.expected else None
+
+    start = time.perf_counter()
+    rows = []
+    frames = 0
+    recorded_seconds = 0.0
+    for path in paths:
+        recording = LandmarkRecording(path)
+        exercise = args.exercise or recording.exercise
+        if exercise not in ERROR_FLAGS:
+            print(f"Pominięto {path}: nieznane ćwiczenie '{exercise}' (użyj --exercise)", file=sys.stderr)
+            continue
+        for row in replay_recording(recording, exercise, combinations):
+            if expected is not None and path in expected:
+                row["expected"] = expected[path]
+                row["error"] = abs(row["reps"] - expected[path])
+            rows.append(row)
+        frames += len(recording)
+        recorded_seconds += recording.duration()
+    elapsed = time.perf_counter() - start
+
+    fieldnames = ["file", "exercise", "reps"] + names
+    fieldnames += sorted({flag for row in rows for flag in row} - set(fieldnames) - {"expected", "error"})
+    if expected is not None:
+        fieldnames += ["expected", "error"]
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    writer = csv.DictWriter(out, fieldnames=fieldnames, restval='')
+    writer.writeheader()
+    writer.writerows(rows)
+    if out is not sys.stdout:
+        out.close()
+
+    # Najlepsza kombinacja progów według łącznego błędu liczby powtórzeń
+    if expected is not None and combinations:
+        totals = [sum(row.get("error", 0) for row in rows[i::len(combinations)]) for i in range(len(combinations))]
+        best = min(range(len(combinations)), key=totals.__getitem__)
+        print(f"Najlepsze progi: {combinations[best] or 'domyślne'} (łączny błąd {totals[best]})", file=sys.stderr)
+
+    speedup = recorded_seconds * len(combinations) / elapsed if elapsed > 0 else 0.0
+    print(f"Odtworzono {len(paths)} nagrań ({frames} klatek) x {len(combinations)} kombinacji "
+          f"w {elapsed:.2f}s - {speedup:.0f}x szybciej niż w czasie rzeczywistym", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
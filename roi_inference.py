@@ -0,0 +1,145 @@
+import time
+
+import cv2
+import numpy as np
+
+from pipeline import RgbBuffer
+
+# Wnioskowanie na wycinku obrazu (ROI) wokół sylwetki z poprzedniej klatki,
+# ze skalą wejścia dobieraną automatycznie do docelowego FPS. Gdy sylwetka
+# zostanie zgubiona, następna klatka jest przeszukiwana w całości.
+
+# Krok skali wejścia: regulator zmienia skalę płynnie, ale wejście modelu (i jego
+# bufory) zmienia rozmiar dopiero, gdy regulator odejdzie o cały krok. Krok 0.9
+# zmienia liczbę pikseli o ~0.81 - z zapasem mieści się w strefie nieczułości
+# regulatora (0.7-1.0 budżetu), więc skala nie waha się między sąsiednimi krokami
+SCALE_STEP = 0.9
+
+
+# Wynik wnioskowania z informacją o użytym wycinku i skali
+class RoiResult:
+    def __init__(self, pose_landmarks, roi, scale, tracked, inference_ms):
+        self.pose_landmarks = pose_landmarks  # Punkty w znormalizowanych współrzędnych całej klatki
+        self.roi = roi                        # Wycinek (x1, y1, x2, y2) w pikselach klatki
+        self.scale = scale                    # Skala wycinka przekazanego do modelu
+        self.tracked = tracked                # False - przeszukiwanie całej klatki
+        self.inference_ms = inference_ms
+
+    def info(self):
+        return {"roi": self.roi, "scale": round(self.scale, 3), "tracked": self.tracked,
+                "inference_ms": round(self.inference_ms, 2)}
+
+
+class RoiPoseInference:
+    def __init__(self, pose, target_fps=30, min_scale=0.3, max_scale=1.0, margin=0.2,
+                 min_visibility=0.5, min_roi_size=96):
+        self.pose = pose
+        self.target_fps = target_fps
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.margin = margin                  # Zapas wokół sylwetki (ułamek jej rozmiaru)
+        self.min_visibility = min_visibility  # Punkty o mniejszej widoczności nie wyznaczają ROI
+        self.min_roi_size = min_roi_size      # Minimalny bok wycinka w pikselach
+        self.target_scale = max_scale         # Skala z regulatora (zmienia się co klatkę)
+        self.scale = max_scale                # Skala wejścia modelu (zmienia się o co najmniej SCALE_STEP)
+        self.roi = None                       # Bieżący wycinek; None - cała klatka
+        self.inference_ms = 0.0               # Wygładzony czas wnioskowania
+        # Bufory zmieniają rozmiar tylko przy zmianie ROI albo kroku skali
+        self.resized = None
+        self.rgb = RgbBuffer()
+
+    def reset(self):
+        self.roi = None
+        self.pose.reset()
+
+    # Dopasowanie skali: za wolno - zmniejszamy wejście, z dużym zapasem - zwiększamy
+    def adapt_scale(self, elapsed_ms):
+        self.inference_ms += 0.2 * (elapsed_ms - self.inference_ms) if self.inference_ms else elapsed_ms
+        budget_ms = 1000.0 / self.target_fps
+        if self.inference_ms > budget_ms:
+            self.target_scale = max(self.min_scale, self.target_scale * 0.9)
+        elif self.inference_ms < 0.7 * budget_ms:
+            self.target_scale = min(self.max_scale, self.target_scale * 1.05)
+        # Wejście zmienia się o dokładnie jeden krok, a regulator startuje od nowej skali;
+        # wygładzony czas przeliczany proporcjonalnie do liczby pikseli nowego wejścia
+        if self.target_scale <= self.scale * SCALE_STEP or self.target_scale == self.min_scale:
+            scale = max(self.min_scale, self.scale * SCALE_STEP)
+        elif self.target_scale >= self.scale / SCALE_STEP or self.target_scale == self.max_scale:
+            scale = min(self.max_scale, self.scale / SCALE_STEP)
+        else:
+            return
+        self.inference_ms *= (scale / self.scale) ** 2
+        self.scale = self.target_scale = scale
+
+    # Zmniejszenie wycinka do bufora wielokrotnego użytku
+    def resize(self, crop):
+        height, width = crop.shape[:2]
+        size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+        buffer = self.resized
+        if buffer is None or buffer.shape[:2] != (size[1], size[0]):
+            buffer = self.resized = np.empty((size[1], size[0]) + crop.shape[2:], dtype=crop.dtype)
+        cv2.resize(crop, size, dst=buffer, interpolation=cv2.INTER_AREA)
+        return buffer
+
+    # Prostokąt otaczający widoczne punkty, powiększony o margines i przycięty do klatki
+    def landmarks_roi(self, landmarks, width, height):
+        xs = [lm.x for lm in landmarks if lm.visibility >= self.min_visibility]
+        ys = [lm.y for lm in landmarks if lm.visibility >= self.min_visibility]
+        if len(xs) < 4:
+            return None
+        x1, x2 = min(xs) * width, max(xs) * width
+        y1, y2 = min(ys) * height, max(ys) * height
+        pad_x = max((x2 - x1) * self.margin, self.min_roi_size / 2 - (x2 - x1) / 2)
+        pad_y = max((y2 - y1) * self.margin, self.min_roi_size / 2 - (y2 - y1) / 2)
+        return (max(0, int(x1 - pad_x)), max(0, int(y1 - pad_y)),
+                min(width, int(x2 + pad_x)), min(height, int(y2 + pad_y)))
+
+    # Nowy wycinek tylko wtedy, gdy sylwetka zbliża się do krawędzi obecnego lub
+    # wyraźnie się w nim zmniejszyła - stabilne ROI nie zaburza śledzenia w modelu
+    def needs_new_roi(self, wanted):
+        if self.roi is None:
+            return True
+        x1, y1, x2, y2 = self.roi
+        wx1, wy1, wx2, wy2 = wanted
+        if wx1 < x1 or wy1 < y1 or wx2 > x2 or wy2 > y2:
+            return True
+        return (wx2 - wx1) * (wy2 - wy1) < 0.5 * (x2 - x1) * (y2 - y1)
+
+    def __call__(self, frame):
+        height, width = frame.shape[:2]
+        tracked = self.roi is not None
+        x1, y1, x2, y2 = self.roi if tracked else (0, 0, width, height)
+
+        crop = frame[y1:y2, x1:x2]
+        if self.scale < 1.0:
+            crop = self.resize(crop)
+
+        start = time.perf_counter()
+        results = self.pose.process(self.rgb.convert(crop))
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.adapt_scale(elapsed_ms)
+
+        roi = (x1, y1, x2, y2)
+        scale = self.scale
+        pose_landmarks = results.pose_landmarks
+        if pose_landmarks is None:
+            # Zgubiona sylwetka - następna klatka przeszukiwana w całości
+            if self.roi is not None:
+                self.reset()
+            return RoiResult(None, roi, scale, tracked, elapsed_ms)
+
+        # Przeliczenie współrzędnych z wycinka na całą klatkę
+        crop_w, crop_h = x2 - x1, y2 - y1
+        for lm in pose_landmarks.landmark:
+            lm.x = (x1 + lm.x * crop_w) / width
+            lm.y = (y1 + lm.y * crop_h) / height
+            lm.z = lm.z * crop_w / width
+
+        wanted = self.landmarks_roi(pose_landmarks.landmark, width, height)
+        if wanted is None:
+            self.reset()
+        elif self.needs_new_roi(wanted):
+            # Zmiana wycinka przesuwa układ współrzędnych - czyścimy śledzenie w modelu
+            self.roi = wanted
+            self.pose.reset()
+        return RoiResult(pose_landmarks, roi, scale, tracked, elapsed_ms)
@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+
+from exercise_rules import EXERCISES, CompiledRules
+
+# Ocena całych sekwencji punktów ciała bez modelu Pose - wspólna dla trybu
+# wsadowego na nagraniach wideo (batch_score.py) i odtwarzania nagranych punktów
+# ciała (replay.py), które nie importuje OpenCV ani puli procesów.
+
+# Flagi błędów zliczane dla poszczególnych ćwiczeń (z reguł w exercise_rules)
+ERROR_FLAGS = {name: rules.error_names for name, rules in EXERCISES.items()}
+
+# Funkcja zliczająca wystąpienia błędu (przejście z poprawnej formy w błędną), a nie klatki
+def count_onsets(flags):
+    flags = np.asarray(flags, dtype=bool)
+    if flags.size == 0:
+        return 0
+    return int(flags[0]) + int(np.count_nonzero(flags[1:] & ~flags[:-1]))
+
+# Funkcja oceniająca całe nagranie naraz - miary, flagi błędów i liczniki powtórzeń
+# liczone są wektorowo po tablicy (T, 33, 4), bez pętli po klatkach; params
+# nadpisuje progi z reguł ćwiczenia
+def score_sequence(exercise, points, width, params=None):
+    reps, flags = CompiledRules(EXERCISES[exercise], params).score(points, width)
+    return reps, {flag: count_onsets(values) for flag, values in flags.items()}
+
+# Funkcja zbierająca listę plików (pliki lub katalogi) o podanych rozszerzeniach
+def collect_videos(paths, extensions):
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if os.path.splitext(name)[1].lower() in extensions:
+                    videos.append(os.path.join(path, name))
+        else:
+            videos.append(path)
+    return videos
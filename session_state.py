@@ -0,0 +1,75 @@
+import math
+import time
+
+# Maszyna stanów sesji ćwiczenia: prep -> exercise -> rest -> exercise ... -> completed.
+# Odliczanie opiera się na zegarze monotonicznym i terminach (deadline), a stan
+# jest przesuwany jawnie wywołaniem update() z pętli klatek - bez wątków
+# threading.Timer tworzonych co sekundę i bez wyścigów na licznikach.
+
+PREP = "prep"
+EXERCISE = "exercise"
+REST = "rest"
+COMPLETED = "completed"
+
+
+class ExerciseSession:
+    def __init__(self, counter, target, total_series=1, rest_time=30, prep_time=5, clock=time.monotonic):
+        self.counter = counter          # Licznik powtórzeń (z atrybutem count i metodą reset)
+        self.target = target            # Docelowa liczba powtórzeń w serii
+        self.total_series = total_series
+        self.rest_time = rest_time
+        self.prep_time = prep_time
+        self.clock = clock              # Źródło czasu - w testach można podać własny zegar
+
+        self.current_series = 1
+        self.series_reps = []           # Powtórzenia wykonane w zakończonych seriach
+        self.state = PREP
+        self.state_started = self.clock()
+        self.deadline = self.state_started + prep_time
+
+    # Pozostały czas odliczania (w pełnych sekundach, zaokrąglony w górę) dla prep i rest
+    def remaining(self, now=None):
+        if self.state not in (PREP, REST):
+            return 0
+        if now is None:
+            now = self.clock()
+        return max(0, math.ceil(self.deadline - now))
+
+    def enter(self, state, now, duration=0):
+        self.state = state
+        self.state_started = now
+        self.deadline = now + duration
+
+    # Przesuwa maszynę stanów - zwraca listę przejść (stary stan, nowy stan, czas przejścia)
+    # wykonanych w tym wywołaniu
+    def update(self, now=None):
+        if now is None:
+            now = self.clock()
+        transitions = []
+        while True:
+            previous = self.state
+            if self.state == PREP and now >= self.deadline:
+                self.enter(EXERCISE, self.deadline)
+            elif self.state == EXERCISE and self.counter.count >= self.target:
+                self.series_reps.append(self.counter.count)
+                # Jeśli nie jest to ostatnia seria, przejdź do odliczania przerwy
+                if self.current_series < self.total_series:
+                    self.enter(REST, now, self.rest_time)
+                else:
+                    self.enter(COMPLETED, now)
+            elif self.state == REST and now >= self.deadline:
+                # Nowa seria - resetujemy licznik powtórzeń
+                self.current_series += 1
+                self.counter.reset()
+                self.enter(EXERCISE, self.deadline)
+            else:
+                break
+            transitions.append((previous, self.state, self.state_started))
+        return transitions
+
+    # Wymusza zakończenie sesji (np. przerwanie przez użytkownika)
+    def finish(self, now=None):
+        if now is None:
+            now = self.clock()
+        if self.state != COMPLETED:
+            self.enter(COMPLETED, now)
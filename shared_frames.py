@@ -0,0 +1,460 @@
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.sharedctypes import RawArray
+
+import cv2
+import numpy as np
+
+from pipeline import PipelineItem, RgbBuffer, ResizeBuffer
+from stage_timing import NULL_TIMER
+
+# Wieloprocesowy układ potoku klatek: proces przechwytywania czyta klatki z kamery
+# wprost do pierścienia w pamięci współdzielonej, proces wnioskowania uruchamia
+# model na klatce w miejscu (bez kopiowania i serializacji), a do procesu
+# wyświetlania wraca tylko tablica punktów ciała (33 x 4). Wyświetlanie czyta
+# klatkę z tego samego miejsca pierścienia. pose.process, rysowanie i okno nie
+# konkurują już o GIL jednego procesu.
+#
+# Miejsce pierścienia jest "przypięte", dopóki korzysta z niego wnioskowanie lub
+# wyświetlanie - zapis wybiera wolne miejsce różne od najnowszej klatki, więc
+# czytana klatka nigdy nie jest nadpisywana. Jak w FramePipeline, każdy etap bierze
+# najnowszą klatkę, a pominięte są liczone. Czasy (time.perf_counter) są
+# porównywalne między procesami - zegar monotoniczny systemu.
+
+# Pola nagłówka pierścienia
+HEIGHT, WIDTH, CHANNELS, LATEST, SEQ, WRITTEN, DROPPED, CLOSED = range(8)
+NAME_SIZE = 64
+
+
+class FrameRing:
+    def __init__(self, slots=4):
+        # Zapis, najnowsza klatka, wnioskowanie i wyświetlanie - każde we własnym miejscu
+        if slots < 4:
+            raise ValueError("Pierścień klatek potrzebuje co najmniej 4 miejsc")
+        self.slots = slots
+        self.condition = multiprocessing.Condition()
+        self.header = RawArray('q', 8)
+        self.header[LATEST] = -1
+        self.name = RawArray('c', NAME_SIZE)  # Nazwa bloku pamięci klatek (po create())
+        self.seqs = RawArray('q', slots)      # Numer klatki w miejscu; -1 - trwa zapis
+        self.times = RawArray('d', slots)     # Czas przechwycenia klatki
+        self.pins = RawArray('i', slots)      # Liczba procesów korzystających z miejsca
+        self.taken = RawArray('b', slots)     # Klatka pobrana do wnioskowania
+        self.next_slot = 0
+        self.shm = None
+        self.frames = None                    # Widok (miejsca, wysokość, szerokość, kanały)
+
+    # Blok pamięci nie jest przekazywany do procesów - każdy dołącza przez attach()
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["shm"] = None
+        state["frames"] = None
+        return state
+
+    # Utworzenie pamięci klatek przez proces przechwytywania (rozmiar znany po pierwszej klatce)
+    def create(self, shape):
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slots * int(np.prod(shape)))
+        self.frames = np.ndarray((self.slots,) + tuple(shape), dtype=np.uint8, buffer=self.shm.buf)
+        with self.condition:
+            self.header[HEIGHT], self.header[WIDTH], self.header[CHANNELS] = shape
+            self.name.value = self.shm.name.encode()
+            self.condition.notify_all()
+
+    def wait_created(self, timeout=None):
+        with self.condition:
+            self.condition.wait_for(lambda: self.name.value or self.header[CLOSED], timeout)
+            return bool(self.name.value)
+
+    def attach(self):
+        if self.frames is None:
+            self.shm = shared_memory.SharedMemory(name=self.name.value.decode())
+            shape = (self.header[HEIGHT], self.header[WIDTH], self.header[CHANNELS])
+            self.frames = np.ndarray((self.slots,) + shape, dtype=np.uint8, buffer=self.shm.buf)
+        return self
+
+    def detach(self, unlink=False):
+        if self.shm is None:
+            return
+        self.frames = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+        self.shm = None
+
+    # Miejsce do zapisu: wolne i różne od najnowszej klatki (None - brak wolnego, klatka pominięta)
+    def reserve(self):
+        with self.condition:
+            for i in range(self.slots):
+                slot = (self.next_slot + i) % self.slots
+                if self.pins[slot] == 0 and slot != self.header[LATEST]:
+                    self.next_slot = slot + 1
+                    self.seqs[slot] = -1
+                    return slot
+            self.header[DROPPED] += 1
+            return None
+
+    # Udostępnienie zapisanej klatki jako najnowszej; niepobrana poprzednia jest pominięta
+    def publish(self, slot, capture_time):
+        with self.condition:
+            latest = self.header[LATEST]
+            if latest >= 0 and not self.taken[latest]:
+                self.header[DROPPED] += 1
+            seq = self.header[SEQ] + 1
+            self.header[SEQ] = seq
+            self.seqs[slot] = seq
+            self.times[slot] = capture_time
+            self.taken[slot] = 0
+            self.header[LATEST] = slot
+            self.header[WRITTEN] += 1
+            self.condition.notify_all()
+            return seq
+
+    # Najnowsza klatka nowsza niż after_seq, przypięta do release(); None - brak w limicie czasu lub koniec
+    def acquire(self, after_seq, timeout=None):
+        with self.condition:
+            def ready():
+                latest = self.header[LATEST]
+                return self.header[CLOSED] or (latest >= 0 and self.seqs[latest] > after_seq)
+            self.condition.wait_for(ready, timeout)
+            slot = self.header[LATEST]
+            if slot < 0 or self.seqs[slot] <= after_seq:
+                return None
+            self.pins[slot] += 1
+            self.taken[slot] = 1
+            return slot, self.seqs[slot], self.times[slot]
+
+    def release(self, slot):
+        with self.condition:
+            self.pins[slot] -= 1
+
+    # Koniec źródła (lub błąd przechwytywania)
+    def close(self):
+        with self.condition:
+            self.header[CLOSED] = 1
+            self.condition.notify_all()
+
+    @property
+    def closed(self):
+        return bool(self.header[CLOSED])
+
+    def view(self, slot):
+        frame = self.frames[slot]
+        frame.flags.writeable = False
+        return frame
+
+    def stats(self):
+        return {"written": self.header[WRITTEN], "dropped": self.header[DROPPED]}
+
+
+# Błąd procesu roboczego - kolejka jest opróżniana do potoku przed wyjściem,
+# więc nadzorca widzi błąd zaraz po sygnale gotowości
+def report_error(errors, stage, e):
+    errors.put(f"{stage}: {e.__class__.__name__}: {e}")
+    errors.close()
+    errors.join_thread()
+
+# Proces przechwytywania: klatki czytane wprost do miejsc pierścienia; realtime -
+# plik wideo odtwarzany w tempie nagrania (jak kamera)
+def run_capture(source, ring, stop, model_ready, errors, realtime):
+    cap = cv2.VideoCapture(source)
+    try:
+        if not cap.isOpened():
+            raise IOError(f"Nie można otworzyć źródła: {source}")
+        ret, first = cap.read()
+        if not ret:
+            raise IOError(f"Brak klatek w źródle: {source}")
+        ring.create(first.shape)
+        # Model ładuje się równolegle w procesie wnioskowania - do tego czasu nie ma komu oddać klatek
+        while not model_ready.wait(0.1):
+            if stop.is_set():
+                return
+        fps = cap.get(cv2.CAP_PROP_FPS) if realtime else 0.0
+        frame_interval = 1.0 / fps if fps > 0 else 0.0
+        next_frame = time.perf_counter()
+        scratch = None
+        while not stop.is_set():
+            if frame_interval:
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_frame += frame_interval
+            slot = ring.reserve()
+            if slot is None:
+                # Wszystkie miejsca zajęte - klatkę trzeba odczytać, żeby kamera nie zostawała w tyle
+                ret, scratch = cap.read(scratch)
+                if not ret:
+                    break
+                continue
+            target = ring.frames[slot]
+            ret, frame = cap.read(target)
+            if not ret:
+                break
+            capture_time = time.perf_counter()
+            if frame is not target:
+                np.copyto(target, frame)
+            ring.publish(slot, capture_time)
+    except Exception as e:
+        report_error(errors, "przechwytywanie", e)
+    finally:
+        cap.release()
+        ring.close()
+        ring.detach()
+
+# Proces wnioskowania: model na klatce w pierścieniu, do wyświetlania tylko punkty
+# ciała; miejsce zostaje przypięte - zwalnia je proces wyświetlania
+def run_inference(ring, results, stop, model_ready, reset_request, active, errors, options):
+    try:
+        import exercise_logic
+        from exercise_logic import LandmarkBuffer
+        pose = exercise_logic.mp_pose.Pose(model_complexity=options["model_complexity"],
+                                           min_detection_confidence=options["min_detection_confidence"],
+                                           min_tracking_confidence=options["min_tracking_confidence"])
+        pose.process(np.zeros((256, 256, 3), dtype=np.uint8))
+        pose.reset()
+        resize = ResizeBuffer(options["input_width"])
+        rgb = RgbBuffer()
+        buffer = LandmarkBuffer()
+        model_ready.set()
+        if not ring.wait_created():
+            return
+        ring.attach()
+        seq = 0
+        while not stop.is_set():
+            # Między treningami model nie pracuje
+            if not active.wait(0.1):
+                continue
+            acquired = ring.acquire(seq, timeout=0.1)
+            if acquired is None:
+                if ring.closed:
+                    break
+                continue
+            slot, seq, capture_time = acquired
+            if reset_request.is_set():
+                reset_request.clear()
+                pose.reset()
+            start = time.perf_counter()
+            output = pose.process(rgb.convert(resize.resize(ring.frames[slot])))
+            elapsed = time.perf_counter() - start
+            points = buffer.update(output.pose_landmarks.landmark).copy() if output.pose_landmarks else None
+            results.put((slot, seq, capture_time, points, elapsed))
+    except Exception as e:
+        report_error(errors, "wnioskowanie", e)
+    finally:
+        model_ready.set()
+        results.put(None)
+        ring.detach()
+
+
+# Wynik wnioskowania z innego procesu; pose_landmarks (NormalizedLandmarkList) budowane
+# dopiero przy pierwszym użyciu, więc wyniki pominięte przed wyświetleniem nic nie kosztują
+class ProcessPoseResult:
+    def __init__(self, points, inference_ms):
+        self.points = points              # (33, 4) x, y, z, visibility albo None
+        self.inference_ms = inference_ms
+        self.landmarks = None
+
+    @property
+    def pose_landmarks(self):
+        if self.points is None:
+            return None
+        if self.landmarks is None:
+            from mediapipe.framework.formats import landmark_pb2
+            self.landmarks = landmark_pb2.NormalizedLandmarkList(landmark=[
+                landmark_pb2.NormalizedLandmark(x=x, y=y, z=z, visibility=visibility)
+                for x, y, z, visibility in self.points.tolist()
+            ])
+        return self.landmarks
+
+    def info(self):
+        return {"backend": "processes", "inference_ms": round(self.inference_ms, 1)}
+
+
+# Potok z procesami przechwytywania i wnioskowania, z interfejsem FramePipeline.
+# Procesy żyją od launch() do shutdown() (kamera i model raz), a start()/stop()
+# wyznaczają pojedynczy trening - wyniki spoza treningu są odrzucane.
+class ProcessFramePipeline:
+    def __init__(self, source, slots=4, model_complexity=1, input_width=None, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5, realtime=False, latency_smoothing=0.1, timer=NULL_TIMER):
+        self.ring = FrameRing(slots)
+        self.results = multiprocessing.Queue()
+        self.errors = multiprocessing.Queue()
+        self.stop_event = multiprocessing.Event()
+        self.model_ready = multiprocessing.Event()
+        self.reset_request = multiprocessing.Event()
+        self.training = multiprocessing.Event()  # Trwa trening (start() - stop())
+        options = {
+            "model_complexity": model_complexity,
+            "input_width": input_width,
+            "min_detection_confidence": min_detection_confidence,
+            "min_tracking_confidence": min_tracking_confidence,
+        }
+        self.processes = [
+            multiprocessing.Process(target=run_capture, name="przechwytywanie", daemon=True,
+                                    args=(source, self.ring, self.stop_event, self.model_ready, self.errors,
+                                          realtime)),
+            multiprocessing.Process(target=run_inference, name="wnioskowanie", daemon=True,
+                                    args=(self.ring, self.results, self.stop_event, self.model_ready,
+                                          self.reset_request, self.training, self.errors, options)),
+        ]
+        self.timer = timer
+        self.latency_smoothing = latency_smoothing
+        self.condition = threading.Condition()
+        self.receiver = threading.Thread(target=self.receive_loop, daemon=True)
+        self.active = False
+        self.started_at = 0.0
+        self.inference_finished = False
+        self.latest_item = None
+        self.latest_slot = None
+        self.shown_slot = None     # Miejsce klatki oddanej przez get() - ważne do następnego get()
+        self.error = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.processed = 0
+        self.displayed = 0
+        self.dropped_results = 0
+        self.latency_ms = 0.0
+        self.last_latency_ms = 0.0
+        self.ring_written_at_start = self.ring.header[WRITTEN]
+        self.ring_dropped_at_start = self.ring.header[DROPPED]
+
+    # Uruchomienie procesów; wraca, gdy źródło jest otwarte i model gotowy.
+    # on_stage(nazwa) - zapis etapów startu (PoseResources.mark_startup)
+    def launch(self, on_stage=None, timeout=60.0):
+        # Wspólny dla procesów potomnych nadzorca zasobów - inaczej każdy proces uznałby
+        # pamięć klatek za wyciek i próbował ją usunąć przy wyjściu
+        resource_tracker.ensure_running()
+        for process in self.processes:
+            process.start()
+        self.receiver.start()
+        if self.ring.wait_created(timeout) and on_stage is not None:
+            on_stage("camera_open")
+        self.model_ready.wait(timeout)
+        self.check_errors()
+        if self.error is not None:
+            self.shutdown()
+            raise self.error
+        if on_stage is not None:
+            on_stage("model_ready")
+        self.ring.attach()
+        return self
+
+    def check_errors(self):
+        try:
+            self.error = RuntimeError(self.errors.get_nowait())
+        except queue.Empty:
+            pass
+
+    # Wątek odbierający wyniki z procesu wnioskowania - trzyma tylko najnowszy
+    def receive_loop(self):
+        while True:
+            message = self.results.get()
+            if message is None:
+                break
+            slot, seq, capture_time, points, elapsed = message
+            item = PipelineItem(seq, capture_time, None, ProcessPoseResult(points, elapsed * 1000.0))
+            with self.condition:
+                if not self.active or capture_time < self.started_at:
+                    self.ring.release(slot)
+                    continue
+                self.timer.record(seq, "pose.process", elapsed)
+                if self.latest_item is not None:
+                    self.dropped_results += 1
+                    self.ring.release(self.latest_slot)
+                self.latest_item = item
+                self.latest_slot = slot
+                self.processed += 1
+                self.condition.notify_all()
+        self.check_errors()
+        with self.condition:
+            self.inference_finished = True
+            self.condition.notify_all()
+
+    @property
+    def dropped(self):
+        return self.dropped_results + self.ring.header[DROPPED] - self.ring_dropped_at_start
+
+    @property
+    def running(self):
+        with self.condition:
+            return self.active and not (self.inference_finished and self.latest_item is None)
+
+    # Początek treningu
+    def start(self):
+        with self.condition:
+            self.reset_stats()
+            self.started_at = time.perf_counter()
+            self.active = True
+        self.training.set()
+        return self
+
+    # Koniec treningu - procesy działają dalej, nieodebrane klatki wracają do pierścienia
+    def stop(self):
+        self.training.clear()
+        with self.condition:
+            self.active = False
+            for slot in (self.latest_slot, self.shown_slot):
+                if slot is not None:
+                    self.ring.release(slot)
+            self.latest_item = self.latest_slot = self.shown_slot = None
+            self.condition.notify_all()
+
+    # Czyszczenie stanu śledzenia modelu przed następną klatką
+    def reset(self):
+        self.reset_request.set()
+
+    def get(self, timeout=0.1):
+        with self.condition:
+            if self.shown_slot is not None:
+                self.ring.release(self.shown_slot)
+                self.shown_slot = None
+            if self.latest_item is None and not self.inference_finished and self.active:
+                self.condition.wait(timeout)
+            item = self.latest_item
+            if item is not None:
+                item.frame = self.ring.view(self.latest_slot)
+                self.shown_slot = self.latest_slot
+                self.latest_item = self.latest_slot = None
+        if item is None and self.error is not None:
+            raise self.error
+        return item
+
+    def mark_displayed(self, item):
+        latency = (time.perf_counter() - item.capture_time) * 1000.0
+        self.last_latency_ms = latency
+        if self.displayed == 0:
+            self.latency_ms = latency
+        else:
+            self.latency_ms += self.latency_smoothing * (latency - self.latency_ms)
+        self.displayed += 1
+
+    def stats(self):
+        ring = self.ring.stats()
+        return {
+            "captured": ring["written"] - self.ring_written_at_start,
+            "processed": self.processed,
+            "displayed": self.displayed,
+            "dropped_capture": ring["dropped"] - self.ring_dropped_at_start,
+            "dropped_results": self.dropped_results,
+            "latency_ms": round(self.latency_ms, 1),
+        }
+
+    # Zatrzymanie procesów i zwolnienie pamięci klatek
+    def shutdown(self):
+        self.stop()
+        self.stop_event.set()
+        for process in self.processes:
+            if process.pid is not None:
+                process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        if self.receiver.is_alive():
+            self.results.put(None)
+            self.receiver.join(timeout=1.0)
+        # Pamięć klatek mogła powstać bez dołączenia tego procesu (błąd przy starcie)
+        if self.ring.shm is None and self.ring.name.value:
+            self.ring.attach()
+        self.ring.detach(unlink=True)
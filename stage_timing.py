@@ -0,0 +1,88 @@
+import csv
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Pomiar czasu etapów pętli klatki (odczyt z kamery, konwersja kolorów, pose.process,
+# rysowanie, sidebar, imshow, waitKey). Etapy działają w różnych wątkach potoku,
+# więc każdy wątek zaczyna klatkę wywołaniem begin(seq), a kolejne lap(nazwa)
+# zapisują czas od poprzedniego punktu pod numerem tej klatki.
+# Wyłączony pomiar to NullStageTimer - metody bez żadnej pracy.
+
+
+class StageTimer:
+    enabled = True
+
+    def __init__(self, window=300, clock=time.perf_counter, keep_rows=False):
+        self.window = window          # Liczba ostatnich pomiarów do percentyli
+        self.clock = clock
+        self.stages = {}              # Etap -> deque ostatnich czasów (ms), w kolejności pojawienia się
+        # Numer klatki -> {etap: ms} do eksportu CSV; rośnie z każdą klatką, więc
+        # tylko na żądanie (keep_rows) - sama nakładka z percentylami ma stałą pamięć
+        self.rows = {} if keep_rows else None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def begin(self, seq):
+        self.local.seq = seq
+        self.local.last = self.clock()
+
+    # Czas od begin() lub poprzedniego lap() w tym wątku
+    def lap(self, stage):
+        now = self.clock()
+        self.record(self.local.seq, stage, now - self.local.last)
+        self.local.last = now
+
+    def record(self, seq, stage, seconds):
+        ms = seconds * 1000.0
+        with self.lock:
+            samples = self.stages.get(stage)
+            if samples is None:
+                samples = self.stages[stage] = deque(maxlen=self.window)
+            samples.append(ms)
+            if self.rows is not None:
+                self.rows.setdefault(seq, {})[stage] = ms
+
+    # Kroczące percentyle p50/p95/p99 (ms) dla każdego etapu
+    def percentiles(self):
+        with self.lock:
+            samples = {stage: list(values) for stage, values in self.stages.items()}
+        return {stage: tuple(np.percentile(values, (50, 95, 99)).tolist())
+                for stage, values in samples.items() if values}
+
+    # Czasy każdej klatki - wiersz na klatkę, kolumna na etap (wymaga keep_rows)
+    def write_csv(self, path):
+        if self.rows is None:
+            raise ValueError("StageTimer bez keep_rows nie zapisuje czasów klatek")
+        with self.lock:
+            stages = list(self.stages)
+            rows = sorted(self.rows.items())
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{stage}_ms" for stage in stages])
+            for seq, times in rows:
+                writer.writerow([seq] + [f"{times[stage]:.3f}" if stage in times else "" for stage in stages])
+
+
+class NullStageTimer:
+    enabled = False
+
+    def begin(self, seq):
+        pass
+
+    def lap(self, stage):
+        pass
+
+    def record(self, seq, stage, seconds):
+        pass
+
+    def percentiles(self):
+        return {}
+
+    def write_csv(self, path):
+        pass
+
+
+NULL_TIMER = NullStageTimer()
@@ -0,0 +1,374 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+
+import cv2
+import numpy as np
+
+from event_store import EventStore
+from events import REP, SUMMARY
+import exercise_logic
+from exercise_logic import LandmarkBuffer
+from exercise_rules import EXERCISES, CompiledRules, RuleCounter
+from pipeline import RgbBuffer
+
+# Wiele stanowisk na jednym komputerze: każde stanowisko (kamera, plik wideo lub
+# strumień) działa we własnym procesie z własnym modelem Pose, przypiętym do
+# rdzenia procesora. Nadzorca zbiera statystyki ze wszystkich procesów, a awaria
+# jednego stanowiska nie zatrzymuje pozostałych (opcjonalnie jest ono restartowane).
+# Przykłady:
+#   python stations.py 0 1 pompki@2                   - trzy kamery, trzecia z pompkami
+#   python stations.py nagrania/*.mp4 --scaling       - skalowanie przepustowości z liczbą rdzeni
+
+
+# Opis stanowiska: źródło obrazu i ćwiczenie
+class StationSpec:
+    def __init__(self, name, source, exercise):
+        self.name = name
+        self.source = source      # Indeks kamery (int) albo ścieżka / adres strumienia
+        self.exercise = exercise
+
+    # Pliki wideo (w przeciwieństwie do kamer i strumieni) kończą się
+    @property
+    def is_file(self):
+        return isinstance(self.source, str) and os.path.isfile(self.source)
+
+    # Parsowanie "ĆWICZENIE@ŹRÓDŁO" lub "ŹRÓDŁO"
+    @classmethod
+    def parse(cls, spec, default_exercise, index):
+        exercise, _, source = spec.rpartition('@')
+        exercise = exercise or default_exercise
+        if exercise not in EXERCISES:
+            raise ValueError(f"Nieznane ćwiczenie '{exercise}' w '{spec}'")
+        source = int(source) if source.isdigit() else source
+        name = f"{index + 1}:{os.path.basename(source) if isinstance(source, str) else f'kamera{source}'}"
+        return cls(name, source, exercise)
+
+
+# Rdzenie dostępne dla tego procesu
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+# Pętla stanowiska uruchamiana w procesie roboczym - wysyła do nadzorcy
+# zdarzenia "stats" (co report_interval sekund), "done" albo "error"
+def run_station(station, core, events, options):
+    try:
+        if core is not None and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, {core})
+        # Wątki OpenCV i tak konkurowałyby z innymi stanowiskami na tym samym rdzeniu
+        cv2.setNumThreads(1)
+
+        cap = cv2.VideoCapture(station.source)
+        if not cap.isOpened():
+            raise IOError(f"Nie można otworzyć źródła: {station.source}")
+        pose = exercise_logic.mp_pose.Pose(min_detection_confidence=options["min_detection_confidence"],
+                                           min_tracking_confidence=options["min_tracking_confidence"])
+        rules = CompiledRules(EXERCISES[station.exercise])
+        counter = RuleCounter(rules)
+        buffer = LandmarkBuffer(rules.rules.landmarks)
+        rgb = RgbBuffer()
+
+        # Plik jako atrapa kamery: klatki odczytywane w tempie nagrania
+        frame_interval = 0.0
+        if options["realtime"] and station.is_file:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_interval = 1.0 / fps if fps > 0 else 0.0
+
+        frames = 0
+        frames_with_pose = 0
+        times = []
+        started = time.perf_counter()
+        last_report = started
+        next_frame = started
+        while True:
+            if frame_interval:
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_frame += frame_interval
+            ret, frame = cap.read()
+            if not ret:
+                break
+            start = time.perf_counter()
+            results = pose.process(rgb.convert(frame))
+            if results.pose_landmarks:
+                frames_with_pose += 1
+                counter.update(rules.evaluate(buffer.update(results.pose_landmarks.landmark), frame.shape[1]))
+            now = time.perf_counter()
+            times.append(now - start)
+            frames += 1
+
+            if now - last_report >= options["report_interval"]:
+                events.put(station_stats("stats", station, core, frames, frames_with_pose, counter, times,
+                                         now - started))
+                times = times[-300:]
+                last_report = now
+        cap.release()
+        pose.close()
+        events.put(station_stats("done", station, core, frames, frames_with_pose, counter, times,
+                                 time.perf_counter() - started))
+    except Exception as e:
+        events.put({"type": "error", "station": station.name, "error": f"{e.__class__.__name__}: {e}",
+                    "traceback": traceback.format_exc()})
+        sys.exit(1)
+
+
+def station_stats(kind, station, core, frames, frames_with_pose, counter, times, elapsed):
+    times_ms = np.array(times[-300:]) * 1000.0 if times else np.zeros(1)
+    return {
+        "type": kind,
+        "station": station.name,
+        "exercise": station.exercise,
+        "core": core,
+        "frames": frames,
+        "frames_with_pose": frames_with_pose,
+        "reps": counter.count,
+        "seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(float(np.percentile(times_ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(times_ms, 95)), 2),
+    }
+
+
+class StationSupervisor:
+    def __init__(self, stations, cores=None, max_restarts=0, report_interval=2.0, realtime=False,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5, on_report=None, store=None, user=None):
+        self.stations = stations
+        self.cores = cores if cores is not None else available_cores()
+        self.max_restarts = max_restarts  # Ile razy restartować stanowisko po awarii
+        self.report_interval = report_interval
+        self.on_report = on_report        # Wywoływane co report_interval z bieżącymi statystykami
+        self.options = {
+            "realtime": realtime,
+            "report_interval": report_interval,
+            "min_detection_confidence": min_detection_confidence,
+            "min_tracking_confidence": min_tracking_confidence,
+        }
+        self.events = multiprocessing.Queue()
+        self.processes = {}   # Nazwa stanowiska -> (proces, rdzeń)
+        self.stats = {}       # Nazwa stanowiska -> ostatnie statystyki
+        self.errors = {}      # Nazwa stanowiska -> lista błędów
+        self.restarts = {station.name: 0 for station in stations}
+        self.finished = set()
+
+        # Zapis powtórzeń i podsumowań stanowisk w bazie zdarzeń (event_store)
+        self.store = store
+        self.store_sessions = {}
+        self.stored_reps = {}  # Powtórzenia bieżącego uruchomienia już zapisane w bazie
+        self.user = user
+
+    # Stanowiska rozdzielane po kolei na dostępne rdzenie
+    def start(self):
+        for i, station in enumerate(self.stations):
+            self.launch(station, self.cores[i % len(self.cores)] if self.cores else None)
+        return self
+
+    def launch(self, station, core):
+        process = multiprocessing.Process(target=run_station, args=(station, core, self.events, self.options),
+                                          name=f"station-{station.name}", daemon=True)
+        process.start()
+        self.processes[station.name] = (process, core)
+        if self.store is not None:
+            # Restart zaczyna liczenie od zera - nowa sesja w bazie
+            self.store_sessions[station.name] = self.store.session(self.user, station.name)
+            self.stored_reps[station.name] = 0
+
+    # Nowe powtórzenia (różnica względem ostatnich statystyk) i podsumowanie stanowiska
+    def record(self, event):
+        name = event["station"]
+        session = self.store_sessions[name]
+        for count in range(self.stored_reps[name] + 1, event["reps"] + 1):
+            session.record({"type": REP, "exercise": event["exercise"], "count": count})
+        self.stored_reps[name] = max(self.stored_reps[name], event["reps"])
+        if event["type"] == "done":
+            session.record({"type": SUMMARY, "exercise": event["exercise"], "completed": True,
+                            "total_reps": event["reps"], "exercise_time": event["seconds"],
+                            "frames": event["frames"]})
+
+    def handle(self, event):
+        name = event["station"]
+        if event["type"] == "error":
+            self.errors.setdefault(name, []).append(event["error"])
+            print(f"Stanowisko {name}: {event['error']}", file=sys.stderr)
+        else:
+            self.stats[name] = event
+            if self.store is not None:
+                self.record(event)
+            if event["type"] == "done":
+                self.finished.add(name)
+
+    # Proces zakończony bez zdarzenia "done" to awaria (wyjątek albo np. błąd segmentacji)
+    def check_processes(self):
+        for station in self.stations:
+            if station.name in self.finished:
+                continue
+            process, core = self.processes[station.name]
+            if process.is_alive():
+                continue
+            process.join()
+            # Brak zdarzenia "error" z tego uruchomienia - proces zginął bez wyjątku w Pythonie
+            if len(self.errors.get(station.name, [])) <= self.restarts[station.name]:
+                self.errors.setdefault(station.name, []).append(f"proces zakończony z kodem {process.exitcode}")
+            if self.restarts[station.name] < self.max_restarts:
+                self.restarts[station.name] += 1
+                print(f"Stanowisko {station.name}: restart {self.restarts[station.name]}/{self.max_restarts}",
+                      file=sys.stderr)
+                self.launch(station, core)
+            else:
+                self.finished.add(station.name)
+
+    @property
+    def running(self):
+        return len(self.finished) < len(self.stations)
+
+    # Pętla nadzorcy - do zakończenia wszystkich stanowisk (albo przerwania Ctrl+C)
+    def run(self):
+        started = time.perf_counter()
+        last_report = started
+        try:
+            while self.running:
+                try:
+                    self.handle(self.events.get(timeout=0.2))
+                    continue
+                except queue.Empty:
+                    pass
+                self.check_processes()
+                now = time.perf_counter()
+                if self.on_report is not None and now - last_report >= self.report_interval:
+                    self.on_report(self.summary(now - started))
+                    last_report = now
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+        # Zdarzenia, które dotarły tuż przed zakończeniem procesów
+        while True:
+            try:
+                self.handle(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return self.summary(time.perf_counter() - started)
+
+    def stop(self):
+        for process, _ in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+            process.join(timeout=1.0)
+
+    # Zbiorcze statystyki wszystkich stanowisk
+    def summary(self, elapsed):
+        stations = [dict(self.stats.get(s.name, {"station": s.name, "exercise": s.exercise, "frames": 0,
+                                                 "fps": 0.0, "reps": 0}),
+                         errors=self.errors.get(s.name, []), restarts=self.restarts[s.name])
+                    for s in self.stations]
+        total_frames = sum(s["frames"] for s in stations)
+        return {
+            "stations": stations,
+            "cores": len(set(self.cores)),
+            "seconds": round(elapsed, 3),
+            "total_frames": total_frames,
+            "throughput_fps": round(total_frames / elapsed, 2) if elapsed > 0 else 0.0,
+            "failed": sum(1 for s in stations if s["errors"] and s.get("type") != "done"),
+        }
+
+
+def print_summary(summary):
+    print(f"{'stanowisko':<28} {'ćwiczenie':<10} {'rdzeń':>5} {'klatki':>7} {'FPS':>7} {'p95 ms':>7} {'powt.':>6}")
+    for s in summary["stations"]:
+        status = " BŁĄD" if s["errors"] and s.get("type") != "done" else ""
+        print(f"{s['station']:<28} {s['exercise']:<10} {str(s.get('core', '-')):>5} {s['frames']:>7} "
+              f"{s['fps']:>7.1f} {s.get('p95_ms', 0.0):>7.1f} {s['reps']:>6}{status}")
+    print(f"Razem: {summary['total_frames']} klatek w {summary['seconds']:.1f}s - "
+          f"{summary['throughput_fps']:.1f} klatek/s na {summary['cores']} rdzeniach")
+
+
+# Test skalowania: te same nagrania przetwarzane na 1, 2, 4, ... rdzeniach
+def scaling_report(stations, options):
+    cores = available_cores()
+    counts = sorted({min(2 ** i, len(cores)) for i in range(len(cores).bit_length() + 1)})
+    results = []
+    for count in counts:
+        summary = StationSupervisor(stations, cores=cores[:count], **options).start().run()
+        results.append({"cores": count, "seconds": summary["seconds"], "throughput_fps": summary["throughput_fps"],
+                        "failed": summary["failed"]})
+        print(f"  {count:>3} rdzeni: {summary['throughput_fps']:8.1f} klatek/s ({summary['seconds']:.1f}s)",
+              file=sys.stderr)
+    # Bez klatek przetworzonych na 1 rdzeniu przyspieszenie nie ma odniesienia
+    base = results[0]["throughput_fps"]
+    if not base:
+        raise RuntimeError(f"pomiar na {results[0]['cores']} rdzeniu nie przetworzył żadnej klatki "
+                           f"(stanowiska z błędem: {results[0]['failed']})")
+    for result in results:
+        result["speedup"] = round(result["throughput_fps"] / base, 2)
+        result["efficiency"] = round(result["speedup"] / result["cores"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Wiele stanowisk ćwiczeń na jednym komputerze')
+    parser.add_argument('sources', nargs='+',
+                        help='Źródła obrazu: indeks kamery, plik wideo lub adres strumienia, opcjonalnie ĆWICZENIE@ŹRÓDŁO')
+    parser.add_argument('--exercise', choices=sorted(EXERCISES), default='przysiady',
+                        help='Ćwiczenie dla źródeł bez prefiksu')
+    parser.add_argument('--cores', type=int, help='Liczba rdzeni do rozmieszczenia stanowisk (domyślnie wszystkie)')
+    parser.add_argument('--max-restarts', type=int, default=0, help='Liczba restartów stanowiska po awarii')
+    parser.add_argument('--report-interval', type=float, default=2.0, help='Co ile sekund raportować statystyki')
+    parser.add_argument('--realtime', action='store_true', help='Pliki wideo odtwarzane w tempie nagrania (jak kamera)')
+    parser.add_argument('--scaling', action='store_true', help='Pomiar przepustowości na 1, 2, 4, ... rdzeniach')
+    parser.add_argument('--output', help='Plik JSON z wynikami')
+    parser.add_argument('--store', help='Baza SQLite, do której zapisywane są powtórzenia stanowisk (event_store.py)')
+    parser.add_argument('--user', help='Użytkownik zapisywany w bazie zdarzeń (domyślnie login)')
+    args = parser.parse_args()
+
+    try:
+        stations = [StationSpec.parse(spec, args.exercise, i) for i, spec in enumerate(args.sources)]
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.scaling:
+        if not all(station.is_file for station in stations):
+            parser.error("Pomiar skalowania wymaga plików wideo jako źródeł")
+        print(f"Skalowanie: {len(stations)} stanowisk", file=sys.stderr)
+        try:
+            results = scaling_report(stations, {"realtime": args.realtime})
+        except RuntimeError as e:
+            print(f"Błąd pomiaru skalowania: {e}", file=sys.stderr)
+            return 1
+        # Awarie stanowisk ze wszystkich pomiarów decydują o kodzie wyjścia
+        report = {"scaling": results, "failed": sum(result["failed"] for result in results)}
+        print(f"{'rdzenie':>8} {'klatki/s':>10} {'przysp.':>8} {'wydajn.':>8}")
+        for result in report["scaling"]:
+            print(f"{result['cores']:>8} {result['throughput_fps']:>10.1f} {result['speedup']:>8.2f} "
+                  f"{result['efficiency']:>8.2f}")
+    else:
+        cores = available_cores()[:args.cores] if args.cores else None
+        store = EventStore(args.store).start() if args.store else None
+        supervisor = StationSupervisor(stations, cores=cores, max_restarts=args.max_restarts,
+                                       report_interval=args.report_interval, realtime=args.realtime,
+                                       on_report=lambda s: print(
+                                           f"{s['throughput_fps']:.1f} klatek/s, "
+                                           + ", ".join(f"{st['station']}: {st['reps']}" for st in s['stations']),
+                                           file=sys.stderr),
+                                       store=store, user=args.user)
+        try:
+            report = supervisor.start().run()
+        finally:
+            if store is not None:
+                store.close()
+        print_summary(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 1 if report.get("failed") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+
+from pipeline import RgbBuffer
+from render import SidebarCompositor
+
+# Ścieżka klatki bez modelu (jak Workout.step): jedna konwersja kolorów do
+# bufora RGB, jedno kopiowanie obrazu do płótna i napisy w sidebarze - bez
+# alokacji pełnych klatek po pierwszej klatce
+
+HEIGHT, WIDTH = 480, 640
+
+
+def make_frames(count):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (HEIGHT, WIDTH, 3), dtype=np.uint8) for _ in range(count)]
+
+def sidebar_texts(i):
+    return [(f"Seria: 1/3", (20, 100), 0.7, (255, 255, 255), 2),
+            (f"Przysiady: {i % 10}/10", (20, 140), 0.7, (0, 255, 0), 2)]
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    calls = []
+    cvt_color = cv2.cvtColor
+
+    def counting_cvt_color(*args, **kwargs):
+        calls.append(args[1] if len(args) > 1 else kwargs.get("code"))
+        return cvt_color(*args, **kwargs)
+
+    monkeypatch.setattr(cv2, "cvtColor", counting_cvt_color)
+    return calls
+
+
+def test_rgb_buffer_is_reused(conversions):
+    rgb = RgbBuffer()
+    first, second = make_frames(2)
+    a = rgb.convert(first)
+    b = rgb.convert(second)
+    assert a is b
+    assert np.array_equal(b, second[..., ::-1])
+    assert not b.flags.writeable
+    assert len(conversions) == 2
+
+
+def test_compositor_reuses_canvas():
+    compositor = SidebarCompositor("PRZYSIAD", 80, sidebar_width=500)
+    frames = make_frames(3)
+    canvases = []
+    for i, frame in enumerate(frames):
+        view = compositor.blit(frame)
+        assert np.shares_memory(view, compositor.canvas)
+        assert np.array_equal(view, frame)
+        canvases.append(compositor.draw_texts(sidebar_texts(i)))
+    assert all(canvas is compositor.canvas for canvas in canvases)
+    assert compositor.compose(frames[0], sidebar_texts(0)) is compositor.canvas
+    assert np.array_equal(compositor.canvas[:, :WIDTH], frames[0])
+
+
+def test_frame_path_one_conversion_and_no_full_frame_allocations(conversions):
+    rgb = RgbBuffer()
+    compositor = SidebarCompositor("PRZYSIAD", 80, sidebar_width=500)
+    frames = make_frames(4)
+
+    def step(i):
+        image = rgb.convert(frames[i % len(frames)])
+        canvas = compositor.compose(frames[i % len(frames)], sidebar_texts(i))
+        return image, canvas
+
+    # Rozgrzewka: bufory, szablon sidebara i glify wszystkich napisów
+    warm_image, warm_canvas = step(0)
+    for i in range(1, 10):
+        step(i)
+
+    conversions.clear()
+    tracemalloc.start()
+    try:
+        for i in range(30):
+            image, canvas = step(i)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(conversions) == 30
+    assert image is warm_image
+    assert canvas is warm_canvas
+    # Ani jedna pełna klatka (ani jej połowa) nie jest alokowana w pętli
+    assert peak < HEIGHT * WIDTH * 3 // 2
@@ -0,0 +1,121 @@
+import pytest
+
+from session_state import ExerciseSession, PREP, EXERCISE, REST, COMPLETED
+
+# Przejścia stanów sesji z podstawionym zegarem: czasy przejść wynikają z terminów,
+# a nie z chwili wywołania update(), więc przestój pętli klatek nie przesuwa odliczania
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCounter:
+    def __init__(self):
+        self.count = 0
+        self.resets = 0
+
+    def reset(self):
+        self.count = 0
+        self.resets += 1
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(100.0)
+
+@pytest.fixture
+def counter():
+    return FakeCounter()
+
+def make_session(counter, clock, total_series=2):
+    return ExerciseSession(counter, target=2, total_series=total_series, rest_time=3, prep_time=5, clock=clock)
+
+
+def test_full_session(counter, clock):
+    session = make_session(counter, clock)
+    assert session.state == PREP
+    assert session.remaining() == 5
+
+    clock.now = 104.2
+    assert session.update() == []
+    assert session.remaining() == 1
+
+    clock.now = 105.0
+    assert session.update() == [(PREP, EXERCISE, 105.0)]
+    assert session.remaining() == 0
+
+    counter.count = 1
+    clock.now = 106.0
+    assert session.update() == []
+
+    counter.count = 2
+    clock.now = 107.5
+    assert session.update() == [(EXERCISE, REST, 107.5)]
+    assert session.remaining() == 3
+    assert session.series_reps == [2]
+
+    clock.now = 110.5
+    assert session.update() == [(REST, EXERCISE, 110.5)]
+    assert session.current_series == 2
+    assert counter.resets == 1 and counter.count == 0
+
+    counter.count = 2
+    clock.now = 113.0
+    assert session.update() == [(EXERCISE, COMPLETED, 113.0)]
+    assert session.series_reps == [2, 2]
+    assert session.update() == []
+
+
+def test_stall_does_not_shift_deadlines(counter, clock):
+    session = make_session(counter, clock)
+
+    # Pętla klatek stoi 20 s w przygotowaniu - ćwiczenie zaczęło się w terminie, nie po przestoju
+    clock.now = 120.0
+    assert session.update() == [(PREP, EXERCISE, 105.0)]
+
+    counter.count = 2
+    assert session.update() == [(EXERCISE, REST, 120.0)]
+
+    # Przestój w przerwie: odliczanie nie schodzi poniżej zera, a seria zaczyna się w terminie
+    clock.now = 140.0
+    assert session.remaining() == 0
+    assert session.update() == [(REST, EXERCISE, 123.0)]
+    assert session.state_started == 123.0
+
+
+def test_irregular_frames_do_not_drift(counter, clock):
+    session = make_session(counter, clock)
+    # Klatki co ~33 ms z nieregularnym odstępem - przejście dokładnie w terminie
+    t = 100.0
+    transitions = []
+    while session.state == PREP:
+        t += 0.033 if int(t * 100) % 2 else 0.041
+        transitions += session.update(t)
+    assert transitions == [(PREP, EXERCISE, 105.0)]
+    assert session.deadline == 105.0
+
+
+def test_several_transitions_in_one_update(counter, clock):
+    session = make_session(counter, clock)
+    counter.count = 2
+    clock.now = 106.0
+    assert session.update() == [(PREP, EXERCISE, 105.0), (EXERCISE, REST, 106.0)]
+    assert session.deadline == 109.0
+
+
+def test_finish_forces_completion(counter, clock):
+    session = make_session(counter, clock, total_series=3)
+    clock.now = 106.0
+    session.update()
+    session.finish()
+    assert session.state == COMPLETED
+    assert session.state_started == 106.0
+    clock.now = 200.0
+    session.finish()
+    assert session.state_started == 106.0
+    assert session.update() == []
@@ -0,0 +1,185 @@
+import os
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # Bez Pillow zostaje cv2.putText (bez polskich znaków)
+    ImageFont = None
+
+# Napisy w sidebarze czcionką Unicode (z polskimi znakami, których nie ma
+# w czcionkach Hershey). Znaki rasteryzowane są raz do atlasu glifów dla danego
+# rozmiaru, gotowe napisy (maski alfa złożone z glifów) trzymane są w pamięci
+# podręcznej LRU - większość linii sidebara powtarza się w każdej klatce, więc
+# w klatce zostaje tylko zmieszanie gotowego obrazka z płótnem.
+# Interfejs jak cv2.putText: org to lewy koniec linii bazowej, scale i thickness
+# w jednostkach FONT_HERSHEY_SIMPLEX.
+
+FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+]
+BOLD_FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf",
+    "/Library/Fonts/Arial Bold.ttf",
+    "C:/Windows/Fonts/arialbd.ttf",
+]
+FONT_PIXELS = 30  # Rozmiar czcionki odpowiadający skali 1 czcionki Hershey
+PRELOADED_CHARS = "".join(chr(c) for c in range(32, 127)) + "ąćęłńóśźżĄĆĘŁŃÓŚŹŻ"
+
+# Zamiana polskich znaków dla cv2.putText (gdy brak Pillow lub czcionki)
+ASCII_FALLBACK = str.maketrans("ąćęłńóśźżĄĆĘŁŃÓŚŹŻ", "acelnoszzACELNOSZZ")
+
+# Funkcja szukająca pierwszej istniejącej czcionki (ścieżka z FITDETECTOR_FONT ma pierwszeństwo)
+def find_font(paths, env="FITDETECTOR_FONT"):
+    for path in [os.environ.get(env)] + paths:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+# Atlas glifów jednej czcionki w jednym rozmiarze: wszystkie znaki w jednym
+# pasie (wysokość linii x suma szerokości), nowe znaki dopisywane przy pierwszym użyciu.
+# Kolumna 0 jest pusta - wskazują na nią odstępy między glifami w napisie.
+class GlyphAtlas:
+    def __init__(self, font, chars=PRELOADED_CHARS):
+        self.font = font
+        self.ascent, self.descent = font.getmetrics()
+        self.height = self.ascent + self.descent
+        self.image = np.zeros((self.height, 1), dtype=np.uint8)
+        self.glyphs = {}  # znak -> (x w atlasie, szerokość, przesunięcie w lewo, przesuw pióra)
+        self.add(chars)
+
+    def add(self, chars):
+        chars = [c for c in dict.fromkeys(chars) if c not in self.glyphs]
+        if not chars:
+            return
+        strips = [self.image]
+        x = self.image.shape[1]
+        for char in chars:
+            left, _, right, _ = self.font.getbbox(char)
+            width = max(right - left, 0)
+            glyph = Image.new("L", (max(width, 1), self.height), 0)
+            ImageDraw.Draw(glyph).text((-left, 0), char, font=self.font, fill=255)
+            strips.append(np.asarray(glyph)[:, :width])
+            self.glyphs[char] = (x, width, left, self.font.getlength(char))
+            x += width
+        self.image = np.hstack(strips)
+
+    # Maska alfa napisu złożona z glifów atlasu (bez kerningu) - kolumny atlasu
+    # wybierane jednym indeksowaniem; znaki parzyste i nieparzyste osobno, bo
+    # sąsiednie glify mogą na siebie zachodzić (łączone maksimum)
+    def render(self, text):
+        self.add(text)
+        glyphs = [self.glyphs[c] for c in text]
+        width = int(np.ceil(sum(g[3] for g in glyphs))) + 2
+        layers = [[0] * width, [0] * width]
+        pen = 1.0
+        for i, (x, glyph_width, left, advance) in enumerate(glyphs):
+            start = max(int(round(pen + left)), 0)
+            end = min(start + glyph_width, width)
+            layers[i % 2][start:end] = range(x, x + end - start)
+            pen += advance
+        mask = self.image[:, layers[0]]
+        if len(glyphs) > 1:
+            np.maximum(mask, self.image[:, layers[1]], out=mask)
+        return mask
+
+
+# Gotowy napis: odwrotność maski alfa i składnik koloru przeliczone raz (uint8),
+# mieszane z płótnem w każdej klatce operacjami cv2 z nasyceniem
+class TextSprite:
+    def __init__(self, mask, color, ascent):
+        alpha = cv2.merge([mask] * 3)
+        self.inverse = cv2.bitwise_not(alpha)
+        self.foreground = cv2.multiply(alpha, tuple(color) + (0,), scale=1 / 255)
+        self.ascent = ascent
+        self.height, self.width = mask.shape
+
+    def draw(self, image, org):
+        x, y = org[0] - 1, org[1] - self.ascent
+        # Przycięcie do granic obrazu
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + self.width, image.shape[1]), min(y + self.height, image.shape[0])
+        if x1 >= x2 or y1 >= y2:
+            return
+        roi = image[y1:y2, x1:x2]
+        sy, sx = slice(y1 - y, y2 - y), slice(x1 - x, x2 - x)
+        # roi = roi * (1 - alpha) + kolor * alpha
+        cv2.multiply(roi, self.inverse[sy, sx], dst=roi, scale=1 / 255)
+        cv2.add(roi, self.foreground[sy, sx], dst=roi)
+
+
+class TextRenderer:
+    def __init__(self, font_path=None, bold_font_path=None, cache_size=256):
+        self.font_path = font_path or find_font(FONT_PATHS)
+        self.bold_font_path = bold_font_path or find_font(BOLD_FONT_PATHS, "FITDETECTOR_BOLD_FONT") or self.font_path
+        self.cache_size = cache_size
+        self.atlases = {}           # (pogrubienie, rozmiar w pikselach) -> GlyphAtlas
+        self.cache = OrderedDict()  # (tekst, skala, kolor, grubość) -> TextSprite
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def unicode(self):
+        return ImageFont is not None and self.font_path is not None
+
+    def atlas(self, scale, thickness):
+        key = (thickness >= 2, max(int(round(scale * FONT_PIXELS)), 6))
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            path = self.bold_font_path if key[0] else self.font_path
+            atlas = self.atlases[key] = GlyphAtlas(ImageFont.truetype(path, key[1]))
+        return atlas
+
+    def sprite(self, text, scale, color, thickness):
+        key = (text, scale, color, thickness)
+        sprite = self.cache.get(key)
+        if sprite is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        atlas = self.atlas(scale, thickness)
+        sprite = self.cache[key] = TextSprite(atlas.render(text), color, atlas.ascent)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return sprite
+
+    def put_text(self, image, text, org, scale, color, thickness):
+        if not self.unicode:
+            cv2.putText(image, text.translate(ASCII_FALLBACK), org, cv2.FONT_HERSHEY_SIMPLEX,
+                        scale, color, thickness)
+            return
+        self.sprite(text, scale, color, thickness).draw(image, org)
+
+    # Prostokąt (x1, y1, x2, y2) zajmowany przez napis
+    def text_rect(self, text, org, scale, thickness):
+        if not self.unicode:
+            text = text.translate(ASCII_FALLBACK)
+            (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+            x, y = org
+            return (x - thickness, y - h - thickness, x + w + thickness, y + baseline + thickness)
+        atlas = self.atlas(scale, thickness)
+        atlas.add(text)
+        x, y = org
+        width = int(np.ceil(sum(atlas.glyphs[c][3] for c in text))) + 2
+        return (x - 1, y - atlas.ascent, x - 1 + width, y + atlas.descent)
+
+    def stats(self):
+        return {"unicode": self.unicode, "cached": len(self.cache), "hits": self.hits, "misses": self.misses}
+
+
+# Wspólny renderer (atlasy i pamięć podręczna dzielone przez wszystkie okna)
+renderer = None
+
+def get_renderer():
+    global renderer
+    if renderer is None:
+        renderer = TextRenderer()
+    return renderer